@@ -4,62 +4,92 @@ AI Agent for Resume Analysis and Ranking - Enterprise Edition
 
 import json
 from typing import Dict, Any, List, Optional
-from google import genai
-from google.genai import types
-from groq import Groq
 import os
 import re
+import time
 from dotenv import load_dotenv
-from pydantic import ValidationError
-from models import CandidateResult
+import metrics
+import institutions
+# google-genai, groq and pydantic (via models) take most of a worker's boot
+# time, so they are imported on first LLM use (or up front by preload())
 
 # Load environment variables
 load_dotenv()
 
+def _timed_llm_call(provider: str, call):
+    """Runs an LLM request and records its latency by provider and outcome"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        response = call()
+        outcome = "success"
+        return response
+    finally:
+        metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, provider=provider, outcome=outcome)
+
 class ResumeRankingAgent:
     """AI Agent for technical recruitment - resume analysis"""
 
-    # University Tier Database
-    TOP_TIER_UNIVERSITIES = {
-        "stanford", "mit", "harvard", "caltech", "oxford", "cambridge",
-        "princeton", "yale", "columbia", "cornell", "upenn", "berkeley",
-        "iit bombay", "iit delhi", "iit madras", "iit kanpur", "iit kharagpur",
-        "iit roorkee", "iit guwahati", "iit hyderabad", "iisc",
-        "brown", "dartmouth", "penn", "california institute of technology",
-    }
-
-    LEADING_NATIONAL_UNIVERSITIES = {
-        "nit trichy", "nit warangal", "nit surathkal", "nit calicut",
-        "nit durgapur", "nit jamshedpur", "nit allahabad", "nit bhopal",
-        "university of michigan", "university of texas", "carnegie mellon",
-        "georgia tech", "eth zurich", "ethz", "nus", "national university of singapore",
-    }
-
-    def __init__(self, api_key: str = None):
-        """Initialize with best available Flash model and Groq fallback"""
+    # University tiers come from the institution database (institutions.csv, see institutions.py)
+    UNIVERSITY_KEYWORDS = ["University", "Institute", "IIT", "NIT", "College"]
+
+    def __init__(self, api_key: str = None, quiet: bool = False):
+        """Initialize with best available Flash model and Groq fallback (quiet: no progress output)"""
+        self.quiet = quiet
         # Initialize Gemini
         self.gemini_key = api_key or os.getenv("GEMINI_API_KEY")
-        if self.gemini_key:
-            self.gemini_client = genai.Client(api_key=self.gemini_key)
-        else:
-            self.gemini_client = None
-            print("Warning: No API Key found for Gemini.")
+        # Base URL overrides, e.g. the local mock server (mock_llm.py) for load tests
+        self.gemini_base_url = os.getenv("GEMINI_BASE_URL") or None
+        self._gemini_client = None
+        if not self.gemini_key:
+            self._log("Warning: No API Key found for Gemini.")
 
         # Initialize Groq
         self.groq_key = os.getenv("GROQ_API_KEY")
-        if self.groq_key:
-            self.groq_client = Groq(api_key=self.groq_key)
-        else:
-            self.groq_client = None
-            print("Warning: No API Key found for Groq.")
+        self.groq_base_url = os.getenv("GROQ_BASE_URL") or None
+        self._groq_client = None
+        if not self.groq_key:
+            self._log("Warning: No API Key found for Groq.")
+
+    def _log(self, message: str):
+        if not self.quiet:
+            print(message)
+
+    @property
+    def gemini_client(self):
+        """Gemini client, created on first use; None without an API key"""
+        if self._gemini_client is None and self.gemini_key:
+            from google import genai
+            from google.genai import types
+            http_options = types.HttpOptions(base_url=self.gemini_base_url) if self.gemini_base_url else None
+            self._gemini_client = genai.Client(api_key=self.gemini_key, http_options=http_options)
+        return self._gemini_client
+
+    @property
+    def groq_client(self):
+        """Groq client, created on first use; None without an API key"""
+        if self._groq_client is None and self.groq_key:
+            from groq import Groq
+            self._groq_client = Groq(api_key=self.groq_key, base_url=self.groq_base_url)
+        return self._groq_client
 
     def _get_university_tier(self, university: str) -> tuple:
-        uni_lower = university.lower().strip()
-        if any(top in uni_lower for top in self.TOP_TIER_UNIVERSITIES):
-            return 10, "Global Top Tier University detected."
-        if any(lead in uni_lower for lead in self.LEADING_NATIONAL_UNIVERSITIES):
-            return 8, "Leading National University detected."
-        return 5, "Standard University tier."
+        return institutions.tier(university)
+
+    def _find_university(self, lines: List[str]) -> str:
+        """First line naming a known institution (skipping the name line), education lines
+        first; else the first line with a keyword"""
+        resolver = institutions.get_resolver()
+        named = [line for line in lines[1:] if resolver.resolve(line) is not None]
+        for line in named:
+            if institutions.has_education_cue(line):
+                return line
+        if named:
+            return named[0]
+        for line in lines:
+            if any(kw in line for kw in self.UNIVERSITY_KEYWORDS):
+                return line
+        return "Unknown Institution"
 
     # Skills Keywords Database for extraction
     SKILL_KEYWORDS = [
@@ -112,11 +142,7 @@ class ResumeRankingAgent:
         lines = [l.strip() for l in resume_text.strip().split('\n') if l.strip()]
         name = lines[0] if lines else "Unknown Candidate"
         
-        university = "Unknown Institution"
-        for line in lines:
-            if any(kw in line for kw in ["University", "Institute", "IIT", "NIT", "College"]):
-                university = line
-                break
+        university = self._find_university(lines)
 
         python_score, python_years, python_evidence = self._calculate_python_score(resume_text)
         uni_tier, uni_evidence = self._get_university_tier(university)
@@ -144,6 +170,9 @@ class ResumeRankingAgent:
 
     def analyze_resume_with_ai(self, resume_text: str, job_description: str) -> Dict[str, Any]:
         """AI-powered Analysis with Pydantic validation and self-correction."""
+        from google.genai import types
+        from pydantic import ValidationError
+        from models import CandidateResult
         
         system_prompt = f"""Role: Expert Technical Recruiter and Data Entry Specialist.
 Task: Extract candidate information and analyze resume against Job Description.
@@ -204,21 +233,25 @@ Output JSON ONLY:
             validated = CandidateResult.model_validate(data)
             return validated.to_storage_dict()
 
+        # Provider tried last, used to count fallbacks to the next stage
+        attempted = None
+
         # Primary: Gemini Flash (Highly reliable, native support)
         if self.gemini_client:
+            attempted = "gemini"
             try:
                 # Using gemini-2.5-flash-lite as the preferred model
                 model_name = 'gemini-2.5-flash-lite' 
                 
-                print(f"Using Gemini primary ({model_name})...")
-                response = self.gemini_client.models.generate_content(
+                self._log(f"Using Gemini primary ({model_name})...")
+                response = _timed_llm_call("gemini", lambda: self.gemini_client.models.generate_content(
                     model=model_name,
                     contents=f"{system_prompt}\n{user_content}",
                     config=types.GenerateContentConfig(
                         temperature=0.1,
                         response_mime_type="application/json"
                     )
-                )
+                ))
                 
                 if response.text:
                     try:
@@ -227,26 +260,31 @@ Output JSON ONLY:
                         return result
                     except ValidationError as ve:
                          # Gemini Self-correction
-                        print(f"Gemini Validation failed, attempting self-correction: {ve}")
+                        self._log(f"Gemini Validation failed, attempting self-correction: {ve}")
                         fix_prompt = f"Fix this invalid JSON based on schema:\n{response.text}\nError: {ve}\nReturn ONLY valid JSON."
-                        retry_resp = self.gemini_client.models.generate_content(
+                        metrics.LLM_CORRECTIONS.inc(provider="gemini", outcome="attempted")
+                        retry_resp = _timed_llm_call("gemini", lambda: self.gemini_client.models.generate_content(
                             model=model_name,
                             contents=fix_prompt,
                             config=types.GenerateContentConfig(response_mime_type="application/json")
-                        )
+                        ))
                         if retry_resp.text:
                             result = process_json_response(retry_resp.text)
                             result["analysis_method"] = "Gemini 2.5 Flash Lite (Corrected)"
+                            metrics.LLM_CORRECTIONS.inc(provider="gemini", outcome="succeeded")
                             return result
                         
             except Exception as e:
-                print(f"Gemini Analysis Failed ({e}). Attempting Groq fallback...")
+                self._log(f"Gemini Analysis Failed ({e}). Attempting Groq fallback...")
 
         # Secondary: Groq Llama 3.1 (Fast fallback)
         if self.groq_client:
+            if attempted:
+                metrics.LLM_FALLBACKS.inc(from_provider=attempted, to_provider="groq")
+            attempted = "groq"
             try:
-                print("Using Groq Llama-3.1-8b-instant (Fallback)...")
-                chat_completion = self.groq_client.chat.completions.create(
+                self._log("Using Groq Llama-3.1-8b-instant (Fallback)...")
+                chat_completion = _timed_llm_call("groq", lambda: self.groq_client.chat.completions.create(
                     messages=[
                         {
                             "role": "system",
@@ -261,7 +299,7 @@ Output JSON ONLY:
                     temperature=0.1,
                     stream=False,
                     response_format={"type": "json_object"}
-                )
+                ))
                 
                 content = chat_completion.choices[0].message.content
                 if content:
@@ -270,11 +308,21 @@ Output JSON ONLY:
                     return result
                     
             except Exception as e:
-                print(f"Groq Analysis Failed ({e}). Using rule-based fallback.")
+                self._log(f"Groq Analysis Failed ({e}). Using rule-based fallback.")
 
         # Final Fallback
+        if attempted:
+            metrics.LLM_FALLBACKS.inc(from_provider=attempted, to_provider="rules")
         return self.analyze_resume(resume_text, job_description)
 
+def preload():
+    """Imports the LLM SDKs and response models that are otherwise loaded on first AI analysis,
+    and compiles the institution database"""
+    import google.genai.types
+    import groq
+    import models
+    institutions.preload()
+
 def analyze_resume(resume_text: str, job_description: str = "", use_ai: bool = False) -> Dict[str, Any]:
     agent = ResumeRankingAgent()
     if use_ai:
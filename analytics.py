@@ -0,0 +1,256 @@
+"""
+Per-Position Analytics
+Score distributions, skill frequency, university tier breakdown and
+time-to-decision for one position, kept as running aggregates instead of
+scanning every candidate per page view.
+
+Each position's aggregates are built once from storage on first request
+(or up front with warm()), then updated incrementally from storage change
+events: every candidate's contribution is remembered so a save, status
+change or delete only subtracts the old contribution and adds the new one.
+Cached positions are validated against their partition file, so a write
+from another process only rebuilds the position it touched.
+"""
+
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import storage
+from candidate_table import normalize_status
+
+SCORE_FIELDS = ("final_rank_score", "python_score", "experience_score", "uni_tier_score")
+HISTOGRAM_BINS = 10  # 0-10 scores, one bin per point
+TOP_SKILLS = 15
+
+# uni_tier_score bands, as described to the LLM in agent.py
+TIERS = (("Top Global", 10), ("Top National", 7), ("Regional", 4), ("Unknown", 0))
+
+
+def _score_bin(value) -> Optional[int]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if value != value:  # NaN
+        return None
+    return min(max(int(value), 0), HISTOGRAM_BINS - 1)
+
+
+def _tier(value) -> str:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return "Unknown"
+    return next(name for name, floor in TIERS if value >= floor or floor == 0)
+
+
+def _decision_days(candidate) -> Optional[float]:
+    """Days from application to the latest accept/reject decision"""
+    if normalize_status(candidate.get("status")) == "pending":
+        return None
+    try:
+        created = datetime.fromisoformat(candidate.get("created_at"))
+        decided = datetime.fromisoformat(candidate.get("status_updated_at"))
+    except (TypeError, ValueError):
+        return None
+    return max((decided - created).total_seconds() / 86400, 0.0)
+
+
+class _Contribution(NamedTuple):
+    status: str
+    scores: Tuple  # (value, bin) per SCORE_FIELDS entry; bin None if missing
+    skills: Tuple[str, ...]
+    tier: str
+    decision_days: Optional[float]
+
+
+def _contribution(candidate) -> _Contribution:
+    scores = []
+    for field in SCORE_FIELDS:
+        score_bin = _score_bin(candidate.get(field))
+        scores.append((float(candidate[field]) if score_bin is not None else 0.0, score_bin))
+    skills = candidate.get("skills") or ()
+    return _Contribution(
+        status=normalize_status(candidate.get("status")),
+        scores=tuple(scores),
+        skills=tuple({s.strip().lower() for s in skills if isinstance(s, str) and s.strip()}),
+        tier=_tier(candidate.get("uni_tier_score")),
+        decision_days=_decision_days(candidate),
+    )
+
+
+class PositionAggregates:
+    """Running aggregates over one position's candidates"""
+
+    def __init__(self, position_id: str, key=None):
+        self.position_id = position_id
+        self.key = key  # storage.partition_key() the aggregates reflect
+        self.contributions: Dict[str, _Contribution] = {}
+        self.statuses = Counter()
+        self.histograms = {field: [0] * HISTOGRAM_BINS for field in SCORE_FIELDS}
+        self.score_sums = {field: [0.0, 0] for field in SCORE_FIELDS}
+        self.skills = Counter()
+        self.tiers = Counter()
+        self.decision_days: Dict[str, float] = {}
+        self._snapshot = None
+
+    def _apply(self, candidate_id: str, contribution: _Contribution, sign: int):
+        self.statuses[contribution.status] += sign
+        for field, (value, score_bin) in zip(SCORE_FIELDS, contribution.scores):
+            if score_bin is not None:
+                self.histograms[field][score_bin] += sign
+                self.score_sums[field][0] += sign * value
+                self.score_sums[field][1] += sign
+        for skill in contribution.skills:
+            self.skills[skill] += sign
+            if self.skills[skill] <= 0:
+                del self.skills[skill]
+        self.tiers[contribution.tier] += sign
+        if contribution.decision_days is not None:
+            if sign > 0:
+                self.decision_days[candidate_id] = contribution.decision_days
+            else:
+                self.decision_days.pop(candidate_id, None)
+        self._snapshot = None
+
+    def add(self, candidate):
+        self.remove(candidate["id"])
+        contribution = _contribution(candidate)
+        self.contributions[candidate["id"]] = contribution
+        self._apply(candidate["id"], contribution, +1)
+
+    def remove(self, candidate_id: str):
+        contribution = self.contributions.pop(candidate_id, None)
+        if contribution is not None:
+            self._apply(candidate_id, contribution, -1)
+
+    def snapshot(self) -> Dict:
+        """Returns the aggregates as a JSON-ready dict (cached until the next change)"""
+        if self._snapshot is not None:
+            return self._snapshot
+        distributions = {}
+        for field in SCORE_FIELDS:
+            total, count = self.score_sums[field]
+            distributions[field] = {
+                "edges": list(range(HISTOGRAM_BINS + 1)),
+                "counts": list(self.histograms[field]),
+                "mean": round(total / count, 2) if count else None,
+            }
+        days = np.fromiter(self.decision_days.values(), dtype=float, count=len(self.decision_days))
+        self._snapshot = {
+            "position_id": self.position_id,
+            "total_candidates": len(self.contributions),
+            "status_counts": {status: self.statuses.get(status, 0) for status in ("pending", "accepted", "rejected")},
+            "score_distribution": distributions,
+            "top_skills": [{"skill": skill, "count": count} for skill, count in self.skills.most_common(TOP_SKILLS)],
+            "university_tiers": [{"tier": name, "count": self.tiers.get(name, 0)} for name, _ in TIERS],
+            "time_to_decision": {
+                "decided": int(days.size),
+                "mean_days": round(float(days.mean()), 2) if days.size else None,
+                "median_days": round(float(np.median(days)), 2) if days.size else None,
+                "p90_days": round(float(np.percentile(days, 90)), 2) if days.size else None,
+            },
+        }
+        return self._snapshot
+
+
+class AnalyticsCache:
+    """Lazily built, event-maintained aggregates for every requested position"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.version = None
+        self.positions: Dict[str, PositionAggregates] = {}
+        self.position_of: Dict[str, str] = {}  # candidate id -> cached position id
+
+    def _drop(self, position_id: str):
+        aggregates = self.positions.pop(position_id, None)
+        if aggregates is not None:
+            for candidate_id in aggregates.contributions:
+                self.position_of.pop(candidate_id, None)
+
+    def _upsert(self, candidate, touched: set):
+        self._remove(candidate["id"], touched)
+        aggregates = self.positions.get(candidate.get("position_id") or "")
+        if aggregates is not None:
+            aggregates.add(candidate)
+            self.position_of[candidate["id"]] = aggregates.position_id
+            touched.add(aggregates.position_id)
+
+    def _remove(self, candidate_id: str, touched: set):
+        previous = self.position_of.pop(candidate_id, None)
+        if previous is not None:
+            self.positions[previous].remove(candidate_id)
+            touched.add(previous)
+
+    def on_event(self, event: str, payload: Dict):
+        """Storage listener: applies the change to cached positions"""
+        with self._lock:
+            version = payload["version"]
+            # A gap means another process wrote first; our running totals for the
+            # positions touched now would miss that write, so drop them instead
+            gap = self.version is None or version != (self.version[0], self.version[1] + 1)
+            self.version = version
+            touched = set()
+            if event in ("candidates_saved", "statuses_changed"):
+                for record in payload["candidates"]:
+                    self._upsert(record, touched)
+            elif event == "status_changed" and payload.get("candidate") is not None:
+                self._upsert(payload["candidate"], touched)
+            elif event == "candidate_deleted":
+                self._remove(payload["candidate_id"], touched)
+            elif event == "candidates_archived":
+                for candidate_id in payload["archived"]:
+                    self._remove(candidate_id, touched)
+            elif event == "position_deleted":
+                self._drop(payload["position_id"])
+            elif event == "store_replaced":
+                self.positions.clear()
+                self.position_of.clear()
+            for position_id in touched:
+                if gap:
+                    self._drop(position_id)
+                else:
+                    self.positions[position_id].key = storage.partition_key(position_id)
+
+    def build(self, position_id: str) -> PositionAggregates:
+        """Rebuilds one position from storage and caches it"""
+        # Read the key first: a write racing the load leaves a stale key and
+        # forces another rebuild rather than hiding the write
+        built = PositionAggregates(position_id, storage.partition_key(position_id))
+        for record in storage.get_candidates_by_position(position_id):
+            built.add(record)
+        with self._lock:
+            self._drop(position_id)
+            self.positions[position_id] = built
+            for candidate_id in built.contributions:
+                self.position_of[candidate_id] = position_id
+        return built
+
+    def get(self, position_id: str) -> Dict:
+        """Returns the analytics of one position"""
+        key = storage.partition_key(position_id)
+        with self._lock:
+            aggregates = self.positions.get(position_id)
+            if aggregates is not None and aggregates.key == key:
+                return aggregates.snapshot()
+        # Built outside the lock: storage writers hold their lock while notifying us
+        return self.build(position_id).snapshot()
+
+
+_cache = AnalyticsCache()
+storage.subscribe(_cache.on_event)
+
+
+def get_position_analytics(position_id: str) -> Dict:
+    return _cache.get(position_id)
+
+
+def warm():
+    """Builds the aggregates of every position up front"""
+    for position in storage.get_all_positions():
+        _cache.build(position["id"])
@@ -1,13 +1,27 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, g, Response, abort, make_response
+from flask import before_render_template, template_rendered
 from werkzeug.utils import secure_filename
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 from dotenv import load_dotenv
 import os
 import json
-import pandas as pd
+import time
+import agent
 from agent import analyze_resume
 import storage
+import candidate_table
+import analytics
+import render_cache
+import status_lookup
+import live_updates
+import ranking
+import archive
+import metrics
+import profiler
+import export
+import pdf_utils
 from pdf_utils import extract_text_from_pdf
 
 # Load environment variables
@@ -15,6 +29,63 @@ load_dotenv()
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 
+# Behind reverse proxies (e.g. Render), trust X-Forwarded-* from that many hops so
+# request.remote_addr is the client's address; the status rate limiter keys on it.
+# Leave at 0 when clients connect directly, or they could spoof their address.
+TRUSTED_PROXY_HOPS = int(os.getenv('TRUSTED_PROXY_HOPS', '0'))
+if TRUSTED_PROXY_HOPS > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS, x_proto=TRUSTED_PROXY_HOPS,
+                            x_host=TRUSTED_PROXY_HOPS)
+
+# Metrics configuration
+app.config['METRICS_TIMING_HEADERS'] = os.getenv('METRICS_TIMING_HEADERS', 'false').lower() == 'true'
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+
+# ============ Request Instrumentation ============
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    metrics.reset_stages()
+
+@app.after_request
+def record_request_timing(response):
+    start = g.pop('request_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    metrics.HTTP_REQUEST_SECONDS.observe(
+        elapsed, endpoint=request.endpoint or 'unmatched', method=request.method, status=response.status_code)
+    if app.config['METRICS_TIMING_HEADERS']:
+        timings = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in metrics.get_stages().items()]
+        timings.append(f"total;dur={elapsed * 1000:.2f}")
+        response.headers['Server-Timing'] = ', '.join(timings)
+        response.headers['X-Response-Time'] = f"{elapsed * 1000:.2f}ms"
+    return response
+
+def _template_render_started(sender, template, context, **extra):
+    g.render_start = time.perf_counter()
+
+def _template_render_finished(sender, template, context, **extra):
+    start = g.pop('render_start', None)
+    if start is not None:
+        metrics.TEMPLATE_RENDER_SECONDS.observe(
+            time.perf_counter() - start, endpoint=request.endpoint or 'unmatched', template=template.name)
+
+before_render_template.connect(_template_render_started, app)
+template_rendered.connect(_template_render_finished, app)
+
+# Opt-in slow request profiling (PROFILE_ENABLED=true)
+profiler.init_app(app)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Route: Prometheus text exposition of this worker's metrics"""
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        abort(401)
+    return Response(metrics.render(), mimetype=None, content_type=metrics.CONTENT_TYPE)
+
 # Authentication Decorators
 def hr_required(f):
     @wraps(f)
@@ -140,19 +211,34 @@ def index():
 @hr_required
 def overview():
     """Route: Overview Dashboard (Default Employer Page)"""
-    stats = storage.get_overview_stats()
-    return render_template('overview.html', stats=stats)
+    table = candidate_table.get_table()
+    titles = {p['id']: p['title'] for p in storage.get_all_positions()}
+    status_by_position = [
+        {"title": titles.get(pid, 'Unassigned' if not pid else pid), **counts}
+        for pid, counts in table.status_by_position().items()
+    ]
+    return render_template('overview.html',
+                           stats=table.overview_stats(),
+                           score_histogram=table.score_histogram(),
+                           status_by_position=status_by_position,
+                           applicants_per_day=table.applicants_per_day(days=30))
 
 @app.route('/employer')
 @hr_required
 def employer_portal():
     """Route: Employer Portal - Job Context with Positions"""
-    positions = storage.get_all_positions()
     selected_id = request.args.get('selected')
-    selected_position = None
-    if selected_id:
-        selected_position = storage.get_position(selected_id)
-    return render_template('index_new.html', positions=positions, selected_position=selected_position)
+    version = storage.get_version('positions')
+
+    def render():
+        positions = storage.get_all_positions()
+        selected_position = None
+        if selected_id:
+            selected_position = next((p for p in positions if p['id'] == selected_id), None)
+        return render_template('index_new.html', positions=positions, selected_position=selected_position)
+
+    return render_cache.conditional(render_cache.etag('employer', version, selected_id), render,
+                                    cache_key=('employer', version, selected_id))
 
 @app.route('/position/add', methods=['POST'])
 @hr_required
@@ -187,27 +273,53 @@ def delete_position_route(position_id):
 
 @app.route('/applicant')
 def applicant_portal():
-    """Route: Applicant Portal - Browse Jobs"""
-    positions = storage.get_all_positions()
-    if session.get('user_id'):
-        return render_template('applicant_portal_loggedin.html', positions=positions, logged_in=True)
-    return render_template('applicant_portal.html', positions=positions, logged_in=False)
+    """Route: Applicant Portal - Browse Jobs (served from cache until positions change)"""
+    version = storage.get_version('positions')
+    user_id = session.get('user_id')
+
+    def render():
+        positions = storage.get_all_positions()
+        job_list_html = render_cache.fragment(
+            ('job_list', version),
+            lambda: render_template('includes/job_list_partial.html', positions=positions))
+        if user_id:
+            return render_template('applicant_portal_loggedin.html', positions=positions,
+                                   job_list_html=job_list_html, logged_in=True)
+        return render_template('applicant_portal.html', positions=positions,
+                               job_list_html=job_list_html, logged_in=False)
+
+    if user_id:
+        # The logged-in layout shows the user's name, so it is revalidated but not shared
+        tag = render_cache.etag('applicant', version, user_id, session.get('user_name'))
+        return render_cache.conditional(tag, render)
+    return render_cache.conditional(render_cache.etag('applicant', version), render,
+                                    cache_key=('applicant', version))
+
+def _status_rate_limited():
+    """Returns (allowed, retry_after) for the requesting client's status lookups"""
+    return status_lookup.limiter.allow(request.remote_addr or 'unknown')
 
 @app.route('/application_status', methods=['GET', 'POST'])
 def application_status():
-    """Route: Check Application Status by ID"""
+    """Route: Check Application Status by ID (served from the status projection)"""
     candidate = None
     position = None
     error = None
     
     if request.method == 'POST':
+        allowed, retry_after = _status_rate_limited()
+        if not allowed:
+            error = f"Too many status checks. Please try again in {retry_after} seconds."
+            response = make_response(render_template('application_status.html', candidate=None,
+                                                     position=None, error=error), 429)
+            response.headers['Retry-After'] = str(retry_after)
+            return response
         application_id = request.form.get('application_id', '').strip()
         if application_id:
-            candidate = storage.get_candidate(application_id)
+            candidate = status_lookup.lookup(application_id)
             if candidate:
-                position_id = candidate.get('position_id')
-                if position_id:
-                    position = storage.get_position(position_id)
+                if candidate['position_title']:
+                    position = {"id": candidate['position_id'], "title": candidate['position_title']}
             else:
                 error = "Application not found. Please check your ID."
         else:
@@ -215,6 +327,28 @@ def application_status():
     
     return render_template('application_status.html', candidate=candidate, position=position, error=error)
 
+@app.route('/api/application_status/<candidate_id>')
+def api_application_status(candidate_id):
+    """API: Poll an application's status (ETag / If-None-Match aware)"""
+    allowed, retry_after = _status_rate_limited()
+    if not allowed:
+        response = jsonify({"success": False, "error": "Rate limit exceeded", "retry_after": retry_after})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+    status = status_lookup.lookup(candidate_id)
+    if status is None:
+        return jsonify({"success": False, "error": "Application not found"}), 404
+    data = {k: status[k] for k in ('id', 'status', 'updated_at', 'position_id', 'position_title')}
+    tag = render_cache.etag('application_status', data)
+    if request.if_none_match.contains(tag):
+        response = make_response('', 304)
+    else:
+        response = jsonify({"success": True, "data": data})
+    response.set_etag(tag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
 @app.route('/process_applicant/<position_id>', methods=['POST'])
 def process_applicant(position_id):
     """Action: Process applicant resume for a specific position"""
@@ -348,39 +482,82 @@ def process_analysis():
 @app.route('/dashboard')
 @app.route('/dashboard/<position_id>')
 def dashboard(position_id=None):
-    """Route: Candidate Table with Pandas DataFrame, filtered by position"""
+    """Route: Candidate Table served from the columnar candidate table, filtered by position"""
+    version = storage.get_version()
+    query_string = request.query_string.decode('utf-8', 'replace')
+    tag = render_cache.etag('dashboard', version, position_id, query_string)
+    return render_cache.conditional(tag, lambda: _render_dashboard(position_id),
+                                    cache_key=('dashboard', version, position_id, query_string))
+
+def _render_dashboard(position_id):
     positions = storage.get_all_positions()
-    
-    if position_id:
-        candidates = storage.get_candidates_by_position(position_id)
-        selected_position = storage.get_position(position_id)
-    else:
-        candidates = storage.get_all_candidates()
-        selected_position = None
-    
-    if candidates:
-        # Phase 5: Convert to pandas DataFrame for processing
-        df = pd.DataFrame(candidates)
-        
-        # Ensure 'skills' column exists and replace NaN with empty list
-        if 'skills' not in df.columns:
-            df['skills'] = None
-        
-        # Use apply to replace NaN/None with [] to avoid subscriptable error in template
-        df['skills'] = df['skills'].apply(lambda x: x if isinstance(x, list) else [])
-        
-        # Sort by final_rank_score descending
-        df = df.sort_values(by='final_rank_score', ascending=False)
-        
-        # Convert back to list of dicts for template
-        candidates = df.to_dict('records')
-    
+    selected_position = storage.get_position(position_id) if position_id else None
+
+    statuses = [s for s in request.args.get('status', '').split(',') if s.strip()] or None
+    sort_by = request.args.get('sort', 'final_rank_score')
+    if sort_by not in candidate_table.SORT_COLUMNS:
+        sort_by = 'final_rank_score'
+    candidates = candidate_table.get_table().query(
+        position_id=position_id,
+        statuses=statuses,
+        min_score=request.args.get('min_score', type=float),
+        max_score=request.args.get('max_score', type=float),
+        sort_by=sort_by,
+        descending=request.args.get('order', 'desc') != 'asc',
+    )
+
     return render_template('dashboard_new.html', candidates=candidates, positions=positions, selected_position=selected_position)
 
+@app.route('/dashboard/rows')
+def dashboard_rows():
+    """Fragment: Candidate table rows for live updates, in ?ids= order"""
+    ids = [i for i in request.args.get('ids', '').split(',') if i.strip()][:100]
+    candidates = [c for c in map(storage.get_candidate, ids) if c]
+    return render_template('includes/candidate_rows.html', candidates=candidates)
+
+@app.route('/events')
+def live_events():
+    """Stream: Server-Sent Events with coalesced candidate/status changes (?position= to filter)"""
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    if request.method == 'HEAD':
+        # No body is sent, so no stream slot is taken
+        return Response(mimetype='text/event-stream', headers=headers)
+    # Overview counters come from the HR-only overview page
+    subscriber = live_updates.subscribe(request.args.get('position') or None, overview=bool(session.get('is_hr')))
+    if subscriber is None:
+        return Response("Too many live update streams", status=503, headers={'Retry-After': '30'})
+    response = Response(live_updates.stream(subscriber), mimetype='text/event-stream', headers=headers)
+    # The stream's own cleanup only runs if its body was iterated; closing the response always runs
+    response.call_on_close(lambda: live_updates.unsubscribe(subscriber))
+    return response
+
+@app.route('/export/<position_id>.csv', defaults={'fmt': 'csv'})
+@app.route('/export/<position_id>.jsonl', defaults={'fmt': 'jsonl'})
+@hr_required
+def export_candidates(position_id, fmt):
+    """Action: Stream a position's candidates as CSV or JSON Lines"""
+    position = storage.get_position(position_id)
+    if not position:
+        return "Position not found", 404
+
+    columns = export.parse_columns(request.args.get('columns'))
+    statuses = [s for s in request.args.get('status', '').split(',') if s.strip()] or None
+    min_score = request.args.get('min_score', type=float)
+    max_score = request.args.get('max_score', type=float)
+
+    candidates = export.filter_candidates(
+        storage.iter_candidates_by_position(position_id), statuses, min_score, max_score)
+    filename = secure_filename(position.get('title') or position_id) or position_id
+    return Response(
+        export.iter_export(fmt, candidates, columns),
+        mimetype=export.EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{fmt}"'},
+    )
+
 @app.route('/candidate/<candidate_id>')
 def candidate_detail(candidate_id):
-    """Route: Detailed Result"""
-    candidate = storage.get_candidate(candidate_id)
+    """Route: Detailed Result (live store first, then the archive)"""
+    candidate = storage.get_candidate(candidate_id) or archive.get_candidate(candidate_id)
     if not candidate:
         return "Candidate not found", 404
     return render_template('results.html', candidate=candidate)
@@ -415,8 +592,73 @@ def update_status(candidate_id):
     # Redirect back to previous page if possible, otherwise dashboard
     return redirect(request.referrer or url_for('dashboard'))
 
+CANDIDATE_STATUSES = ('Pending', 'Accepted', 'Rejected')
+
+@app.route('/api/candidates/status', methods=['POST'])
+@hr_required
+def bulk_update_status():
+    """API: Set the status of many candidates, by ID list or by filter, in one transaction"""
+    data = request.get_json(silent=True) or {}
+    status = next((s for s in CANDIDATE_STATUSES if s.lower() == str(data.get('status', '')).lower()), None)
+    if status is None:
+        return jsonify({"success": False, "error": f"status must be one of {', '.join(CANDIDATE_STATUSES)}"}), 400
+
+    from_statuses = None
+    if data.get('ids') is not None:
+        ids = data['ids']
+        if not isinstance(ids, list) or not all(isinstance(i, str) for i in ids):
+            return jsonify({"success": False, "error": "ids must be a list of candidate IDs"}), 400
+    elif isinstance(data.get('filter'), dict):
+        # e.g. {"position_id": "...", "status": "pending", "max_score": 4}
+        criteria = data['filter']
+        from_statuses = criteria.get('status')
+        if isinstance(from_statuses, str):
+            from_statuses = [from_statuses]
+        if from_statuses is not None and (not isinstance(from_statuses, list)
+                                          or not all(isinstance(s, str) for s in from_statuses)):
+            return jsonify({"success": False, "error": "filter.status must be a status or a list of statuses"}), 400
+        position_id = criteria.get('position_id')
+        if position_id is not None and not isinstance(position_id, str):
+            return jsonify({"success": False, "error": "filter.position_id must be a position ID"}), 400
+        try:
+            min_score = float(criteria['min_score']) if criteria.get('min_score') is not None else None
+            max_score = float(criteria['max_score']) if criteria.get('max_score') is not None else None
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "error": "min_score/max_score must be numbers"}), 400
+        matches = candidate_table.get_table().query(position_id=position_id, statuses=from_statuses,
+                                                   min_score=min_score, max_score=max_score)
+        ids = [c.id for c in matches]
+    else:
+        return jsonify({"success": False, "error": "Provide either 'ids' or 'filter'"}), 400
+
+    # from_statuses is re-checked inside the transaction, in case a status changed since the query
+    counts = storage.update_candidates_status(ids, status, from_statuses=from_statuses)
+    counts['status'] = status
+    counts['overview'] = candidate_table.get_table().overview_stats()
+    return jsonify({"success": True, "data": counts})
+
+@app.route('/admin/profiles')
+@hr_required
+def profiles():
+    """Route: Slowest captured request profiles"""
+    directory = app.config['PROFILE_DIR']
+    captures = profiler.list_captures(directory)
+    selected = profiler.get_capture(directory, request.args.get('id', ''))
+    return render_template('profiles.html', captures=captures, selected=selected,
+                           enabled=app.config['PROFILE_ENABLED'])
+
 # --- API Routes for Programmatic Access (Optional) ---
 
+@app.route('/api/positions/<position_id>/analytics')
+@hr_required
+def api_position_analytics(position_id):
+    """API: Cached score, skill, university tier and time-to-decision aggregates"""
+    position = storage.get_position(position_id)
+    if not position:
+        return jsonify({"success": False, "error": "Position not found"}), 404
+    data = dict(analytics.get_position_analytics(position_id), title=position.get('title'))
+    return jsonify({"success": True, "data": data})
+
 @app.route('/api/analyze', methods=['POST'])
 def api_analyze():
     data = request.json
@@ -437,6 +679,62 @@ def api_analyze():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/ranking', methods=['POST'])
+@hr_required
+def api_ranking():
+    """API: Score many resumes (JSON {candidates: [...]}) and return the top K.
+    position_id ranks against that position and, by default, its stored candidates;
+    job_description overrides the JD; persist saves the scored resumes; stream sends NDJSON."""
+    data = request.get_json(silent=True) or {}
+    items = data.get('candidates') or []
+    if not isinstance(items, list):
+        return jsonify({"success": False, "error": "candidates must be a list"}), 400
+    if len(items) > ranking.MAX_RESUMES:
+        return jsonify({"success": False, "error": f"At most {ranking.MAX_RESUMES} candidates per request"}), 400
+    try:
+        top_k = int(data.get('top_k', ranking.DEFAULT_TOP_K))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "top_k must be an integer"}), 400
+    top_k = min(max(top_k, 1), ranking.MAX_TOP_K)
+
+    position_id = data.get('position_id') or None
+    position = storage.get_position(position_id) if position_id else None
+    if position_id and not position:
+        return jsonify({"success": False, "error": "Position not found"}), 404
+    include_existing = bool(position) and bool(data.get('include_existing', True))
+    if not items and not include_existing:
+        return jsonify({"success": False, "error": "No candidates to rank"}), 400
+    job_description = data.get('job_description') or (
+        position.get('description', '') if position else storage.get_job_description())
+
+    events = ranking.rank(items, job_description, use_ai=bool(data.get('use_ai')), top_k=top_k,
+                          position_id=position_id, include_existing=include_existing,
+                          persist=bool(data.get('persist')))
+    if data.get('stream'):
+        return Response((json.dumps(event) + "\n" for event in events), mimetype='application/x-ndjson')
+    result = list(events)[-1]
+    return jsonify({"success": True, "data": result["data"], "scored": result["scored"],
+                    "existing": result["existing"], "errors": result["errors"]})
+
+# ============ Preload ============
+
+def preload():
+    """Loads lazily imported dependencies, compiles templates and builds the
+    in-memory candidate table and analytics up front. With gunicorn --preload
+    this runs once in the master, and forked workers share the result copy-on-write."""
+    start = time.perf_counter()
+    agent.preload()
+    pdf_utils.preload()
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+    candidate_table.get_table().rebuild()
+    analytics.warm()
+    print(f"Preloaded dependencies and caches in {time.perf_counter() - start:.2f}s")
+
+# APP_PRELOAD=true gunicorn --preload -w 4 app:app
+if os.getenv('APP_PRELOAD', 'false').lower() == 'true':
+    preload()
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=True)
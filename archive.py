@@ -0,0 +1,412 @@
+"""
+Archive Tier
+Moves cold candidates out of the live store into compressed, immutable
+segment files, so partitions, the candidate table and dashboard/overview
+queries only ever see the hot set. A candidate is cold when it is older
+than ARCHIVE_MAX_AGE_DAYS, rejected for longer than
+ARCHIVE_REJECTED_AGE_DAYS, or belongs to a closed position.
+
+Layout:
+    DATA_DIR/archive/<YYYY-MM>/<segment>.seg   segments, by application month
+    DATA_DIR/archive/index.jsonl               candidate id -> segment, offset
+
+A segment is a header followed by length-prefixed, zlib-compressed records
+(serialized like the store files). Segments are never modified; they are
+read through a shared read-only memory map, so looking up one candidate
+decompresses only that record. The index is a small append-only log that
+also carries the status projection of storage's candidate index (name,
+status, position, dates, scores), so search and status lookups never open
+a segment.
+
+Deleting an archived candidate (or its position) appends a tombstone
+({"id", "d": 1, "g": segment}) to the index and replaces the affected
+segments with copies without the candidate, so deleted applicant data
+leaves the disk.
+
+Usage:
+    python archive.py run [--max-age-days N] [--rejected-age-days N] [--dry-run]
+    python archive.py get <candidate_id>
+    python archive.py search [--name TEXT] [--position-id ID] [--status STATUS] [--limit N]
+    python archive.py close <position_id> | reopen <position_id>
+    python archive.py stats
+    python archive.py reindex                       # rebuild index.jsonl from the segments
+    python archive.py purge                         # finish rewriting segments with deleted candidates
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import serializers
+import storage
+from candidate_model import CandidateRecord
+
+MAX_AGE_DAYS = int(os.getenv("ARCHIVE_MAX_AGE_DAYS", "365"))
+REJECTED_AGE_DAYS = int(os.getenv("ARCHIVE_REJECTED_AGE_DAYS", "90"))
+
+SEGMENT_MAGIC = b"HRSG"
+SEGMENT_VERSION = 1
+_HEADER = SEGMENT_MAGIC + bytes((SEGMENT_VERSION,))
+_LENGTH = struct.Struct(">I")
+UNDATED = "undated"
+
+_lock = threading.Lock()
+
+
+def archive_dir() -> str:
+    return os.path.join(storage.DATA_DIR, "archive")
+
+
+def _index_path() -> str:
+    return os.path.join(archive_dir(), "index.jsonl")
+
+
+# ============ Selection ============
+
+def _timestamp(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_cold(candidate, now: datetime, closed_positions: set,
+            max_age_days: int = MAX_AGE_DAYS, rejected_age_days: int = REJECTED_AGE_DAYS) -> bool:
+    """True if a candidate belongs in the archive (age limits <= 0 are disabled)"""
+    if (candidate.get("position_id") or "") in closed_positions:
+        return True
+    created = _timestamp(candidate.get("created_at"))
+    if created is not None and max_age_days > 0 and now - created > timedelta(days=max_age_days):
+        return True
+    if rejected_age_days > 0 and (candidate.get("status") or "").strip().lower() == "rejected":
+        decided = _timestamp(candidate.get("status_updated_at")) or created
+        if decided is not None and now - decided > timedelta(days=rejected_age_days):
+            return True
+    return False
+
+
+# ============ Segments ============
+
+def _month(candidate) -> str:
+    created = _timestamp(candidate.get("created_at"))
+    return created.strftime("%Y-%m") if created else UNDATED
+
+
+def _index_line(candidate: Dict, segment: str, offset: int, length: int) -> Dict:
+    """Segment location plus the same projection as storage's candidate index"""
+    line = {"id": candidate["id"], "g": segment, "o": offset, "l": length,
+            "p": candidate.get("position_id") or "", "u": candidate.get("user_id") or ""}
+    for key, field in storage.PROJECTION_FIELDS.items():
+        value = candidate.get(field)
+        if value is not None:
+            line[key] = value
+    return line
+
+
+def _write_segment(month: str, candidates: List[Dict]) -> List[Dict]:
+    """Writes one immutable segment and returns its index lines"""
+    name = f"{month}/{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.seg"
+    path = os.path.join(archive_dir(), name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lines = []
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER)
+        for candidate in candidates:
+            blob = zlib.compress(serializers.encode(candidate))
+            f.write(_LENGTH.pack(len(blob)))
+            lines.append(_index_line(candidate, name, f.tell(), len(blob)))
+            f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return lines
+
+
+def _iter_segment(segment: str) -> Iterator[Tuple[int, int, Dict]]:
+    """Yields (offset, length, candidate) for every record of a segment"""
+    view = _segment_view(segment)
+    if view[:len(_HEADER)] != _HEADER:
+        raise ValueError(f"{segment} is not an archive segment")
+    offset = len(_HEADER)
+    while offset < len(view):
+        (length,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        yield offset, length, _decode(view, offset, length)
+        offset += length
+
+
+def _decode(view, offset: int, length: int) -> Dict:
+    return serializers.decode(zlib.decompress(view[offset:offset + length]))
+
+
+# Segments never change, so one read-only map per segment is kept open and
+# shared (through the page cache) by every worker process
+_maps: Dict[str, mmap.mmap] = {}
+
+
+def _segment_view(segment: str) -> mmap.mmap:
+    path = os.path.join(archive_dir(), segment)
+    view = _maps.get(path)
+    if view is None:
+        with open(path, "rb") as f:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _maps[path] = view
+    return view
+
+
+# ============ Index ============
+
+# dead: segment -> IDs deleted from it (from the index's tombstones)
+_index_cache = {"key": None, "entries": {}, "dead": {}}
+
+
+def _append_index(lines: List[Dict]):
+    if not lines:
+        return
+    os.makedirs(archive_dir(), exist_ok=True)
+    with open(_index_path(), "a") as f:
+        f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _file_key(path: str):
+    try:
+        st = os.stat(path)
+        return st.st_ino, st.st_mtime_ns, st.st_size
+    except FileNotFoundError:
+        return None
+
+
+def _load_index() -> Dict[str, Dict]:
+    """Returns {candidate id: entry}, re-read only when the index file changed"""
+    key = _file_key(_index_path())
+    with _lock:
+        if key != _index_cache["key"]:
+            entries = {}
+            dead: Dict[str, set] = {}
+            if key is not None:
+                with open(_index_path(), "rb") as f:
+                    data = f.read()
+                for line in data[:data.rfind(b"\n") + 1].splitlines():
+                    if line.strip():
+                        entry = json.loads(line)
+                        if entry.get("d"):
+                            entries.pop(entry["id"], None)
+                            dead.setdefault(entry["g"], set()).add(entry["id"])
+                        else:
+                            entries[entry.pop("id")] = entry
+            _index_cache.update(key=key, entries=entries, dead=dead)
+        return _index_cache["entries"]
+
+
+def get_index_entry(candidate_id: str) -> Optional[Dict]:
+    """Returns an archived candidate's index entry (same projection keys as storage's index)"""
+    return _load_index().get(candidate_id)
+
+
+def reindex() -> int:
+    """Rebuilds index.jsonl from the segments on disk; returns the number of candidates.
+    Tombstones are kept, so deleted candidates stay deleted."""
+    _load_index()
+    tombstones = [{"id": cid, "d": 1, "g": segment}
+                  for segment, ids in _index_cache["dead"].items() for cid in sorted(ids)]
+    deleted = {line["id"] for line in tombstones}
+    lines = []
+    root = archive_dir()
+    for month in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+        if not os.path.isdir(os.path.join(root, month)):
+            continue
+        for name in sorted(os.listdir(os.path.join(root, month))):
+            if name.endswith(".seg"):
+                segment = f"{month}/{name}"
+                lines += [_index_line(c, segment, o, n) for o, n, c in _iter_segment(segment)
+                          if c["id"] not in deleted]
+    tmp_path = f"{_index_path()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines + tombstones))
+    os.replace(tmp_path, _index_path())
+    return len(lines)
+
+
+# ============ Deletion ============
+
+def _purge_segments(segments) -> int:
+    """Replaces segments by copies without their deleted candidates (hold
+    storage.write_lock()); returns the number of records dropped"""
+    dropped = 0
+    for segment in sorted(segments):
+        path = os.path.join(archive_dir(), segment)
+        if not os.path.exists(path):
+            continue
+        entries = _load_index()
+        records = [c for _, _, c in _iter_segment(segment)]
+        live = [c for c in records if entries.get(c["id"], {}).get("g") == segment]
+        if live:
+            _append_index(_write_segment(segment.split("/", 1)[0], live))
+        _maps.pop(path, None)
+        os.remove(path)
+        dropped += len(records) - len(live)
+    return dropped
+
+
+def forget(candidate_ids: List[str]) -> List[str]:
+    """Deletes archived candidates: tombstones them in the index, then rewrites
+    their segments without them. Called by storage's delete paths under its
+    write lock. Returns the IDs that were archived."""
+    entries = _load_index()
+    lines = [{"id": cid, "d": 1, "g": entries[cid]["g"]} for cid in candidate_ids if cid in entries]
+    if not lines:
+        return []
+    # The tombstones hide the candidates at once; purge() finishes a rewrite cut short
+    _append_index(lines)
+    _purge_segments({line["g"] for line in lines})
+    return [line["id"] for line in lines]
+
+
+def forget_position(position_id: str) -> List[str]:
+    """Deletes every archived candidate of a position"""
+    return forget([cid for cid, entry in _load_index().items() if entry["p"] == position_id])
+
+
+def purge() -> int:
+    """Rewrites any segment still holding deleted candidates; returns the records dropped"""
+    with storage.write_lock():
+        _load_index()
+        return _purge_segments(list(_index_cache["dead"]))
+
+
+def candidates_by_user(user_id: str) -> List[CandidateRecord]:
+    """Returns a user's archived applications"""
+    ids = [cid for cid, entry in _load_index().items() if entry.get("u") == user_id]
+    return [record for record in map(get_candidate, ids) if record is not None]
+
+
+# ============ Public API ============
+
+def archive_cold(max_age_days: int = MAX_AGE_DAYS, rejected_age_days: int = REJECTED_AGE_DAYS,
+                 now: Optional[datetime] = None, dry_run: bool = False) -> Dict:
+    """Moves cold candidates from the live store into new archive segments"""
+    now = now or datetime.now()
+    closed = {p["id"] for p in storage.get_all_positions() if p.get("closed")}
+
+    def cold(candidate) -> bool:
+        return is_cold(candidate, now, closed, max_age_days, rejected_age_days)
+
+    if dry_run:
+        matches = [c for c in storage.get_all_candidates() if cold(c)]
+        return {"archived": len(matches), "segments": 0, "dry_run": True}
+
+    written = []
+
+    def write(candidates: List[Dict]):
+        by_month: Dict[str, List[Dict]] = {}
+        for candidate in candidates:
+            by_month.setdefault(_month(candidate), []).append(candidate)
+        lines = []
+        for month, members in sorted(by_month.items()):
+            lines += _write_segment(month, members)
+            written.append(month)
+        # Segments are durable before the index names them, and the index
+        # before the store forgets the candidates
+        _append_index(lines)
+
+    moved = storage.move_candidates_out(cold, write)
+    return {"archived": len(moved), "segments": len(written), "dry_run": False}
+
+
+def get_candidate(candidate_id: str) -> Optional[CandidateRecord]:
+    """Reads one archived candidate (decompressing only its record)"""
+    entry = get_index_entry(candidate_id)
+    if entry is None:
+        return None
+    return CandidateRecord(_decode(_segment_view(entry["g"]), entry["o"], entry["l"]))
+
+
+def search(name: Optional[str] = None, position_id: Optional[str] = None,
+           status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+    """Searches the archive index (name substring, position, status); newest first"""
+    name = name.lower() if name else None
+    status = status.lower() if status else None
+    matches = []
+    for candidate_id, entry in _load_index().items():
+        if position_id is not None and entry["p"] != position_id:
+            continue
+        if status is not None and (entry.get("s") or "pending").lower() != status:
+            continue
+        if name is not None and name not in (entry.get("n") or "").lower():
+            continue
+        matches.append({"id": candidate_id, "name": entry.get("n"), "position_id": entry["p"] or None,
+                        "status": entry.get("s"), "created_at": entry.get("c"),
+                        "final_rank_score": entry.get("f")})
+    matches.sort(key=lambda m: m["created_at"] or "", reverse=True)
+    return matches[:limit]
+
+
+def stats() -> Dict:
+    entries = _load_index()
+    segments = {entry["g"] for entry in entries.values()}
+    size = sum(os.path.getsize(os.path.join(archive_dir(), s)) for s in segments
+               if os.path.exists(os.path.join(archive_dir(), s)))
+    return {"candidates": len(entries), "segments": len(segments), "bytes": size}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive tier for cold candidates.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="move cold candidates into the archive")
+    p.add_argument("--max-age-days", type=int, default=MAX_AGE_DAYS, help="archive anything older (0 = never)")
+    p.add_argument("--rejected-age-days", type=int, default=REJECTED_AGE_DAYS,
+                   help="archive candidates rejected for longer (0 = never)")
+    p.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+    sub.add_parser("get").add_argument("candidate_id")
+    p = sub.add_parser("search")
+    p.add_argument("--name")
+    p.add_argument("--position-id")
+    p.add_argument("--status")
+    p.add_argument("--limit", type=int, default=50)
+    sub.add_parser("close", help="close a position (its candidates get archived)").add_argument("position_id")
+    sub.add_parser("reopen").add_argument("position_id")
+    sub.add_parser("stats")
+    sub.add_parser("reindex")
+    sub.add_parser("purge", help="rewrite segments that still hold deleted candidates")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        result = archive_cold(args.max_age_days, args.rejected_age_days, dry_run=args.dry_run)
+    elif args.command == "get":
+        record = get_candidate(args.candidate_id)
+        if record is None:
+            print(f"{args.candidate_id} is not archived.", file=sys.stderr)
+            return 1
+        result = record.to_dict()
+    elif args.command == "search":
+        result = search(args.name, args.position_id, args.status, args.limit)
+    elif args.command in ("close", "reopen"):
+        if storage.get_position(args.position_id) is None:
+            print(f"Position {args.position_id} not found.", file=sys.stderr)
+            return 1
+        storage.set_position_closed(args.position_id, args.command == "close")
+        result = {"position_id": args.position_id, "closed": args.command == "close"}
+    elif args.command == "stats":
+        result = stats()
+    elif args.command == "purge":
+        result = {"dropped": purge()}
+    else:
+        result = {"reindexed": reindex()}
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
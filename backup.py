@@ -0,0 +1,308 @@
+"""
+Hot Backups
+Consistent point-in-time snapshots and incremental backups of DATA_DIR,
+taken while the app keeps serving requests.
+
+Store files are only ever replaced atomically or appended to (see storage.py
+and blob_store.py), so a snapshot does not need to copy anything while
+writers are held off. It takes storage's write lock and the resume store's
+lock (both flocks, so writers in every process wait), hard-links every file
+into DATA_DIR/.snapshots/<id>/ and records each file's size, then lets
+writers continue. Replaced files keep their old inode alive through the
+link, and appended files are copied only up to the recorded size, so the
+copy made afterwards is exactly the store as of the capture. Holding the
+locks costs one link() per file (a few milliseconds).
+
+Backups go to BACKUP_DIR/<id>/: the captured files under files/ and a
+manifest.json (written last, so a backup without one is incomplete) with
+each file's size, SHA-256 and the parts it is rebuilt from. An incremental
+backup stores only what changed since the latest backup: unchanged files
+point at earlier backups, and append-only logs whose old content is intact
+store just their new tail. A restore therefore needs the backups an
+incremental one builds on.
+
+Usage:
+    python backup.py snapshot <dest>                  # a consistent copy, usable as DATA_DIR
+    python backup.py backup [--incremental]
+    python backup.py list
+    python backup.py restore <backup_id> [--target DIR]   # stop the app first
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import storage
+
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+
+_CHUNK = 1024 * 1024
+_SKIP_DIRS = {".snapshots", "ocr_cache"}     # staging area; OCR results are a rebuildable cache
+_SKIP_FILES = {".write.lock", "lock"}
+
+
+def _snapshots_dir() -> str:
+    return os.path.join(storage.DATA_DIR, ".snapshots")
+
+
+# ============ Capture ============
+
+def _capture() -> Tuple[str, Dict[str, Dict], float]:
+    """Hard-links every store file into a staging directory while writers are
+    held off. Returns (staging dir, {relative path: {size, inode, mtime}}, seconds locked)."""
+    staging = os.path.join(_snapshots_dir(), uuid.uuid4().hex)
+    files = {}
+    with storage.write_lock(), storage.resume_store().locked():
+        start = time.perf_counter()
+        for root, dirs, names in os.walk(storage.DATA_DIR):
+            if root == storage.DATA_DIR:
+                dirs[:] = [d for d in dirs if d not in _SKIP_DIRS]
+            for name in names:
+                if name.endswith(".tmp") or name in _SKIP_FILES:
+                    continue
+                source = os.path.join(root, name)
+                rel = os.path.relpath(source, storage.DATA_DIR)
+                link = os.path.join(staging, rel)
+                try:
+                    st = os.stat(source)
+                except FileNotFoundError:
+                    continue
+                os.makedirs(os.path.dirname(link), exist_ok=True)
+                try:
+                    os.link(source, link)
+                except FileNotFoundError:
+                    continue
+                except OSError:
+                    shutil.copyfile(source, link)   # filesystem without hard links
+                files[rel] = {"size": st.st_size, "inode": st.st_ino, "mtime": st.st_mtime_ns}
+        held = time.perf_counter() - start
+    return staging, files, held
+
+
+def _captured_size(path: str, rel: str, size: int) -> int:
+    """Bytes of a captured file to keep. JSON-lines files are cut back to their
+    last complete line, so a torn append is never carried into a backup."""
+    if not rel.endswith(".jsonl"):
+        return size
+    with open(path, "rb") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - _CHUNK)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def _read_range(source: str, start: int, end: int, out=None, digest=None):
+    """Streams bytes [start, end) of source into out and/or digest"""
+    with open(source, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(_CHUNK, remaining))
+            if not block:
+                raise ValueError(f"{source} is shorter than expected")
+            if digest is not None:
+                digest.update(block)
+            if out is not None:
+                out.write(block)
+            remaining -= len(block)
+
+
+def _write_range(source: str, dest: str, start: int, end: int, digest=None):
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    with open(dest, "wb") as out:
+        _read_range(source, start, end, out, digest)
+        out.flush()
+        os.fsync(out.fileno())
+
+
+# ============ Snapshots ============
+
+def snapshot(dest: str) -> Dict:
+    """Writes a consistent copy of DATA_DIR to dest (an empty or new directory)"""
+    if os.path.isdir(dest) and os.listdir(dest):
+        raise ValueError(f"{dest} is not empty")
+    staging, captured, held = _capture()
+    total = 0
+    try:
+        for rel, info in captured.items():
+            link = os.path.join(staging, rel)
+            size = _captured_size(link, rel, info["size"])
+            _write_range(link, os.path.join(dest, rel), 0, size)
+            total += size
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return {"path": dest, "files": len(captured), "bytes": total, "lock_ms": round(held * 1000, 3)}
+
+
+# ============ Backups ============
+
+def _manifest_path(backup_id: str) -> str:
+    return os.path.join(BACKUP_DIR, backup_id, "manifest.json")
+
+
+def load_manifest(backup_id: str) -> Dict:
+    try:
+        with open(_manifest_path(backup_id)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"Backup {backup_id} not found (or incomplete)") from None
+
+
+def list_backups() -> List[Dict]:
+    """Returns the summaries of all complete backups, oldest first"""
+    if not os.path.isdir(BACKUP_DIR):
+        return []
+    backups = []
+    for backup_id in os.listdir(BACKUP_DIR):
+        if os.path.exists(_manifest_path(backup_id)):
+            manifest = load_manifest(backup_id)
+            backups.append({key: manifest[key] for key in ("id", "created_at", "kind", "base", "files_count",
+                                                          "bytes", "stored_bytes")})
+    return sorted(backups, key=lambda b: (b["created_at"], b["id"]))
+
+
+def _store_file(link: str, dest: str, backup_id: str, size: int, info: Dict,
+                previous: Optional[Dict]) -> Tuple[Dict, int]:
+    """Backs up one captured file; returns (manifest entry, bytes stored). Unchanged
+    files reuse the previous backup's parts; grown files whose old content is
+    intact store only the new tail."""
+    entry = {"size": size, "inode": info["inode"], "mtime": info["mtime"]}
+    if previous is not None:
+        if (previous["inode"], previous["mtime"], previous["size"]) == (info["inode"], info["mtime"], size):
+            return {**entry, "sha256": previous["sha256"], "parts": previous["parts"]}, 0
+        if 0 < previous["size"] <= size:
+            digest = hashlib.sha256()
+            _read_range(link, 0, previous["size"], digest=digest)
+            if digest.hexdigest() == previous["sha256"]:
+                parts = list(previous["parts"])
+                if size > previous["size"]:
+                    _write_range(link, dest, previous["size"], size, digest)
+                    parts.append({"backup": backup_id, "from": 0, "length": size - previous["size"]})
+                return {**entry, "sha256": digest.hexdigest(), "parts": parts}, size - previous["size"]
+    digest = hashlib.sha256()
+    _write_range(link, dest, 0, size, digest)
+    return {**entry, "sha256": digest.hexdigest(), "parts": [{"backup": backup_id, "from": 0, "length": size}]}, size
+
+
+def backup(incremental: bool = False) -> Dict:
+    """Backs up DATA_DIR into BACKUP_DIR; incremental backups build on the latest one.
+    Returns the backup's summary."""
+    existing = list_backups()
+    base = load_manifest(existing[-1]["id"]) if incremental and existing else None
+    now = datetime.now()
+    backup_id = f"{now.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    directory = os.path.join(BACKUP_DIR, backup_id)
+
+    staging, captured, held = _capture()
+    files = {}
+    stored = 0
+    try:
+        for rel, info in sorted(captured.items()):
+            link = os.path.join(staging, rel)
+            size = _captured_size(link, rel, info["size"])
+            previous = base["files"].get(rel) if base else None
+            files[rel], written = _store_file(link, os.path.join(directory, "files", rel), backup_id,
+                                              size, info, previous)
+            stored += written
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    manifest = {
+        "id": backup_id,
+        "created_at": now.isoformat(),
+        "kind": "incremental" if base else "full",
+        "base": base["id"] if base else None,
+        "files_count": len(files),
+        "bytes": sum(entry["size"] for entry in files.values()),
+        "stored_bytes": stored,
+        "lock_ms": round(held * 1000, 3),
+        "files": files,
+    }
+    # The manifest marks the backup complete, so it is written last and atomically
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{_manifest_path(backup_id)}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, _manifest_path(backup_id))
+    return {key: value for key, value in manifest.items() if key != "files"}
+
+
+# ============ Restore ============
+
+def restore(backup_id: str, target: Optional[str] = None) -> Dict:
+    """Rebuilds a backup into target (default DATA_DIR), checking every file's
+    SHA-256 before anything is replaced. An existing target is kept as
+    <target>.pre-restore-<timestamp>. Stop the app (and other writers) first."""
+    manifest = load_manifest(backup_id)
+    target = (target or storage.DATA_DIR).rstrip(os.sep)
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    staging = f"{target}.restore-{stamp}"
+    try:
+        for rel, entry in manifest["files"].items():
+            path = os.path.join(staging, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            digest = hashlib.sha256()
+            with open(path, "wb") as out:
+                for part in entry["parts"]:
+                    source = os.path.join(BACKUP_DIR, part["backup"], "files", rel)
+                    if not os.path.exists(source):
+                        raise ValueError(f"Backup {part['backup']} (needed for {rel}) is missing")
+                    _read_range(source, part["from"], part["from"] + part["length"], out, digest)
+            if digest.hexdigest() != entry["sha256"]:
+                raise ValueError(f"Checksum mismatch for {rel} in backup {backup_id}")
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    previous = None
+    if os.path.exists(target):
+        previous = f"{target}.pre-restore-{stamp}"
+        os.rename(target, previous)
+    os.rename(staging, target)
+    return {"id": backup_id, "target": target, "files": len(manifest["files"]), "previous": previous}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hot snapshots, backups and restore of the data store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("snapshot", help="write a consistent copy of DATA_DIR").add_argument("dest")
+    p = sub.add_parser("backup", help=f"back up DATA_DIR into BACKUP_DIR ({BACKUP_DIR})")
+    p.add_argument("--incremental", action="store_true", help="store only changes since the latest backup")
+    sub.add_parser("list")
+    p = sub.add_parser("restore", help="replace DATA_DIR with a backup (stop the app first)")
+    p.add_argument("backup_id")
+    p.add_argument("--target", help="directory to restore into (default DATA_DIR)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "snapshot":
+            result = snapshot(args.dest)
+        elif args.command == "backup":
+            result = backup(args.incremental)
+        elif args.command == "list":
+            result = list_backups()
+        else:
+            result = restore(args.backup_id, args.target)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
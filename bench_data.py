@@ -0,0 +1,184 @@
+"""
+Synthetic Data Generator for Benchmarks
+Builds deterministic positions, users, candidates, resume texts and PDFs
+so benchmark runs are reproducible between releases.
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+FIRST_NAMES = ["Aarav", "Alice", "Bob", "Chen", "Diana", "Elena", "Farid", "Grace", "Hiro", "Isha",
+               "James", "Kavya", "Liam", "Maya", "Noah", "Olivia", "Priya", "Rahul", "Sara", "Tomas"]
+LAST_NAMES = ["Sharma", "White", "Smith", "Wang", "Garcia", "Ivanova", "Khan", "Lee", "Tanaka", "Patel",
+              "Brown", "Nair", "Murphy", "Cohen", "Okafor", "Rossi", "Iyer", "Gupta", "Silva", "Novak"]
+UNIVERSITIES = ["Stanford University", "IIT Bombay", "NIT Trichy", "University of Michigan",
+                "Georgia Tech", "State University of New York", "Pune Institute of Technology",
+                "Delhi College of Engineering", "University of Leeds", "Carnegie Mellon University"]
+TITLES = ["Backend Engineer", "Data Scientist", "ML Engineer", "Platform Engineer", "Python Developer",
+          "Full Stack Developer", "Data Engineer", "SRE", "Analytics Engineer", "AI Researcher"]
+SKILLS = ["Python", "Django", "Flask", "FastAPI", "Pandas", "NumPy", "PyTorch", "TensorFlow",
+          "SQL", "PostgreSQL", "Redis", "Docker", "Kubernetes", "AWS", "GCP", "React", "Go", "Git"]
+IMPACT = ["Led", "Managed", "Scaled", "Optimized", "Architected", "Delivered", "Built", "Maintained"]
+STATUSES = ["pending", "pending", "pending", "accepted", "rejected"]
+
+
+def make_resume_text(rng: random.Random, name: str, university: str) -> str:
+    """Returns a plain-text resume of realistic length (~1.5KB)"""
+    years = rng.randint(0, 12)
+    skills = rng.sample(SKILLS, rng.randint(3, 10))
+    lines = [
+        name,
+        f"{rng.choice(TITLES)} | {name.split()[0].lower()}@example.com | +1 555 {rng.randint(1000, 9999)}",
+        university,
+        f"B.Tech in Computer Science, {2024 - years - 4}",
+        f"Summary: {years} years experience building production systems with {', '.join(skills[:3])}.",
+        "Experience",
+    ]
+    for job in range(rng.randint(2, 4)):
+        lines.append(f"{rng.choice(TITLES)} at Company{rng.randint(1, 500)} ({rng.randint(1, 4)} years)")
+        for _ in range(rng.randint(3, 5)):
+            lines.append(f"- {rng.choice(IMPACT)} a {rng.choice(skills)} service handling "
+                         f"{rng.randint(1, 900)}k requests per day and reduced latency by {rng.randint(5, 70)}%.")
+    lines.append("Skills")
+    lines.append(", ".join(skills))
+    return "\n".join(lines)
+
+
+def make_dataset(positions: int, candidates: int, users: int = 0, seed: int = 42) -> Dict:
+    """Returns a full data store document with the requested number of records"""
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 15, 12, 0, 0)
+
+    position_list = []
+    for i in range(positions):
+        title = f"{rng.choice(TITLES)} {i + 1}"
+        position_list.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "title": title,
+            "description": f"We are hiring a {title} with strong Python, SQL and cloud skills. "
+                           f"{rng.randint(2, 6)}+ years of experience required.",
+        })
+
+    user_list = []
+    for i in range(users):
+        user_list.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "username": f"user{i}",
+            "password": "pbkdf2:sha256:benchmark",
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "email": f"user{i}@example.com",
+            "created_at": (now - timedelta(days=rng.randint(0, 365))).isoformat(),
+        })
+
+    candidate_list = [make_candidate(rng, position_list, user_list, now) for _ in range(candidates)]
+    return {"positions": position_list, "candidates": candidate_list, "users": user_list}
+
+
+def make_candidate(rng: random.Random, positions: List[Dict], users: List[Dict], now: datetime) -> Dict:
+    """Returns one stored candidate record shaped like the analyzer output"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    university = rng.choice(UNIVERSITIES)
+    python_score = rng.randint(0, 10)
+    experience_score = round(rng.uniform(0, 10), 1)
+    uni_tier_score = rng.choice([5, 8, 10])
+    evidence = f"Found {rng.randint(0, 10)} Python-related keywords."
+    candidate = {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "name": name,
+        "university": university,
+        "skills": rng.sample(SKILLS, rng.randint(2, 8)),
+        "uni_tier_score": uni_tier_score,
+        "uni_evidence": "Standard University tier.",
+        "python_score": python_score,
+        "python_evidence": evidence,
+        "evidence_quote": evidence,
+        "experience_score": experience_score,
+        "experience_evidence": f"Detected {rng.randint(0, 12)} years total experience.",
+        "python_experience_years": float(rng.randint(0, 10)),
+        "final_rank_score": round(python_score * 0.5 + experience_score * 0.3 + uni_tier_score * 0.2, 2),
+        "analysis_method": rng.choice(["Rule-Based (Fallback)", "Gemini 2.5 Flash Lite"]),
+        "raw_resume_text": make_resume_text(rng, name, university),
+        "source_file": f"{name.replace(' ', '_').lower()}.pdf",
+        "position_id": rng.choice(positions)["id"] if positions else "",
+        "created_at": (now - timedelta(minutes=rng.randint(0, 60 * 24 * 120))).isoformat(),
+        "status": rng.choice(STATUSES),
+    }
+    if users and rng.random() < 0.3:
+        candidate["user_id"] = rng.choice(users)["id"]
+    return candidate
+
+
+def make_resumes(count: int, seed: int = 7) -> List[str]:
+    """Returns a list of resume texts"""
+    rng = random.Random(seed)
+    return [
+        make_resume_text(rng, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", rng.choice(UNIVERSITIES))
+        for _ in range(count)
+    ]
+
+
+SYLLABLES = ["ka", "ri", "mo", "lan", "ver", "sha", "tor", "bel", "qui", "den", "pur", "ston", "wa", "lin", "gra"]
+INSTITUTION_FORMS = ["University of {}", "{} Institute of Technology", "{} State University", "{} College of Engineering"]
+TIER_NAMES = ["global", "national", "national", "regional", "regional", "regional"]
+
+
+def make_institutions(count: int, seed: int = 13) -> List[Dict]:
+    """Returns institution database rows (name, tier, aliases) with abbreviation aliases"""
+    rng = random.Random(seed)
+    rows, seen = [], set()
+    while len(rows) < count:
+        place = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        name = rng.choice(INSTITUTION_FORMS).format(place)
+        if name in seen:
+            continue
+        seen.add(name)
+        initials = "".join(word[0] for word in name.split() if word[0].isupper())
+        rows.append({"name": name, "tier": rng.choice(TIER_NAMES), "aliases": f"{initials} {place}|{place} Univ."})
+    return rows
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text: str) -> bytes:
+    """Returns a minimal single-font PDF containing the given text (one page per 50 lines)"""
+    lines = text.encode("latin-1", "replace").decode("latin-1").split("\n")
+    pages = [lines[i:i + 50] for i in range(0, len(lines), 50)] or [[""]]
+
+    objects = []  # object bodies, numbered from 1
+    page_ids = []
+    font_id = 3
+    objects.append(None)  # 1: catalog (filled below)
+    objects.append(None)  # 2: pages (filled below)
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for page_lines in pages:
+        body = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({_pdf_escape(l)}) Tj T*" for l in page_lines) + " ET"
+        stream = body.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                        f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>").encode())
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_pdf_corpus(count: int, seed: int = 11) -> List[bytes]:
+    """Returns a list of resume PDFs as bytes"""
+    return [make_pdf(text) for text in make_resumes(count, seed)]
@@ -0,0 +1,508 @@
+"""
+Benchmark Suite for Storage, Serialization, Scoring, Institutions, PDF Extraction, Routes and Startup
+Runs against synthetic data from bench_data.py in a temporary directory
+and writes machine-readable JSON results.
+
+Usage:
+    python benchmark.py                                # all suites, JSON to stdout
+    python benchmark.py --quick --output bench.json    # small sizes
+    python benchmark.py --suites storage --sizes 1000,10000
+    python benchmark.py --compare baseline.json        # exit 1 on regressions
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+import bench_data
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+QUICK_SIZES = [200, 1000]
+INSTITUTION_SIZES = [1000, 10000]
+
+
+def measure(fn: Callable, repeat: int, setup: Optional[Callable] = None, ops: int = 1) -> Dict:
+    """Times ``fn`` ``repeat`` times and returns summary statistics in seconds"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        "iterations": repeat,
+        "mean_s": statistics.fmean(samples),
+        "median_s": median,
+        "p95_s": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_s": samples[0],
+        "max_s": samples[-1],
+        "ops_per_sec": (ops / median) if median else None,
+    }
+
+
+def _result(suite: str, name: str, params: Dict, stats: Dict) -> Dict:
+    return {"suite": suite, "name": name, "params": params, **stats}
+
+
+@contextlib.contextmanager
+def isolated_storage():
+    """Points the storage module at a fresh temporary data location"""
+    import storage
+    original = storage.DATA_DIR, storage.DATA_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.DATA_DIR = os.path.join(tmp, "data")
+        storage.DATA_FILE = os.path.join(tmp, "data.json")
+        try:
+            yield storage
+        finally:
+            storage.DATA_DIR, storage.DATA_FILE = original
+
+
+def seed_storage(storage, dataset: Dict):
+    storage.import_document(dataset)
+
+
+# ============ Suites ============
+
+def bench_storage(sizes: List[int], repeat: int) -> List[Dict]:
+    import analytics
+    import archive
+    import candidate_table
+    import ranking
+    import status_lookup
+    results = []
+    for size in sizes:
+        dataset = bench_data.make_dataset(positions=20, candidates=size, users=max(1, size // 10))
+        position_id = dataset["positions"][0]["id"]
+        candidate_id = dataset["candidates"][size // 2]["id"]
+        params = {"candidates": size}
+        with isolated_storage() as storage:
+            seed_storage(storage, dataset)
+            extra = bench_data.make_dataset(positions=0, candidates=repeat, seed=size)["candidates"]
+            pending = iter(extra)
+            for c in extra:
+                c["position_id"] = position_id
+
+            results.append(_result("storage", "get_all_candidates", params,
+                                   measure(storage.get_all_candidates, repeat)))
+            results.append(_result("storage", "get_candidate", params,
+                                   measure(lambda: storage.get_candidate(candidate_id), repeat)))
+            results.append(_result("storage", "get_candidates_by_position", params,
+                                   measure(lambda: storage.get_candidates_by_position(position_id), repeat)))
+            results.append(_result("storage", "get_overview_stats", params,
+                                   measure(storage.get_overview_stats, repeat)))
+            table = candidate_table.get_table()
+            results.append(_result("storage", "table_rebuild", params, measure(table.rebuild, repeat)))
+            results.append(_result("storage", "table_query_position", params,
+                                   measure(lambda: table.query(position_id=position_id), repeat)))
+            results.append(_result("storage", "table_overview_stats", params,
+                                   measure(table.overview_stats, repeat)))
+            results.append(_result("storage", "table_aggregations", params,
+                                   measure(lambda: (table.score_histogram(), table.status_by_position(),
+                                                    table.applicants_per_day()), repeat)))
+            results.append(_result("storage", "status_lookup", params,
+                                   measure(lambda: status_lookup.lookup(candidate_id), repeat)))
+            results.append(_result("storage", "analytics_build", params,
+                                   measure(lambda: analytics._cache.build(position_id), repeat)))
+            results.append(_result("storage", "analytics_position", params,
+                                   measure(lambda: analytics.get_position_analytics(position_id), repeat)))
+            results.append(_result("storage", "ranking_index_build", params,
+                                   measure(lambda: ranking._index.build(position_id), repeat)))
+            results.append(_result("storage", "ranking_top_position", params,
+                                   measure(lambda: ranking.top_candidates(position_id, 10), repeat)))
+            results.append(_result("storage", "resume_text_get", params,
+                                   measure(lambda: storage.get_candidate(candidate_id).raw_resume_text, repeat)))
+            results.append(_result("storage", "save_candidate", params,
+                                   measure(lambda: storage.save_candidate(next(pending)), repeat)))
+            results.append(_result("storage", "update_candidate_status", params,
+                                   measure(lambda: storage.update_candidate_status(candidate_id, "accepted"), repeat)))
+
+            # Archive one closed position, then read it back
+            archived_id = next(c["id"] for c in dataset["candidates"] if c.get("position_id") == position_id)
+            storage.set_position_closed(position_id)
+            results.append(_result("storage", "archive_position", params,
+                                   measure(lambda: archive.archive_cold(max_age_days=0, rejected_age_days=0), 1)))
+            results.append(_result("storage", "archive_get_candidate", params,
+                                   measure(lambda: archive.get_candidate(archived_id), repeat)))
+            results.append(_result("storage", "archive_search", params,
+                                   measure(lambda: archive.search(position_id=position_id, status="rejected"), repeat)))
+        print(f"  storage: {size} candidates done", file=sys.stderr)
+    return results
+
+
+def _encode_legacy_json(data: Dict) -> bytes:
+    """The pre-serializer format: pretty-printed JSON with indent=2"""
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def bench_serialization(sizes: List[int], repeat: int) -> List[Dict]:
+    """Compares load/save time and file size of each store format on one partition"""
+    import serializers
+    formats = [("legacy-json", _encode_legacy_json)]
+    formats += [(fmt, lambda data, fmt=fmt: serializers.encode(data, fmt)) for fmt in serializers.available_formats()]
+    results = []
+    for size in sizes:
+        dataset = bench_data.make_dataset(positions=1, candidates=size)
+        partition = {"position_id": dataset["positions"][0]["id"], "candidates": dataset["candidates"]}
+        for fmt, encoder in formats:
+            raw = encoder(partition)
+            params = {"candidates": size, "format": fmt, "bytes": len(raw)}
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "partition.json")
+
+                def save():
+                    with open(path, "wb") as f:
+                        f.write(encoder(partition))
+
+                def load():
+                    with open(path, "rb") as f:
+                        serializers.decode(f.read())
+
+                results.append(_result("serialization", "save", params, measure(save, repeat)))
+                results.append(_result("serialization", "load", params, measure(load, repeat)))
+        print(f"  serialization: {size} candidates done", file=sys.stderr)
+    return results
+
+
+def _retained_bytes(build: Callable) -> int:
+    """Bytes still allocated after ``build()`` returns (its result is kept alive)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def bench_memory(sizes: List[int]) -> List[Dict]:
+    """Heap retained by a decoded partition held as dicts versus CandidateRecords,
+    and as records whose resume texts live in the blob store (the stored layout)"""
+    import serializers
+    from candidate_model import CandidateRecord
+    results = []
+    for size in sizes:
+        dataset = bench_data.make_dataset(positions=1, candidates=size)
+        raw = serializers.encode({"candidates": dataset["candidates"]})
+        raw_without_text = serializers.encode({"candidates": [
+            {k: v for k, v in c.items() if k != "raw_resume_text"} for c in dataset["candidates"]]})
+        del dataset
+        text_bytes = sum(len(c.get("raw_resume_text", "")) for c in serializers.decode(raw)["candidates"])
+        layouts = [
+            ("dicts", lambda: serializers.decode(raw)["candidates"]),
+            ("records", lambda: [CandidateRecord(c) for c in serializers.decode(raw)["candidates"]]),
+            ("records_blob_text", lambda: [CandidateRecord(c) for c in serializers.decode(raw_without_text)["candidates"]]),
+        ]
+        for layout, build in layouts:
+            retained = _retained_bytes(build)
+            results.append({
+                "suite": "memory", "name": "retained_heap",
+                "params": {"candidates": size, "layout": layout},
+                "bytes": retained,
+                "bytes_per_candidate": round(retained / size, 1),
+                "bytes_per_candidate_excluding_resume_text": round(
+                    (retained - (0 if layout == "records_blob_text" else text_bytes)) / size, 1),
+            })
+        print(f"  memory: {size} candidates done", file=sys.stderr)
+    return results
+
+
+def bench_scoring(count: int, repeat: int) -> List[Dict]:
+    from agent import ResumeRankingAgent
+    import ranking
+    resumes = bench_data.make_resumes(count)
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = ResumeRankingAgent()
+
+    def run():
+        for text in resumes:
+            agent.analyze_resume(text, "Python developer")
+
+    def rank():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in ranking.rank(resumes, "Python developer", top_k=10):
+                pass
+
+    return [_result("scoring", "analyze_resume", {"resumes": count}, measure(run, repeat, ops=count)),
+            _result("scoring", "rank_top10", {"resumes": count}, measure(rank, repeat, ops=count))]
+
+
+def bench_institutions(counts: List[int], resumes: int, repeat: int) -> List[Dict]:
+    """Compiling an institution database and resolving every resume line against it,
+    versus the substring scan it replaced (on a sample of lines, it is far slower)"""
+    import csv
+    import institutions
+    lines = [line for text in bench_data.make_resumes(resumes) for line in text.split("\n")]
+    sample = lines[:200]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            rows = bench_data.make_institutions(count)
+            path = os.path.join(tmp, f"institutions_{count}.csv")
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=["name", "tier", "aliases"])
+                writer.writeheader()
+                writer.writerows(rows)
+            params = {"institutions": count}
+            results.append(_result("institutions", "compile", params,
+                                   measure(lambda: institutions.Resolver(institutions.load(path)), min(repeat, 3))))
+            resolver = institutions.Resolver(institutions.load(path))
+
+            def resolve_all():
+                for line in lines:
+                    resolver.resolve(line)
+
+            results.append(_result("institutions", "resolve_line", {**params, "lines": len(lines)},
+                                   measure(resolve_all, repeat, setup=resolver.cache_clear, ops=len(lines))))
+            results.append(_result("institutions", "resolve_line_cached", {**params, "lines": len(lines)},
+                                   measure(resolve_all, repeat, ops=len(lines))))
+            names = [row["name"].lower() for row in rows]
+
+            def substring_scan():
+                for line in sample:
+                    line = line.lower()
+                    any(name in line for name in names)
+
+            results.append(_result("institutions", "substring_scan", {**params, "lines": len(sample)},
+                                   measure(substring_scan, min(repeat, 3), ops=len(sample))))
+        print(f"  institutions: {counts} done", file=sys.stderr)
+    return results
+
+
+def bench_pdf(count: int, repeat: int) -> List[Dict]:
+    from pdf_utils import extract_text_from_pdf
+    corpus = bench_data.make_pdf_corpus(count)
+
+    def run():
+        for pdf in corpus:
+            extract_text_from_pdf(io.BytesIO(pdf))
+
+    params = {"pdfs": count, "bytes": sum(len(p) for p in corpus)}
+    return [_result("pdf", "extract_text_from_pdf", params, measure(run, repeat, ops=count))]
+
+
+def _mock_ai_analysis(self, resume_text: str, job_description: str) -> Dict:
+    """Stands in for the LLM: rule-based scoring labelled as an AI result"""
+    result = self.analyze_resume(resume_text, job_description)
+    result["analysis_method"] = "Mock LLM"
+    return result
+
+
+def bench_routes(sizes: List[int], repeat: int) -> List[Dict]:
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+    import render_cache
+    flask_app = app_module.app
+    flask_app.config["TESTING"] = True
+
+    for size in sizes:
+        dataset = bench_data.make_dataset(positions=20, candidates=size, users=max(1, size // 10))
+        position_id = dataset["positions"][0]["id"]
+        user_id = next((c["user_id"] for c in dataset["candidates"] if c.get("user_id")), dataset["users"][0]["id"])
+        resume = bench_data.make_resumes(1)[0]
+        params = {"candidates": size}
+        with isolated_storage() as storage, \
+                mock.patch("agent.ResumeRankingAgent.analyze_resume_with_ai", _mock_ai_analysis), \
+                contextlib.redirect_stdout(io.StringIO()):
+            seed_storage(storage, dataset)
+            client = flask_app.test_client()
+            with client.session_transaction() as sess:
+                sess["is_hr"] = True
+                sess["user_id"] = user_id
+                sess["user_name"] = "Benchmark User"
+
+            def get(path, headers=None, expected=200):
+                def run():
+                    response = client.get(path, headers=headers)
+                    assert response.status_code == expected, (path, response.status_code)
+                return run
+
+            # Uncached renders (the render cache is cleared before every request)
+            for name, path in [("dashboard", "/dashboard"),
+                               ("dashboard_position", f"/dashboard/{position_id}"),
+                               ("overview", "/overview"),
+                               ("applicant_dashboard", "/applicant_dashboard"),
+                               ("applicant_portal", "/applicant")]:
+                results.append(_result("routes", name, params,
+                                       measure(get(path), repeat, setup=render_cache.clear)))
+
+            # Served from the render cache, and revalidated with If-None-Match
+            for name, path in [("dashboard_cached", "/dashboard"), ("applicant_portal_cached", "/applicant")]:
+                client.get(path)
+                results.append(_result("routes", name, params, measure(get(path), repeat)))
+            etag = client.get("/applicant").headers["ETag"]
+            results.append(_result("routes", "applicant_portal_304", params,
+                                   measure(get("/applicant", {"If-None-Match": etag}, 304), repeat)))
+
+            def submit():
+                response = client.post("/process_analysis", data={
+                    "resume_text": resume, "position_id": position_id, "use_ai": "on"})
+                assert response.status_code == 302, response.status_code
+
+            results.append(_result("routes", "process_analysis_mock_llm", params, measure(submit, repeat)))
+        print(f"  routes: {size} candidates done", file=sys.stderr)
+    return results
+
+
+STARTUP_BREAKDOWN = 12  # slowest modules imported by app.py to report
+
+
+def _import_app(tmp: str, preload: bool, importtime: bool = False) -> subprocess.CompletedProcess:
+    """Imports app.py in a fresh interpreter, as a worker boot would"""
+    env = dict(os.environ, DATA_DIR=os.path.join(tmp, "data"), APP_PRELOAD="true" if preload else "false")
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", "import app"]
+    return subprocess.run(command, cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+
+
+def _import_breakdown(stderr: str) -> List[Dict]:
+    """Parses -X importtime output into app.py's direct imports, slowest first"""
+    modules, children = [], []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        head, cumulative_us, name = line.split("|", 2)
+        self_us = head.split(":", 1)[1]
+        if not self_us.strip().isdigit():
+            continue  # header line
+        # A module is listed after its imports, nested two spaces per level
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if depth == 1:
+            children.append({"module": name.strip(), "self_s": int(self_us) / 1e6,
+                             "cumulative_s": int(cumulative_us) / 1e6})
+        elif depth == 0:
+            if name.strip() == "app":
+                modules = children
+            children = []
+    return sorted(modules, key=lambda m: m["cumulative_s"], reverse=True)[:STARTUP_BREAKDOWN]
+
+
+def bench_startup(repeat: int) -> List[Dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for preload in (False, True):
+            stats = measure(lambda: _import_app(tmp, preload), repeat)
+            results.append(_result("startup", "import_app", {"preload": preload}, stats))
+        for module in _import_breakdown(_import_app(tmp, preload=False, importtime=True).stderr):
+            name = module.pop("module")
+            results.append(_result("startup", "import_breakdown", {"module": name}, module))
+    return results
+
+
+# ============ Reporting ============
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _key(result: Dict) -> str:
+    return f"{result['suite']}.{result['name']}{json.dumps(result['params'], sort_keys=True)}"
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Returns benchmarks whose median time (or retained bytes) grew by more than ``threshold`` (0.2 = 20%)"""
+    previous = {_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get(_key(result))
+        field = "median_s" if "median_s" in result else "bytes"
+        if not old or not old.get(field):
+            continue
+        ratio = result[field] / old[field]
+        print(f"{_key(result)}: {old[field]:.6g} -> {result[field]:.6g} {field} (x{ratio:.2f})", file=sys.stderr)
+        if ratio > 1 + threshold:
+            regressions.append({"benchmark": _key(result), "ratio": round(ratio, 3)})
+    return regressions
+
+
+def run(suites: List[str], sizes: List[int], repeat: int, corpus: int) -> Dict:
+    results = []
+    if "storage" in suites:
+        results += bench_storage(sizes, repeat)
+    if "serialization" in suites:
+        results += bench_serialization(sizes, repeat)
+    if "memory" in suites:
+        results += bench_memory(sizes)
+    if "scoring" in suites:
+        results += bench_scoring(corpus, repeat)
+    if "institutions" in suites:
+        results += bench_institutions(INSTITUTION_SIZES, corpus, repeat)
+    if "pdf" in suites:
+        results += bench_pdf(corpus, repeat)
+    if "routes" in suites:
+        results += bench_routes(sizes, repeat)
+    if "startup" in suites:
+        results += bench_startup(repeat)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the HR management benchmark suite.")
+    parser.add_argument("--suites", default="storage,serialization,memory,scoring,institutions,pdf,routes,startup",
+                        help="comma-separated suites: storage,serialization,memory,scoring,institutions,pdf,routes,startup")
+    parser.add_argument("--sizes", help="comma-separated candidate counts (default 1000,10000,100000)")
+    parser.add_argument("--quick", action="store_true", help="use small sizes for a fast smoke run")
+    parser.add_argument("--repeat", type=int, default=5, help="iterations per benchmark")
+    parser.add_argument("--corpus", type=int, default=200, help="resumes/PDFs for scoring and PDF suites")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON file to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown ratio for --compare")
+    args = parser.parse_args(argv)
+
+    if args.sizes:
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    else:
+        sizes = QUICK_SIZES if args.quick else DEFAULT_SIZES
+    corpus = min(args.corpus, 50) if args.quick else args.corpus
+
+    report = run([s.strip() for s in args.suites.split(",")], sizes, args.repeat, corpus)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"Regressions: {json.dumps(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Resume Blob Store
+Full resume texts (raw_resume_text) are kept out of the candidate
+partitions, in an append-only data file with an offset index:
+
+    DATA_DIR/resumes/CURRENT      generation number of the live files
+    DATA_DIR/resumes/<gen>.dat    UTF-8 resume bodies, appended back to back
+    DATA_DIR/resumes/<gen>.idx    JSON lines: {"id", "o": offset, "l": length} or {"id", "d": 1}
+
+Workers therefore never parse resume bodies when loading partitions;
+CandidateRecord fetches a text on access as a slice of a read-only mmap of
+the data file, which every worker process shares through the page cache.
+
+Replaced and deleted texts leave dead bytes behind. Once they make up
+RESUME_BLOB_COMPACT_RATIO of the data file (and at least
+RESUME_BLOB_COMPACT_MIN_BYTES), the live texts are copied into a new
+generation and CURRENT is switched. Appends and compaction hold an flock on
+DATA_DIR/resumes/lock, so several processes may write.
+
+Usage:
+    python blob_store.py stats
+    python blob_store.py compact     # also drops texts of candidates no longer in the store
+"""
+
+import argparse
+import fcntl
+import json
+import mmap
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+COMPACT_RATIO = float(os.getenv("RESUME_BLOB_COMPACT_RATIO", "0.5"))
+COMPACT_MIN_BYTES = int(os.getenv("RESUME_BLOB_COMPACT_MIN_BYTES", str(4 * 1024 * 1024)))
+
+
+class BlobStore:
+    """Append-only text blobs keyed by candidate ID, read through mmap"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._current = (None, None)  # ((inode, mtime) of CURRENT, generation it names)
+        self._reset(None)
+
+    def _reset(self, generation: Optional[int]):
+        self.generation = generation
+        self._offset = 0                            # bytes of the index consumed
+        self._index_inode: Optional[int] = None     # a restored store has new files
+        self._entries: Dict[str, Tuple[int, int]] = {}
+        self.dead_bytes = 0
+        self._map: Optional[mmap.mmap] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _files(self, generation: int) -> Tuple[str, str]:
+        return self._path(f"{generation}.dat"), self._path(f"{generation}.idx")
+
+    @contextmanager
+    def _file_lock(self):
+        """Serializes writers across processes"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path("lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @contextmanager
+    def locked(self):
+        """Holds off writers in every process (used by backup.py to capture a snapshot)"""
+        with self._lock, self._file_lock():
+            yield
+
+    def _current_generation(self) -> int:
+        """CURRENT is only ever replaced, so it is re-read only when its inode changes"""
+        try:
+            st = os.stat(self._path("CURRENT"))
+        except FileNotFoundError:
+            return 0
+        inode = (st.st_ino, st.st_mtime_ns)
+        if inode != self._current[0]:
+            try:
+                with open(self._path("CURRENT")) as f:
+                    self._current = (inode, int(f.read().strip() or 0))
+            except (FileNotFoundError, ValueError):
+                return 0
+        return self._current[1]
+
+    def _refresh(self) -> Dict[str, Tuple[int, int]]:
+        """Follows CURRENT and reads index lines appended since the last call; hold self._lock"""
+        generation = self._current_generation()
+        if generation != self.generation:
+            self._reset(generation)
+        _, index_path = self._files(generation)
+        try:
+            st = os.stat(index_path)
+        except FileNotFoundError:
+            return self._entries
+        if st.st_ino != self._index_inode:
+            if self._index_inode is not None:
+                self._reset(generation)
+            self._index_inode = st.st_ino
+        size = st.st_size
+        if size <= self._offset:
+            return self._entries
+        with open(index_path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        # Only complete lines; another process may be mid-append
+        chunk = chunk[:chunk.rfind(b"\n") + 1]
+        for line in chunk.splitlines():
+            entry = json.loads(line)
+            previous = self._entries.pop(entry["id"], None)
+            if previous is not None:
+                self.dead_bytes += previous[1]
+            if not entry.get("d"):
+                self._entries[entry["id"]] = (entry["o"], entry["l"])
+        self._offset += len(chunk)
+        return self._entries
+
+    def _view(self, end: int) -> mmap.mmap:
+        """Read-only map of the data file covering at least `end` bytes"""
+        if self._map is None or len(self._map) < end:
+            data_path, _ = self._files(self.generation)
+            with open(data_path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    # ============ Reads ============
+
+    def get(self, blob_id: str) -> Optional[str]:
+        with self._lock:
+            location = self._refresh().get(blob_id)
+            if location is None:
+                return None
+            offset, length = location
+            if not length:
+                return ""
+            return self._view(offset + length)[offset:offset + length].decode("utf-8")
+
+    def __contains__(self, blob_id: str) -> bool:
+        with self._lock:
+            return blob_id in self._refresh()
+
+    def ids(self) -> Set[str]:
+        with self._lock:
+            return set(self._refresh())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._refresh()
+            live = sum(length for _, length in entries.values())
+            return {"generation": self.generation, "blobs": len(entries),
+                    "live_bytes": live, "dead_bytes": self.dead_bytes}
+
+    # ============ Writes ============
+
+    def _append(self, lines: List[Dict], payload: bytes = b""):
+        """Appends payload to the data file and lines (offsets relative to the payload) to the index"""
+        data_path, index_path = self._files(self.generation)
+        if payload:
+            fd = os.open(data_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, payload)
+                base = os.lseek(fd, 0, os.SEEK_CUR) - len(payload)
+            finally:
+                os.close(fd)
+            for line in lines:
+                if "o" in line:
+                    line["o"] += base
+        with open(index_path, "a") as f:
+            f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+        self._refresh()
+
+    def put_many(self, items: Iterable[Tuple[str, str]]):
+        """Stores texts by ID, skipping ones that are unchanged"""
+        with self._lock, self._file_lock():
+            self._refresh()
+            chunks, lines, size = [], [], 0
+            for blob_id, text in items:
+                if self.get(blob_id) == text:
+                    continue
+                data = text.encode("utf-8")
+                lines.append({"id": blob_id, "o": size, "l": len(data)})
+                chunks.append(data)
+                size += len(data)
+            if lines:
+                self._append(lines, b"".join(chunks))
+
+    def delete_many(self, blob_ids: Iterable[str]):
+        """Forgets texts; their bytes are reclaimed by the next compaction"""
+        with self._lock, self._file_lock():
+            entries = self._refresh()
+            lines = [{"id": blob_id, "d": 1} for blob_id in set(blob_ids) if blob_id in entries]
+            if lines:
+                self._append(lines)
+        self.maybe_compact()
+
+    def maybe_compact(self) -> bool:
+        with self._lock:
+            self._refresh()
+            live = sum(length for _, length in self._entries.values())
+            if self.dead_bytes < COMPACT_MIN_BYTES or self.dead_bytes < COMPACT_RATIO * (live + self.dead_bytes):
+                return False
+        self.compact()
+        return True
+
+    def compact(self, keep: Optional[Set[str]] = None) -> Dict:
+        """Copies live texts (only IDs in `keep`, if given) into a new generation"""
+        with self._lock, self._file_lock():
+            entries = self._refresh()
+            old = self.generation
+            new = old + 1
+            data_path, index_path = self._files(new)
+            lines, offset = [], 0
+            with open(data_path, "wb") as data:
+                for blob_id, (start, length) in sorted(entries.items(), key=lambda e: e[1][0]):
+                    if keep is not None and blob_id not in keep:
+                        continue
+                    if length:
+                        data.write(self._view(start + length)[start:start + length])
+                    lines.append({"id": blob_id, "o": offset, "l": length})
+                    offset += length
+                data.flush()
+                os.fsync(data.fileno())
+            with open(index_path, "w") as f:
+                f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+                f.flush()
+                os.fsync(f.fileno())
+            tmp_path = self._path("CURRENT.tmp")
+            with open(tmp_path, "w") as f:
+                f.write(str(new))
+            os.replace(tmp_path, self._path("CURRENT"))
+            # Other processes keep reading their mapping of the old file until
+            # they notice CURRENT changed; unlinking does not invalidate it
+            for path in self._files(old):
+                if os.path.exists(path):
+                    os.remove(path)
+            reclaimed = self.dead_bytes
+            self._refresh()
+            return {"generation": new, "blobs": len(lines), "bytes": offset, "reclaimed_bytes": reclaimed}
+
+
+_stores: Dict[str, BlobStore] = {}
+
+
+def get_store(directory: str) -> BlobStore:
+    """Returns the process-wide store for a directory"""
+    store = _stores.get(directory)
+    if store is None:
+        store = _stores.setdefault(directory, BlobStore(directory))
+    return store
+
+
+def main(argv=None):
+    import storage
+    parser = argparse.ArgumentParser(description="Resume text blob store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats")
+    sub.add_parser("compact")
+    args = parser.parse_args(argv)
+
+    store = storage.resume_store()
+    if args.command == "stats":
+        result = store.stats()
+    else:
+        # Under the store's write lock, so no candidate is saved between listing and compacting
+        with storage.write_lock():
+            result = store.compact(keep=set(storage.candidate_ids()))
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Bulk Import CLI for Historical Resumes and Candidates
+Loads a directory of PDF resumes or a JSONL file of candidates into storage.
+PDF text is extracted in parallel worker processes, resumes are optionally
+scored (rule-based or AI) at a bounded concurrency, and candidates are
+written in large batches. Progress is checkpointed after every batch so an
+interrupted import can be resumed by running the same command again.
+
+Usage:
+    python bulk_import.py resumes/ --position-id <id>
+    python bulk_import.py candidates.jsonl --analyze ai --concurrency 4
+    python bulk_import.py resumes/ --position-id <id> --restart
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import storage
+from pdf_utils import extract_text_from_pdf
+
+
+# ============ Sources ============
+
+def iter_pdf_items(directory: str) -> Iterator[Tuple[str, Dict]]:
+    """Yields (checkpoint key, item) for every PDF under a directory, in stable order"""
+    for root, _dirs, files in sorted(os.walk(directory)):
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory), {"pdf_path": path, "source_file": name}
+
+
+def iter_jsonl_items(path: str) -> Iterator[Tuple[str, Dict]]:
+    """Yields (checkpoint key, record) for every non-empty line of a JSONL file.
+    A malformed line yields an item with a parse_error, counted as failed."""
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                error = None if isinstance(record, dict) else "not a JSON object"
+            except ValueError as e:
+                error = f"invalid JSON ({e})"
+            if error:
+                record = {"source_file": f"line {line_number}", "parse_error": error}
+            yield f"line:{line_number}", record
+
+
+def iter_batches(items: Iterator[Tuple[str, Dict]], size: int, done: set) -> Iterator[List[Tuple[str, Dict]]]:
+    batch = []
+    for key, item in items:
+        if key in done:
+            continue
+        batch.append((key, item))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ============ Checkpoints ============
+
+def load_checkpoint(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {"done": [], "imported": 0, "failed": 0}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, checkpoint: Dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+# ============ Pipeline ============
+
+def _extract(path: str) -> Tuple[str, Optional[str]]:
+    """Process-pool worker: returns (text, error) for one PDF"""
+    try:
+        return extract_text_from_pdf(path), None
+    except Exception as e:
+        return "", str(e)
+
+
+class Importer:
+    def __init__(self, analyze: str, position_id: Optional[str]):
+        self.analyze = analyze
+        self.position_id = position_id
+        self.agent = None
+        self._job_descriptions: Dict[str, str] = {}
+        if analyze != "none":
+            from agent import ResumeRankingAgent
+            # Quiet rather than redirecting stdout, which is process-global and
+            # would swallow other threads' output while scoring runs concurrently
+            self.agent = ResumeRankingAgent(quiet=True)
+
+    def _job_description(self, position_id: Optional[str]) -> str:
+        if not position_id:
+            return ""
+        if position_id not in self._job_descriptions:
+            position = storage.get_position(position_id)
+            self._job_descriptions[position_id] = position.get("description", "") if position else ""
+        return self._job_descriptions[position_id]
+
+    def extract(self, pool: Optional[ProcessPoolExecutor], items: List[Dict]) -> List[Tuple[str, Optional[str]]]:
+        """Returns (text, error) per item; PDFs are extracted on the process pool"""
+        pdf_paths = [item["pdf_path"] for item in items if "pdf_path" in item]
+        extracted = iter(pool.map(_extract, pdf_paths, chunksize=4) if pool and pdf_paths else map(_extract, pdf_paths))
+        results = []
+        for item in items:
+            if "pdf_path" in item:
+                results.append(next(extracted))
+            elif "parse_error" in item:
+                results.append(("", item["parse_error"]))
+            else:
+                text = item.get("raw_resume_text") or item.get("resume_text") or ""
+                results.append((text, None if text else "No resume text in record"))
+        return results
+
+    def score(self, text: str, position_id: Optional[str]) -> Dict:
+        job_description = self._job_description(position_id)
+        if self.analyze == "ai":
+            return self.agent.analyze_resume_with_ai(text, job_description)
+        return self.agent.analyze_resume(text, job_description)
+
+    def build_candidates(self, threads: ThreadPoolExecutor, items: List[Dict],
+                         texts: List[Tuple[str, Optional[str]]]) -> Tuple[List[Dict], int]:
+        """Returns (candidates ready to save, failure count) for one batch"""
+        jobs = []
+        failed = 0
+        for item, (text, error) in zip(items, texts):
+            if error or not text.strip():
+                failed += 1
+                print(f"  skipped {item.get('source_file') or item.get('id') or 'record'}: "
+                      f"{error or 'empty text'}", file=sys.stderr)
+                continue
+            record = {k: v for k, v in item.items() if k not in ("pdf_path", "resume_text")}
+            record["raw_resume_text"] = text
+            record["position_id"] = record.get("position_id") or self.position_id or ""
+            needs_score = self.agent is not None and "final_rank_score" not in record
+            future = threads.submit(self.score, text, record["position_id"]) if needs_score else None
+            jobs.append((record, future))
+
+        candidates = []
+        for record, future in jobs:
+            if future is not None:
+                try:
+                    analysis = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"  analysis failed for {record.get('source_file', 'record')}: {e}", file=sys.stderr)
+                    continue
+                # Values from the source record (name, status, created_at...) win over analysis output
+                record = {**analysis, **record}
+            candidates.append(record)
+        return candidates, failed
+
+
+def run_import(source: str, position_id: Optional[str], analyze: str = "rules", workers: int = 0,
+               concurrency: int = 4, batch_size: int = 500, checkpoint_path: Optional[str] = None,
+               restart: bool = False) -> Dict:
+    """Imports a PDF directory or JSONL file and returns a summary"""
+    if os.path.isdir(source):
+        items = iter_pdf_items(source)
+        uses_pdfs = True
+    else:
+        items = iter_jsonl_items(source)
+        uses_pdfs = False
+
+    checkpoint_path = checkpoint_path or f"{source.rstrip(os.sep)}.import-checkpoint.json"
+    if restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = load_checkpoint(checkpoint_path)
+    done = set(checkpoint["done"])
+    if done:
+        print(f"Resuming: {len(done)} items already processed")
+
+    importer = Importer(analyze, position_id)
+    pool = ProcessPoolExecutor(max_workers=workers or None) if uses_pdfs and workers != 1 else None
+    imported = failed = 0
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as threads:
+            for number, batch in enumerate(iter_batches(items, batch_size, done), start=1):
+                batch_start = time.perf_counter()
+                keys = [key for key, _ in batch]
+                batch_items = [item for _, item in batch]
+
+                texts = importer.extract(pool, batch_items)
+                candidates, batch_failed = importer.build_candidates(threads, batch_items, texts)
+                if candidates:
+                    storage.save_candidates(candidates)
+
+                imported += len(candidates)
+                failed += batch_failed
+                done.update(keys)
+                checkpoint["done"] = sorted(done)
+                checkpoint["imported"] = checkpoint.get("imported", 0) + len(candidates)
+                checkpoint["failed"] = checkpoint.get("failed", 0) + batch_failed
+                save_checkpoint(checkpoint_path, checkpoint)
+
+                batch_elapsed = time.perf_counter() - batch_start
+                total_elapsed = time.perf_counter() - start
+                print(f"Batch {number}: {len(candidates)} imported, {batch_failed} failed "
+                      f"({len(batch) / batch_elapsed:.1f} items/s, overall "
+                      f"{(imported + failed) / total_elapsed:.1f} items/s)")
+    finally:
+        if pool:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "imported": imported,
+        "failed": failed,
+        "elapsed_s": round(elapsed, 2),
+        "items_per_sec": round((imported + failed) / elapsed, 2) if elapsed else None,
+        "checkpoint": checkpoint_path,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import resumes (PDF directory) or candidates (JSONL).")
+    parser.add_argument("source", help="directory of PDF resumes or a .jsonl file of candidate records")
+    parser.add_argument("--position-id", help="position to attach candidates to (JSONL records may set their own)")
+    parser.add_argument("--analyze", choices=["none", "rules", "ai"], default="rules",
+                        help="score resumes that have no final_rank_score (default: rules)")
+    parser.add_argument("--workers", type=int, default=0, help="PDF extraction processes (0 = CPU count)")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent analyses (AI requests in flight)")
+    parser.add_argument("--batch-size", type=int, default=500, help="candidates written per storage transaction")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <source>.import-checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint and start over")
+    args = parser.parse_args(argv)
+
+    if args.position_id and not storage.get_position(args.position_id):
+        print(f"Error: position {args.position_id} not found", file=sys.stderr)
+        return 1
+
+    summary = run_import(args.source, args.position_id, analyze=args.analyze, workers=args.workers,
+                         concurrency=args.concurrency, batch_size=args.batch_size,
+                         checkpoint_path=args.checkpoint, restart=args.restart)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Compact In-Memory Candidate Model
+CandidateRecord stores a candidate in __slots__ instead of a per-record
+dict: categorical strings are interned, skills are shared interned tuples
+and the duplicated evidence_quote field is derived from python_evidence.
+Records are read-only Mappings, so templates can use ``c.name``,
+``c['name']`` and ``c.get('name')`` unchanged; call ``to_dict()`` for a
+mutable copy.
+
+raw_resume_text is normally not held at all: storage keeps resume bodies in
+a blob store (blob_store.py) and registers a loader, which is called when
+the field is accessed. Loaded text is not cached on the record and is left
+out of iteration and ``to_dict()``.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# Known candidate fields, in storage order
+FIELDS = (
+    "id", "name", "university", "skills",
+    "uni_tier_score", "uni_evidence",
+    "python_score", "python_evidence",
+    "experience_score", "experience_evidence",
+    "python_experience_years", "final_rank_score", "analysis_method",
+    "raw_resume_text", "source_file", "position_id", "user_id",
+    "created_at", "status", "status_updated_at",
+)
+_FIELD_SET = frozenset(FIELDS)
+
+# Low-cardinality strings shared across records
+INTERNED_FIELDS = ("university", "uni_evidence", "analysis_method", "position_id", "user_id", "status")
+
+# Marker for an evidence_quote equal to python_evidence (the common case)
+_SAME_AS_PYTHON_EVIDENCE = object()
+
+_skill_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+# candidate id -> resume text (or None), for records without inline text
+_resume_loader: Optional[Callable[[str], Optional[str]]] = None
+
+
+def set_resume_loader(loader: Optional[Callable[[str], Optional[str]]]):
+    global _resume_loader
+    _resume_loader = loader
+
+
+def _intern_skills(skills) -> Tuple[str, ...]:
+    if not isinstance(skills, (list, tuple)):
+        return ()
+    key = tuple(sys.intern(s) if isinstance(s, str) else s for s in skills)
+    return _skill_tuples.setdefault(key, key)
+
+
+class CandidateRecord(Mapping):
+    """Read-only, slotted candidate record"""
+
+    __slots__ = FIELDS + ("_evidence_quote", "_extra")
+
+    def __init__(self, data: Dict):
+        for key, value in data.items():
+            if key in _FIELD_SET:
+                if key == "skills":
+                    value = _intern_skills(value)
+                elif key in INTERNED_FIELDS and isinstance(value, str):
+                    value = sys.intern(value)
+                object.__setattr__(self, key, value)
+        quote = data.get("evidence_quote", _SAME_AS_PYTHON_EVIDENCE)
+        if "evidence_quote" in data and quote == data.get("python_evidence"):
+            quote = _SAME_AS_PYTHON_EVIDENCE
+        elif "evidence_quote" not in data:
+            quote = None
+        object.__setattr__(self, "_evidence_quote", quote)
+        extra = {k: v for k, v in data.items() if k not in _FIELD_SET and k != "evidence_quote"}
+        object.__setattr__(self, "_extra", extra or None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("CandidateRecord is read-only; use to_dict() for a mutable copy")
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                value = object.__getattribute__(self, key)
+            except AttributeError:
+                if key == "raw_resume_text":
+                    return self._load_resume_text()
+                raise KeyError(key) from None
+            return value
+        if key == "evidence_quote":
+            quote = self._evidence_quote
+            if quote is _SAME_AS_PYTHON_EVIDENCE:
+                return self["python_evidence"]
+            if quote is None:
+                raise KeyError(key)
+            return quote
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def _load_resume_text(self) -> str:
+        text = None
+        if _resume_loader is not None and self._has("id"):
+            text = _resume_loader(self.id)
+        if text is None:
+            raise KeyError("raw_resume_text")
+        return text
+
+    def __getattr__(self, key):
+        # Only reached for names that are not set slots (extra fields, evidence_quote, stored resume text)
+        if key.startswith("_"):
+            raise AttributeError(key)
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def _has(self, key: str) -> bool:
+        try:
+            object.__getattribute__(self, key)
+            return True
+        except AttributeError:
+            return False
+
+    def __iter__(self) -> Iterator[str]:
+        for key in FIELDS:
+            if self._has(key):
+                yield key
+                if key == "python_evidence" and self._evidence_quote is not None:
+                    yield "evidence_quote"
+        if self._evidence_quote is not None and not self._has("python_evidence"):
+            yield "evidence_quote"
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def __repr__(self) -> str:
+        return f"CandidateRecord(id={getattr(self, 'id', None)!r}, name={getattr(self, 'name', None)!r})"
+
+    def to_dict(self) -> Dict:
+        """Returns a plain, mutable dict in the stored format"""
+        data = {key: self[key] for key in self}
+        if "skills" in data:
+            data["skills"] = list(data["skills"])
+        return data
+
+    def __reduce__(self):
+        return (CandidateRecord, (self.to_dict(),))
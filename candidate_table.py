@@ -0,0 +1,322 @@
+"""
+Columnar Candidate Table
+Keeps every candidate in process memory as NumPy columns (position and
+status as small integer codes, scores and creation day as numeric arrays)
+next to the shared CandidateRecords. The table subscribes to storage change
+events and applies each saved/deleted/status-changed candidate in place, so
+dashboard sorting/filtering and overview aggregations are vectorized queries
+instead of a DataFrame built per request.
+
+If another process writes to the store, the version sequence has a gap and
+the table is rebuilt from storage on the next query.
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+import storage
+from candidate_model import CandidateRecord
+
+SCORE_COLUMNS = ("final_rank_score", "python_score", "uni_tier_score", "experience_score", "python_experience_years")
+SORT_COLUMNS = SCORE_COLUMNS + ("created_at",)
+STATUSES = ("pending", "accepted", "rejected")
+
+_MIN_CAPACITY = 1024
+
+
+def normalize_status(status) -> str:
+    """Lower-cases a status; missing or empty means pending"""
+    return (status or "pending").strip().lower() or "pending"
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _parse_created(value):
+    """Returns (epoch seconds, local day ordinal) of an ISO timestamp, NaN/-1 if unparseable"""
+    if not value:
+        return np.nan, -1
+    try:
+        created = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return np.nan, -1
+    return created.timestamp(), created.toordinal()
+
+
+class _Codes:
+    """Maps category strings to dense integer codes"""
+
+    def __init__(self, initial: Iterable[str] = ()):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for value in initial:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class CandidateTable:
+    """In-memory columnar view of all candidates, kept current by storage events"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.version = None
+        self._clear()
+
+    def _clear(self, capacity: int = _MIN_CAPACITY):
+        self.size = 0          # rows in use, including deleted ones
+        self.dead = 0
+        self.records: List[Optional[CandidateRecord]] = []
+        self.row_of: Dict[str, int] = {}
+        self.positions = _Codes([""])
+        self.statuses = _Codes(STATUSES)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.position_code = np.zeros(capacity, dtype=np.int32)
+        self.status_code = np.zeros(capacity, dtype=np.int16)
+        self.created_ts = np.full(capacity, np.nan)
+        self.created_day = np.full(capacity, -1, dtype=np.int32)
+        self.scores = {name: np.full(capacity, np.nan) for name in SCORE_COLUMNS}
+
+    def _columns(self) -> Dict[str, np.ndarray]:
+        return {"alive": self.alive, "position_code": self.position_code, "status_code": self.status_code,
+                "created_ts": self.created_ts, "created_day": self.created_day, **self.scores}
+
+    def _set_columns(self, columns: Dict[str, np.ndarray]):
+        for name, column in columns.items():
+            if name in self.scores:
+                self.scores[name] = column
+            else:
+                setattr(self, name, column)
+
+    def _resize(self, capacity: int, rows: np.ndarray):
+        """Copies the given rows into freshly allocated columns of `capacity`"""
+        resized = {}
+        for name, column in self._columns().items():
+            new = np.empty(capacity, dtype=column.dtype)
+            new[:len(rows)] = column[rows]
+            resized[name] = new
+        self._set_columns(resized)
+        self.alive[len(rows):] = False
+
+    def _grow(self):
+        self._resize(max(_MIN_CAPACITY, len(self.alive) * 2), np.arange(self.size))
+
+    def _compact(self):
+        """Drops deleted rows once they make up a quarter of the table"""
+        keep = np.flatnonzero(self.alive[:self.size])
+        self._resize(len(self.alive), keep)
+        self.records = [self.records[row] for row in keep]
+        self.row_of = {record.id: row for row, record in enumerate(self.records)}
+        self.size = len(self.records)
+        self.dead = 0
+
+    # ============ Mutations ============
+
+    def _upsert(self, record: CandidateRecord):
+        row = self.row_of.get(record.id)
+        if row is None:
+            if self.size == len(self.alive):
+                self._grow()
+            row = self.size
+            self.size += 1
+            self.records.append(record)
+            self.row_of[record.id] = row
+        else:
+            self.records[row] = record
+        self.alive[row] = True
+        self.position_code[row] = self.positions.code(record.get("position_id") or "")
+        self.status_code[row] = self.statuses.code(normalize_status(record.get("status")))
+        self.created_ts[row], self.created_day[row] = _parse_created(record.get("created_at"))
+        for name, column in self.scores.items():
+            column[row] = _to_float(record.get(name))
+
+    def _remove(self, candidate_id: str):
+        row = self.row_of.pop(candidate_id, None)
+        if row is None:
+            return
+        self.alive[row] = False
+        self.records[row] = None
+        self.dead += 1
+        if self.dead > _MIN_CAPACITY and self.dead * 4 > self.size:
+            self._compact()
+
+    def rebuild(self):
+        """Reloads every candidate from storage"""
+        # Load outside the lock (storage writers hold their lock while notifying
+        # us); a write racing the load changes the version and triggers another rebuild
+        version = storage.get_version()
+        candidates = storage.get_all_candidates()
+        capacity = _MIN_CAPACITY
+        while capacity < len(candidates):
+            capacity *= 2
+        fresh = CandidateTable()
+        fresh._clear(capacity)
+        for record in candidates:
+            fresh._upsert(record)
+        with self._lock:
+            for name, value in vars(fresh).items():
+                if name != "_lock":
+                    setattr(self, name, value)
+            self.version = version
+
+    def on_event(self, event: str, payload: Dict):
+        """Storage listener: applies a mutation in place, or marks the table stale"""
+        with self._lock:
+            version = payload["version"]
+            if self.version is None or version != (self.version[0], self.version[1] + 1):
+                # Never loaded, or missed another process' writes
+                self.version = None
+                return
+            if event in ("candidates_saved", "statuses_changed"):
+                for record in payload["candidates"]:
+                    self._upsert(record)
+            elif event == "status_changed" and payload.get("candidate") is not None:
+                self._upsert(payload["candidate"])
+            elif event == "candidate_deleted":
+                self._remove(payload["candidate_id"])
+            elif event == "candidates_archived":
+                for candidate_id in payload["archived"]:
+                    self._remove(candidate_id)
+            elif event == "position_deleted":
+                for candidate_id in payload.get("candidate_ids", []):
+                    self._remove(candidate_id)
+            elif event == "store_replaced":
+                self.version = None
+                return
+            self.version = version
+
+    def _ensure_current(self):
+        if self.version is None or self.version != storage.get_version():
+            self.rebuild()
+
+    # ============ Queries ============
+
+    def _mask(self, position_id: Optional[str] = None, statuses: Optional[Iterable[str]] = None,
+              min_score: Optional[float] = None, max_score: Optional[float] = None) -> np.ndarray:
+        n = self.size
+        mask = self.alive[:n].copy()
+        if position_id is not None:
+            code = self.positions.codes.get(position_id)
+            if code is None:
+                return np.zeros(n, dtype=bool)
+            mask &= self.position_code[:n] == code
+        if statuses:
+            codes = [self.statuses.codes[s] for s in map(normalize_status, statuses) if s in self.statuses.codes]
+            mask &= np.isin(self.status_code[:n], codes)
+        score = self.scores["final_rank_score"][:n]
+        if min_score is not None:
+            mask &= score >= min_score
+        if max_score is not None:
+            mask &= score <= max_score
+        return mask
+
+    def query(self, position_id: Optional[str] = None, statuses: Optional[Iterable[str]] = None,
+              min_score: Optional[float] = None, max_score: Optional[float] = None,
+              sort_by: str = "final_rank_score", descending: bool = True,
+              limit: Optional[int] = None) -> List[CandidateRecord]:
+        """Returns matching candidates sorted by a score column (missing values last)"""
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by '{sort_by}'")
+        self._ensure_current()
+        with self._lock:
+            rows = np.flatnonzero(self._mask(position_id, statuses, min_score, max_score))
+            column = self.created_ts if sort_by == "created_at" else self.scores[sort_by]
+            keys = column[rows]
+            # NaN sorts last in ascending order, so negate for descending
+            order = np.argsort(-keys if descending else keys, kind="stable")
+            if limit is not None:
+                order = order[:limit]
+            return [self.records[row] for row in rows[order]]
+
+    def count(self, **filters) -> int:
+        self._ensure_current()
+        with self._lock:
+            return int(self._mask(**filters).sum())
+
+    def status_counts(self, position_id: Optional[str] = None) -> Dict[str, int]:
+        """Returns {status: count}, with pending/accepted/rejected always present"""
+        self._ensure_current()
+        with self._lock:
+            mask = self._mask(position_id)
+            counts = np.bincount(self.status_code[:self.size][mask], minlength=len(self.statuses.values))
+            return {status: int(counts[code]) for code, status in enumerate(self.statuses.values)}
+
+    def score_histogram(self, position_id: Optional[str] = None, bins: int = 10,
+                        column: str = "final_rank_score") -> Dict:
+        """Returns {'edges': [...], 'counts': [...]} of a 0-10 score column"""
+        self._ensure_current()
+        with self._lock:
+            values = self.scores[column][:self.size][self._mask(position_id)]
+            values = values[~np.isnan(values)]
+            counts, edges = np.histogram(values, bins=bins, range=(0, 10))
+            return {"edges": [round(float(e), 2) for e in edges], "counts": counts.tolist()}
+
+    def status_by_position(self) -> Dict[str, Dict[str, int]]:
+        """Returns {position_id: {status: count}} ('' for unassigned candidates)"""
+        self._ensure_current()
+        with self._lock:
+            n = self.size
+            alive = self.alive[:n]
+            n_status = len(self.statuses.values)
+            flat = self.position_code[:n][alive].astype(np.int64) * n_status + self.status_code[:n][alive]
+            grid = np.bincount(flat, minlength=len(self.positions.values) * n_status)
+            grid = grid.reshape(len(self.positions.values), n_status)
+            totals = grid.sum(axis=1)
+            return {self.positions.values[p]: {status: int(grid[p, s]) for s, status in enumerate(self.statuses.values)}
+                    for p in np.flatnonzero(totals)}
+
+    def applicants_per_day(self, days: int = 30, position_id: Optional[str] = None,
+                           today: Optional[date] = None) -> List[Dict]:
+        """Returns [{'date': 'YYYY-MM-DD', 'count': n}] for the last `days` days"""
+        today = today or date.today()
+        first = today.toordinal() - days + 1
+        self._ensure_current()
+        with self._lock:
+            day = self.created_day[:self.size][self._mask(position_id)]
+            day = day[(day >= first) & (day <= today.toordinal())] - first
+            counts = np.bincount(day, minlength=days)
+        start = date.fromordinal(first)
+        return [{"date": (start + timedelta(days=i)).isoformat(), "count": int(counts[i])} for i in range(days)]
+
+    def overview_stats(self) -> Dict:
+        """Same keys as storage.get_overview_stats, computed on the columns"""
+        today = date.today()
+        month_start = today.replace(day=1).toordinal()
+        self._ensure_current()
+        with self._lock:
+            n = self.size
+            alive = self.alive[:n]
+            status = self.status_code[:n]
+            day = self.created_day[:n]
+            accepted = alive & (status == self.statuses.codes["accepted"])
+            stats = {
+                "total_candidates": int(alive.sum()),
+                "today_applicants": int((alive & (day >= today.toordinal())).sum()),
+                "hires_this_month": int((accepted & (day >= month_start)).sum()),
+                "pending_count": int((alive & (status == self.statuses.codes["pending"])).sum()),
+                "accepted_count": int(accepted.sum()),
+                "rejected_count": int((alive & (status == self.statuses.codes["rejected"])).sum()),
+            }
+        stats["total_positions"] = len(storage.get_all_positions())
+        return stats
+
+
+_table = CandidateTable()
+storage.subscribe(_table.on_event)
+
+
+def get_table() -> CandidateTable:
+    """Returns the process-wide candidate table"""
+    return _table
@@ -1,32 +1,10 @@
-import json
-from collections import Counter
+"""
+Reports near-duplicate candidates per position.
+Thin wrapper around `python dedup.py report`; see dedup.py for options.
+"""
+import sys
 
-def check_data():
-    try:
-        with open('data.json', 'r') as f:
-            data = json.load(f)
-        
-        candidates = data.get('candidates', [])
-        print(f"Total candidates: {len(candidates)}")
-        
-        names = [c.get('name', 'Unknown') for c in candidates]
-        counts = Counter(names)
-        
-        print("\nCandidate Counts:")
-        for name, count in counts.items():
-            print(f"- {name}: {count}")
-            
-        duplicates = [name for name, count in counts.items() if count > 1]
-        
-        if duplicates:
-            print("\nWARNING: Duplicates detected!")
-            for name in duplicates:
-                print(f"  {name} appears {counts[name]} times.")
-        else:
-            print("\nNo duplicates found.")
-            
-    except Exception as e:
-        print(f"Error: {e}")
+import dedup
 
 if __name__ == "__main__":
-    check_data()
+    sys.exit(dedup.main(["report"] + sys.argv[1:]))
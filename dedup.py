@@ -0,0 +1,343 @@
+"""
+Near-Duplicate Candidate Detection
+MinHash signatures of resume text, indexed per position with LSH banding,
+so a new candidate is compared only against candidates sharing a band
+bucket instead of the whole position. Signatures are appended to a small
+per-position index file (one JSON line per candidate), never rewriting the
+data store.
+
+Usage:
+    python dedup.py rebuild                       # index existing candidates
+    python dedup.py report [--position-id ID]     # list duplicate clusters
+    python dedup.py merge [--position-id ID] [--keep newest|highest] [--dry-run]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS  # 8 rows per band -> candidate threshold ~0.7 Jaccard
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.8
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1337)
+_PERM_A = _rng.randint(1, _PRIME, size=NUM_PERM, dtype=np.int64)
+_PERM_B = _rng.randint(0, _PRIME, size=NUM_PERM, dtype=np.int64)
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def _shingles(text: str) -> set:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> List[int]:
+    """Returns the MinHash signature (NUM_PERM ints) of a resume text"""
+    shingles = _shingles(text or "")
+    if not shingles:
+        return [_PRIME] * NUM_PERM
+    hashes = np.fromiter((zlib.crc32(s.encode()) & _PRIME for s in shingles), dtype=np.int64, count=len(shingles))
+    # (a * h + b) mod p for every permutation/shingle pair; a, h < 2^31 so no int64 overflow
+    values = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _PRIME
+    return values.min(axis=1).tolist()
+
+
+def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+def _band_keys(signature: List[int]) -> List[Tuple[int, int]]:
+    return [(band, hash(tuple(signature[band * ROWS:(band + 1) * ROWS]))) for band in range(BANDS)]
+
+
+class PositionIndex:
+    """In-memory LSH index for one position, backed by an append-only JSONL file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.signatures: Dict[str, List[int]] = {}
+        self.buckets: Dict[Tuple[int, int], set] = defaultdict(set)
+        self.stat = None
+        self.load()
+
+    def _file_stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        self.signatures.clear()
+        self.buckets.clear()
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn append (e.g. a crash mid-write) must not block the position
+                        print(f"Skipping unreadable line in {self.path}")
+                        continue
+                    if entry.get("deleted"):
+                        self._remove(entry["id"])
+                    else:
+                        self._add(entry["id"], entry["sig"])
+        self.stat = self._file_stat()
+
+    def is_stale(self) -> bool:
+        return self._file_stat() != self.stat
+
+    def _add(self, candidate_id: str, signature: List[int]):
+        self._remove(candidate_id)
+        self.signatures[candidate_id] = signature
+        for key in _band_keys(signature):
+            self.buckets[key].add(candidate_id)
+
+    def _remove(self, candidate_id: str):
+        signature = self.signatures.pop(candidate_id, None)
+        if signature is not None:
+            for key in _band_keys(signature):
+                self.buckets[key].discard(candidate_id)
+
+    def _append(self, entries: List[Dict]):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # One write per batch; callers hold storage.write_lock(), so appends never interleave
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+        self.stat = self._file_stat()
+
+    def query(self, signature: List[int], threshold: float, exclude: Optional[str] = None) -> List[Dict]:
+        """Returns indexed candidates whose estimated similarity is >= threshold"""
+        matches = set()
+        for key in _band_keys(signature):
+            matches.update(self.buckets.get(key, ()))
+        matches.discard(exclude)
+        results = []
+        for candidate_id in matches:
+            score = similarity(signature, self.signatures[candidate_id])
+            if score >= threshold:
+                results.append({"id": candidate_id, "similarity": round(score, 3)})
+        results.sort(key=lambda r: r["similarity"], reverse=True)
+        return results
+
+    def add(self, candidate_id: str, signature: List[int]):
+        self._add(candidate_id, signature)
+        self._append([{"id": candidate_id, "sig": signature}])
+
+    def add_many(self, items: List[Tuple[str, List[int]]]):
+        for candidate_id, signature in items:
+            self._add(candidate_id, signature)
+        self._append([{"id": cid, "sig": sig} for cid, sig in items])
+
+    def remove(self, candidate_id: str):
+        if candidate_id in self.signatures:
+            self._remove(candidate_id)
+            self._append([{"id": candidate_id, "deleted": True}])
+
+
+_indexes: Dict[str, PositionIndex] = {}
+_lock = threading.Lock()
+
+
+def _index_path(index_dir: str, position_id: Optional[str]) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_-]", "_", position_id or "") or "_unassigned"
+    return os.path.join(index_dir, f"{safe}.jsonl")
+
+
+def get_index(index_dir: str, position_id: Optional[str]) -> PositionIndex:
+    path = _index_path(index_dir, position_id)
+    index = _indexes.get(path)
+    if index is None:
+        index = _indexes[path] = PositionIndex(path)
+    elif index.is_stale():
+        index.load()
+    return index
+
+
+# ============ Storage Hooks ============
+
+def index_candidate(candidate: Dict, index_dir: str, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Indexes a candidate's resume and returns near-duplicates in the same position"""
+    text = candidate.get("raw_resume_text")
+    if not text:
+        return []
+    signature = minhash(text)
+    with _lock:
+        index = get_index(index_dir, candidate.get("position_id"))
+        duplicates = index.query(signature, threshold, exclude=candidate["id"])
+        index.add(candidate["id"], signature)
+    return duplicates
+
+
+def index_candidates(candidates: List[Dict], index_dir: str, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, List[Dict]]:
+    """Batch version of index_candidate; returns {candidate_id: duplicates}"""
+    by_position: Dict[Optional[str], List[Tuple[str, List[int]]]] = defaultdict(list)
+    found = {}
+    with _lock:
+        for c in candidates:
+            if not c.get("raw_resume_text"):
+                continue
+            signature = minhash(c["raw_resume_text"])
+            index = get_index(index_dir, c.get("position_id"))
+            duplicates = index.query(signature, threshold, exclude=c["id"])
+            # Also compare against earlier candidates of the same batch
+            for other_id, other_sig in by_position[c.get("position_id")]:
+                score = similarity(signature, other_sig)
+                if score >= threshold:
+                    duplicates.append({"id": other_id, "similarity": round(score, 3)})
+            if duplicates:
+                found[c["id"]] = duplicates
+            by_position[c.get("position_id")].append((c["id"], signature))
+        for position_id, items in by_position.items():
+            get_index(index_dir, position_id).add_many(items)
+    return found
+
+
+def remove_candidate(candidate_id: str, position_id: Optional[str], index_dir: str):
+    with _lock:
+        get_index(index_dir, position_id).remove(candidate_id)
+
+
+def drop_position(position_id: str, index_dir: str):
+    path = _index_path(index_dir, position_id)
+    with _lock:
+        _indexes.pop(path, None)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# ============ Reporting / Merging ============
+
+def find_clusters(index: PositionIndex, threshold: float) -> List[List[Dict]]:
+    """Groups indexed candidates into connected clusters of near-duplicates"""
+    parent = {cid: cid for cid in index.signatures}
+    best: Dict[Tuple[str, str], float] = {}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for cid, signature in index.signatures.items():
+        for match in index.query(signature, threshold, exclude=cid):
+            best[tuple(sorted((cid, match["id"])))] = match["similarity"]
+            parent[find(cid)] = find(match["id"])
+
+    groups = defaultdict(list)
+    for cid in index.signatures:
+        groups[find(cid)].append(cid)
+    clusters = []
+    for members in groups.values():
+        if len(members) > 1:
+            clusters.append([{"id": m, "similarity": max((s for pair, s in best.items() if m in pair), default=1.0)}
+                             for m in members])
+    return clusters
+
+
+def _keep_key(policy: str):
+    if policy == "highest":
+        return lambda c: (c.get("final_rank_score") or 0, c.get("created_at") or "")
+    return lambda c: c.get("created_at") or ""
+
+
+def _positions(position_id: Optional[str]) -> List[Optional[str]]:
+    import storage
+    if position_id:
+        return [position_id]
+    ids = [p["id"] for p in storage.get_all_positions()]
+    return ids + [None]
+
+
+def rebuild(threshold: float = DEFAULT_THRESHOLD):
+    """Rebuilds every position index from the candidates currently in storage"""
+    import storage
+    index_dir = storage.dedup_index_dir()
+    if os.path.isdir(index_dir):
+        for name in os.listdir(index_dir):
+            if name.endswith(".jsonl"):
+                os.remove(os.path.join(index_dir, name))
+    _indexes.clear()
+    candidates = storage.get_all_candidates()
+    index_candidates(candidates, index_dir, threshold)
+    print(f"Indexed {len(candidates)} candidates into {index_dir}")
+
+
+def report(position_id: Optional[str], threshold: float) -> List[Dict]:
+    import storage
+    index_dir = storage.dedup_index_dir()
+    out = []
+    for pid in _positions(position_id):
+        index = get_index(index_dir, pid)
+        for cluster in find_clusters(index, threshold):
+            members = []
+            for member in cluster:
+                c = storage.get_candidate(member["id"]) or {}
+                members.append({**member, "name": c.get("name"), "created_at": c.get("created_at"),
+                                "final_rank_score": c.get("final_rank_score"), "status": c.get("status")})
+            out.append({"position_id": pid, "candidates": members})
+    return out
+
+
+def merge(position_id: Optional[str], threshold: float, keep: str, dry_run: bool) -> Dict:
+    """Keeps one candidate per duplicate cluster and deletes the rest"""
+    import storage
+    removed = []
+    clusters = report(position_id, threshold)
+    for cluster in clusters:
+        members = sorted(cluster["candidates"], key=_keep_key(keep), reverse=True)
+        for member in members[1:]:
+            removed.append(member["id"])
+            print(f"{'Would remove' if dry_run else 'Removing'} {member['name']} ({member['id']}), "
+                  f"duplicate of {members[0]['name']} ({members[0]['id']})")
+            if not dry_run:
+                storage.delete_candidate(member["id"])
+    return {"clusters": len(clusters), "removed": len(removed), "dry_run": dry_run}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Near-duplicate candidate detection.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("rebuild", "report", "merge"):
+        p = sub.add_parser(name)
+        p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="minimum estimated Jaccard similarity")
+        if name != "rebuild":
+            p.add_argument("--position-id", help="limit to one position (default: all)")
+        if name == "merge":
+            p.add_argument("--keep", choices=["newest", "highest"], default="newest",
+                           help="which candidate of a cluster to keep")
+            p.add_argument("--dry-run", action="store_true", help="only print what would be removed")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        rebuild(args.threshold)
+    elif args.command == "report":
+        clusters = report(args.position_id, args.threshold)
+        print(json.dumps(clusters, indent=2))
+        print(f"{len(clusters)} duplicate cluster(s) found.", file=sys.stderr)
+    else:
+        print(json.dumps(merge(args.position_id, args.threshold, args.keep, args.dry_run), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Candidate Export Module
+Generators that stream candidate rows as CSV or JSON Lines, one row at a
+time, so large exports never build the whole file (or a DataFrame) in memory.
+"""
+
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Columns exported when none are requested (raw_resume_text is opt-in)
+DEFAULT_COLUMNS = [
+    "id", "name", "university", "skills", "python_score", "uni_tier_score",
+    "experience_score", "python_experience_years", "final_rank_score",
+    "analysis_method", "status", "created_at", "source_file",
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def parse_columns(raw: Optional[str]) -> List[str]:
+    """Returns the requested columns (comma-separated) or the defaults"""
+    if not raw:
+        return list(DEFAULT_COLUMNS)
+    columns = [c.strip() for c in raw.split(",") if c.strip()]
+    return columns or list(DEFAULT_COLUMNS)
+
+
+def filter_candidates(candidates: Iterable[Dict], statuses: Optional[List[str]] = None,
+                      min_score: Optional[float] = None, max_score: Optional[float] = None) -> Iterator[Dict]:
+    """Lazily filters candidates by status (case-insensitive) and final score range"""
+    wanted = {s.lower() for s in statuses} if statuses else None
+    for c in candidates:
+        if wanted is not None and (c.get("status") or "pending").lower() not in wanted:
+            continue
+        score = c.get("final_rank_score") or 0
+        if min_score is not None and score < min_score:
+            continue
+        if max_score is not None and score > max_score:
+            continue
+        yield c
+
+
+# Spreadsheet apps evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value):
+    if isinstance(value, (list, tuple)):
+        value = "; ".join(str(v) for v in value)
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Applicant-supplied text (names, skills) must not run as a formula
+        return "'" + value
+    return value
+
+
+def iter_csv(candidates: Iterable[Dict], columns: List[str]) -> Iterator[str]:
+    """Yields a CSV header followed by one encoded line per candidate"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return line
+
+    writer.writerow(columns)
+    yield flush()
+    for c in candidates:
+        writer.writerow([_csv_value(c.get(col)) for col in columns])
+        yield flush()
+
+
+def iter_jsonl(candidates: Iterable[Dict], columns: List[str]) -> Iterator[str]:
+    """Yields one JSON object per line per candidate"""
+    for c in candidates:
+        yield json.dumps({col: c.get(col) for col in columns}, ensure_ascii=False) + "\n"
+
+
+def iter_export(fmt: str, candidates: Iterable[Dict], columns: List[str]) -> Iterator[str]:
+    if fmt == "csv":
+        return iter_csv(candidates, columns)
+    if fmt == "jsonl":
+        return iter_jsonl(candidates, columns)
+    raise ValueError(f"Unsupported export format: {fmt}")
@@ -0,0 +1,274 @@
+"""
+Institution Tier Resolver
+Resolves university names (as written in resumes, including aliases and
+abbreviations such as "IIT-B" or "Univ. of Michigan") to a tier, using an
+institution database loaded from CSV (INSTITUTIONS_FILE, default
+institutions.csv next to this module):
+
+    name,tier,aliases
+    Indian Institute of Technology Bombay,global,IIT Bombay|IIT-B|IITB
+
+tier is one of TIERS. Names and aliases are normalized (case, accents,
+punctuation, common abbreviations like "Univ.", filler words) into token
+sequences and compiled into a token trie once per process. Resolving a
+line walks the trie from each token, so the cost grows with the line
+length (each walk is bounded by the longest name), not with the number of
+institutions. Results are cached per input string.
+
+Single-word names that are also ordinary words or places ("Cambridge",
+"Brown", "Penn") and short acronyms ("MIT", "NUS") are ambiguous: they only
+count when the text is just that name, or when the line also has an
+education cue (a degree, "University", "GPA", ...) and the word does not
+start another institution's name ("Penn Foster College"). Longer acronyms
+such as "IITB" or "UPenn" always count.
+
+Usage:
+    python institutions.py resolve "B.Tech, IIT-B (2019)"
+    python institutions.py check [path]
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+INSTITUTIONS_FILE = os.getenv("INSTITUTIONS_FILE",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "institutions.csv"))
+CACHE_SIZE = int(os.getenv("INSTITUTION_CACHE_SIZE", "50000"))
+
+# tier -> (uni_tier_score, evidence)
+TIERS = {
+    "global": (10, "Global Top Tier University detected."),
+    "national": (8, "Leading National University detected."),
+    "regional": (6, "Regional University detected."),
+}
+DEFAULT_TIER = (5, "Standard University tier.")
+
+ABBREVIATIONS = {"univ": "university", "uni": "university", "inst": "institute", "instt": "institute",
+                 "coll": "college", "natl": "national", "intl": "international"}
+FILLER_WORDS = {"the", "of", "at"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words that make a line about education (after normalize())
+INSTITUTION_WORDS = {"university", "college", "institute", "school", "academy", "polytechnic"}
+EDUCATION_WORDS = INSTITUTION_WORDS | {
+    "bachelor", "bachelors", "master", "masters", "phd", "doctorate", "degree", "diploma", "graduated",
+    "gpa", "cgpa", "bsc", "msc", "btech", "mtech", "mba", "alumni", "alumnus", "education"}
+# Dotted degrees ("B.S.", "Ph.D.") split into two tokens; "MA" alone is a state
+DEGREE_BIGRAMS = {("b", "s"), ("b", "a"), ("m", "s"), ("m", "a"), ("b", "e"), ("m", "e"), ("b", "tech"),
+                  ("m", "tech"), ("b", "sc"), ("m", "sc"), ("ph", "d")}
+
+
+class Institution(NamedTuple):
+    name: str
+    tier: str
+    score: int
+    evidence: str
+
+
+def normalize(text: str) -> Tuple[str, ...]:
+    """Returns the comparison tokens of a name or resume line"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower().replace("&", " and ")
+    tokens = (ABBREVIATIONS.get(token, token) for token in _TOKEN_RE.findall(text))
+    return tuple(token for token in tokens if token not in FILLER_WORDS)
+
+
+def has_education_cue(text: str) -> bool:
+    """Returns True if a line mentions a degree, an institution type or grades"""
+    return _has_cue(normalize(text))
+
+
+def _has_cue(tokens: Tuple[str, ...]) -> bool:
+    return any(token in EDUCATION_WORDS for token in tokens) or \
+        any(pair in DEGREE_BIGRAMS for pair in zip(tokens, tokens[1:]))
+
+
+def is_ambiguous(name: str) -> bool:
+    """Single capitalized words and acronyms of up to three letters may mean something else"""
+    name = name.strip()
+    if len(normalize(name)) != 1 or not name.isalpha():
+        return False
+    return name[1:].islower() or len(name) <= 3
+
+
+# ============ Loading ============
+
+def load(path: Optional[str] = None) -> List[Tuple[Institution, List[str]]]:
+    """Reads an institution CSV; returns (institution, names and aliases) pairs"""
+    path = path or INSTITUTIONS_FILE
+    institutions = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=2):
+            name = (row.get("name") or "").strip()
+            tier = (row.get("tier") or "").strip().lower()
+            if not name:
+                continue
+            if tier not in TIERS:
+                raise ValueError(f"{path}:{line_no}: unknown tier {tier!r} (expected one of {', '.join(TIERS)})")
+            aliases = [a.strip() for a in (row.get("aliases") or "").split("|") if a.strip()]
+            score, evidence = TIERS[tier]
+            institutions.append((Institution(name, tier, score, evidence), [name] + aliases))
+    return institutions
+
+
+class Resolver:
+    """Token trie over every institution name and alias, with an LRU result cache"""
+
+    _END = ""  # trie key holding (institution, ambiguous) for a path that ends a name (never a token)
+
+    def __init__(self, institutions: List[Tuple[Institution, List[str]]]):
+        self.root: Dict = {}
+        self.size = len(institutions)
+        self.names = 0
+        self.conflicts: List[str] = []
+        for institution, names in institutions:
+            for name in names:
+                self._add(normalize(name), institution, name)
+        self._cache: "OrderedDict[str, Optional[Institution]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _add(self, tokens: Tuple[str, ...], institution: Institution, name: str):
+        if not tokens:
+            return
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        ambiguous = is_ambiguous(name)
+        existing = node.get(self._END)
+        if existing is not None and existing[0].name != institution.name:
+            # First definition wins, so the file order decides
+            self.conflicts.append(f"{name!r} is already a name of {existing[0].name!r}")
+            return
+        if existing is None:
+            self.names += 1
+            node[self._END] = (institution, ambiguous)
+        else:
+            node[self._END] = (institution, existing[1] and ambiguous)
+
+    @staticmethod
+    def _accept_ambiguous(tokens: Tuple[str, ...], start: int) -> bool:
+        """An ambiguous one-word name counts if it is the whole text, or if the line
+        is about education and the word does not begin another name ("Penn Foster College")"""
+        if len(tokens) == 1:
+            return True
+        for offset, token in enumerate(tokens[start + 1:start + 5]):
+            if token in INSTITUTION_WORDS:
+                if offset > 0:
+                    return False
+                break
+        return _has_cue(tokens)
+
+    def _match(self, tokens: Tuple[str, ...]) -> Optional[Institution]:
+        """Best institution named anywhere in the tokens: highest tier, then longest name, then earliest"""
+        best, best_key = None, None
+        root = self.root
+        for start in range(len(tokens)):
+            node = root.get(tokens[start])
+            end = start + 1
+            found, length = None, 0
+            while node is not None:
+                if self._END in node:
+                    (found, ambiguous), length = node[self._END], end - start
+                if end == len(tokens):
+                    break
+                node = node.get(tokens[end])
+                end += 1
+            if found is not None and ambiguous and not self._accept_ambiguous(tokens, start):
+                found = None
+            if found is not None:
+                key = (found.score, length, -start)
+                if best_key is None or key > best_key:
+                    best, best_key = found, key
+        return best
+
+    def resolve(self, text: str) -> Optional[Institution]:
+        """Returns the institution named in text, or None"""
+        with self._lock:
+            if text in self._cache:
+                self._cache.move_to_end(text)
+                return self._cache[text]
+        result = self._match(normalize(text))
+        with self._lock:
+            self._cache[text] = result
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def cache_clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+# ============ Process-Wide Resolver ============
+
+_resolver: Optional[Resolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver() -> Resolver:
+    """Returns the resolver for INSTITUTIONS_FILE, compiling it on first use"""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = Resolver(load())
+                for conflict in _resolver.conflicts:
+                    print(f"Institution database: {conflict}; ignored")
+    return _resolver
+
+
+def reload(path: Optional[str] = None) -> Resolver:
+    """Recompiles the resolver from path (or INSTITUTIONS_FILE), e.g. after the file was edited"""
+    global _resolver
+    resolver = Resolver(load(path))
+    with _resolver_lock:
+        _resolver = resolver
+    return resolver
+
+
+def resolve(text: str) -> Optional[Institution]:
+    return get_resolver().resolve(text)
+
+
+def tier(university: str) -> Tuple[int, str]:
+    """Returns (uni_tier_score, evidence) for a university name"""
+    institution = resolve(university)
+    if institution is None:
+        return DEFAULT_TIER
+    return institution.score, institution.evidence
+
+
+def preload():
+    """Compiles the institution trie up front (see app.preload)"""
+    get_resolver()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve university names to tiers.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("resolve").add_argument("text", nargs="+")
+    sub.add_parser("check", help="validate an institution file").add_argument("path", nargs="?")
+    args = parser.parse_args(argv)
+
+    if args.command == "resolve":
+        for text in args.text:
+            institution = resolve(text)
+            print(f"{text!r}: " + (f"{institution.name} ({institution.tier}, {institution.score})"
+                                    if institution else f"no match ({DEFAULT_TIER[0]})"))
+        return 0
+    resolver = Resolver(load(args.path))
+    for conflict in resolver.conflicts:
+        print(f"Conflict: {conflict}")
+    print(f"{resolver.size} institutions, {resolver.names} names")
+    return 1 if resolver.conflicts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
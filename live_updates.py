@@ -0,0 +1,250 @@
+"""
+Live Updates
+Pushes storage change events to open dashboard/overview pages over
+Server-Sent Events, so pages patch rows and counters in place instead of
+being reloaded to pick up new applicants or status changes.
+
+Events are converted into small messages and coalesced for
+LIVE_UPDATES_COALESCE_MS: a burst of saves or a bulk status update reaches
+each page as one batch, with at most one message per candidate. Each
+subscriber may be limited to one position; batches for HR sessions also
+carry the current overview counters. Pages that fall behind, and all pages
+after a write from another process, are told to resync (reload) instead.
+
+Each open stream holds a worker thread, so run under a threaded server
+(the Flask dev server, or gunicorn with --threads / gthread workers). At
+most LIVE_UPDATES_MAX_SUBSCRIBERS streams are open per process (keep it
+below the worker's thread count so streams cannot starve page requests);
+further pages are refused and simply stay static.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+import storage
+from candidate_table import get_table
+
+COALESCE_SECONDS = int(os.getenv("LIVE_UPDATES_COALESCE_MS", "500")) / 1000.0
+HEARTBEAT_SECONDS = 15
+POLL_SECONDS = 2  # how often to look for writes made by other processes
+MAX_QUEUED_BATCHES = 32
+MAX_SUBSCRIBERS = int(os.getenv("LIVE_UPDATES_MAX_SUBSCRIBERS", "8"))
+RETRY_MS = 3000
+
+
+def _score(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else round(value, 2)
+
+
+def _candidate_message(record) -> Dict:
+    return {
+        "type": "candidate",
+        "id": record["id"],
+        "position_id": record.get("position_id") or None,
+        "name": record.get("name"),
+        "status": record.get("status") or "Pending",
+        "final_rank_score": _score(record.get("final_rank_score")),
+    }
+
+
+class Subscriber:
+    """One open event stream, optionally limited to a single position; only
+    overview subscribers (HR sessions) receive the overview counters"""
+
+    def __init__(self, position_id: Optional[str] = None, overview: bool = False):
+        self.position_id = position_id
+        self.overview = overview
+        self.queue: "queue.Queue[Dict]" = queue.Queue(maxsize=MAX_QUEUED_BATCHES)
+
+    def wants(self, message: Dict) -> bool:
+        if self.position_id is None or "position_id" not in message:
+            return True
+        return message["position_id"] == self.position_id
+
+    def deliver(self, batch: Dict):
+        try:
+            self.queue.put_nowait(batch)
+        except queue.Full:
+            # Too far behind to patch reliably; replace the backlog with a resync
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.queue.put_nowait({"events": [{"type": "resync"}]})
+
+
+class Broker:
+    """Collects storage events and fans coalesced batches out to subscribers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._pending: "OrderedDict[Hashable, Dict]" = OrderedDict()
+        self._wake = threading.Event()
+        self._thread = None
+        self.version = None
+        self._foreign = None  # version seen on the previous poll that no event explained
+
+    def subscribe(self, position_id: Optional[str] = None, overview: bool = False) -> Optional[Subscriber]:
+        """Returns a new subscriber, or None if MAX_SUBSCRIBERS streams are already open"""
+        subscriber = Subscriber(position_id, overview)
+        with self._lock:
+            if len(self._subscribers) >= MAX_SUBSCRIBERS:
+                return None
+            if self.version is None:
+                self.version = storage.get_version()
+            self._subscribers.add(subscriber)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="live-updates", daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    # ============ Event Intake ============
+
+    def _queue(self, key: Hashable, message: Dict):
+        self._pending.pop(key, None)
+        self._pending[key] = message
+
+    def _resync(self):
+        self._pending.clear()
+        self._pending["resync"] = {"type": "resync"}
+
+    def _status(self, candidate_id: str, position_id: Optional[str], status: str):
+        pending = self._pending.get(("candidate", candidate_id))
+        if pending is not None:
+            pending["status"] = status
+        else:
+            self._queue(("candidate", candidate_id),
+                        {"type": "status", "id": candidate_id, "position_id": position_id or None, "status": status})
+
+    def on_event(self, event: str, payload: Dict):
+        """Storage listener: only queues messages, the flusher thread does the rest"""
+        with self._lock:
+            version = payload["version"]
+            gap = self.version is not None and version != (self.version[0], self.version[1] + 1)
+            self.version = version
+            if not self._subscribers:
+                return
+            if gap or event == "store_replaced":
+                self._resync()
+            elif "resync" in self._pending:
+                pass
+            elif event == "candidates_saved":
+                for record in payload["candidates"]:
+                    self._queue(("candidate", record["id"]), _candidate_message(record))
+            elif event == "statuses_changed":
+                for record in payload["candidates"]:
+                    self._status(record["id"], record.get("position_id"), payload["status"])
+            elif event == "status_changed":
+                self._status(payload["candidate_id"], payload.get("position_id"), payload["status"])
+            elif event == "candidate_deleted":
+                self._queue(("candidate", payload["candidate_id"]),
+                            {"type": "deleted", "id": payload["candidate_id"],
+                             "position_id": payload.get("position_id") or None})
+            elif event == "candidates_archived":
+                for candidate_id, position_id in payload["archived"].items():
+                    self._queue(("candidate", candidate_id),
+                                {"type": "deleted", "id": candidate_id, "position_id": position_id})
+            elif event == "position_deleted":
+                for candidate_id in payload.get("candidate_ids", []):
+                    self._pending.pop(("candidate", candidate_id), None)
+                self._queue(("position", payload["position_id"]),
+                            {"type": "position_deleted", "position_id": payload["position_id"]})
+            elif event in ("position_saved", "position_updated"):
+                self._queue("positions", {"type": "positions"})
+            else:
+                return
+            self._wake.set()
+
+    # ============ Flushing ============
+
+    def _check_foreign_writes(self):
+        """Resyncs once the store version has moved without a local event"""
+        current = storage.get_version()
+        with self._lock:
+            if current == self.version:
+                self._foreign = None
+            elif current == self._foreign:
+                # Unchanged across two polls, so not a local write still notifying
+                self.version = current
+                self._foreign = None
+                self._resync()
+                self._wake.set()
+            else:
+                self._foreign = current
+
+    def _take(self) -> List[Dict]:
+        with self._lock:
+            messages = list(self._pending.values())
+            self._pending.clear()
+            self._wake.clear()
+            return messages
+
+    def _run(self):
+        while True:
+            if self._wake.wait(POLL_SECONDS):
+                time.sleep(COALESCE_SECONDS)
+            else:
+                self._check_foreign_writes()
+            messages = self._take()
+            if messages:
+                try:
+                    self.flush(messages)
+                except Exception as e:
+                    print(f"Live update flush failed: {e}")
+
+    def flush(self, messages: List[Dict]):
+        """Sends each subscriber the messages it wants, plus the overview counters
+        for overview subscribers"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        overview = get_table().overview_stats() if any(s.overview for s in subscribers) else None
+        for subscriber in subscribers:
+            events = [message for message in messages if subscriber.wants(message)]
+            if subscriber.overview and subscriber.position_id is None:
+                subscriber.deliver({"events": events, "overview": overview})
+            elif events:
+                subscriber.deliver({"events": events})
+
+
+_broker = Broker()
+storage.subscribe(_broker.on_event)
+
+
+def subscribe(position_id: Optional[str] = None, overview: bool = False) -> Optional[Subscriber]:
+    return _broker.subscribe(position_id, overview)
+
+
+def unsubscribe(subscriber: Subscriber):
+    _broker.unsubscribe(subscriber)
+
+
+def stream(subscriber: Subscriber):
+    """Yields the subscriber's batches as an SSE stream until the client goes away"""
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while True:
+            try:
+                batch = subscriber.queue.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: batch\ndata: {json.dumps(batch)}\n\n"
+    finally:
+        _broker.unsubscribe(subscriber)
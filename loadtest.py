@@ -0,0 +1,346 @@
+"""
+Load Test Driver
+Replays a weighted mix of traffic against the Flask app for a fixed time
+and reports throughput, latency percentiles and error rates per route:
+
+    apply       POST /process_applicant/<position>   one PDF resume (AI analysis)
+    bulk        POST /process_analysis               --bulk-size PDFs for a position
+    dashboard   GET  /dashboard/<position>
+    status      GET  /api/application_status/<id>    ids of candidates seeded at start
+
+Pair it with the mock LLM server (mock_llm.py) so AI analyses hit a local
+endpoint with realistic latency and failures instead of Gemini/Groq.
+With --self-contained, the mock server and the app (threaded werkzeug
+server, temporary DATA_DIR, status rate limit lifted) are started in this
+process:
+
+    python loadtest.py --self-contained --duration 30 --concurrency 16 --llm-latency-ms 800 --llm-error-rate 0.05
+    python loadtest.py --url http://127.0.0.1:5000 --position-id <id> --mix apply=1,dashboard=4,status=10
+
+Redirects are not followed. The form routes (apply, bulk) redirect on
+failure too, so a redirect counts as an error when it flashes an "error"
+message or lands on the applicant portal without a "success" message; other
+redirects count as successes. 429 counts as rate limited, other 4xx/5xx and
+connection failures as errors. Results are JSON on stdout (or --output).
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import bench_data
+import mock_llm
+
+DEFAULT_MIX = "apply=2,bulk=1,dashboard=6,status=10"
+
+
+def _multipart(fields: Dict[str, str], files: List[Tuple[str, str, bytes]]) -> Tuple[bytes, str]:
+    """Encodes form fields and (field, filename, content) files as multipart/form-data"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, filename, content in files:
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/pdf\r\n\r\n'.encode() + content + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class Client:
+    """One keep-alive HTTP connection (per worker thread)"""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes, http.client.HTTPMessage]:
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            self._conn.request(method, path, body=body, headers=headers or {})
+            response = self._conn.getresponse()
+            return response.status, response.read(), response.headers
+        except Exception:
+            self._conn.close()
+            self._conn = None
+            raise
+
+
+# ============ Traffic ============
+
+class Scenario:
+    """What the workers send: a position, seeded candidate IDs and resume PDFs"""
+
+    def __init__(self, position_id: str, candidate_ids: List[str], pdfs: List[bytes], bulk_size: int, use_ai: bool):
+        self.position_id = position_id
+        self.candidate_ids = candidate_ids
+        self.pdfs = pdfs
+        self.bulk_size = bulk_size
+        self.use_ai = use_ai
+
+    def request(self, route: str, rng: random.Random) -> Tuple[str, str, Optional[bytes], Dict[str, str]]:
+        """Returns (method, path, body, headers) for one request of a route"""
+        if route == "apply":
+            body, content_type = _multipart({}, [("resume_file", "resume.pdf", rng.choice(self.pdfs))])
+            return "POST", f"/process_applicant/{self.position_id}", body, {"Content-Type": content_type}
+        if route == "bulk":
+            files = [("resume_files", f"resume{i}.pdf", rng.choice(self.pdfs)) for i in range(self.bulk_size)]
+            fields = {"position_id": self.position_id}
+            if self.use_ai:
+                fields["use_ai"] = "on"
+            body, content_type = _multipart(fields, files)
+            return "POST", "/process_analysis", body, {"Content-Type": content_type}
+        if route == "dashboard":
+            return "GET", f"/dashboard/{self.position_id}", None, {}
+        if route == "status":
+            return "GET", f"/api/application_status/{rng.choice(self.candidate_ids)}", None, {}
+        raise ValueError(f"Unknown route {route!r}")
+
+
+def seed_candidates(client: Client, count: int, rng: random.Random) -> List[str]:
+    """Creates candidates through /api/analyze (rule-based) and returns their IDs"""
+    ids = []
+    for text in bench_data.make_resumes(count, seed=rng.randint(0, 1 << 30)):
+        status, body, _ = client.request("POST", "/api/analyze", json.dumps({"resume_text": text}).encode(),
+                                      {"Content-Type": "application/json"})
+        if status != 200:
+            raise RuntimeError(f"Seeding candidates failed with HTTP {status}")
+        ids.append(json.loads(body)["data"]["id"])
+    return ids
+
+
+def _flash_categories(headers: http.client.HTTPMessage) -> List[str]:
+    """Returns the categories of the messages a response flashed (read from Flask's session cookie)"""
+    for cookie in headers.get_all("Set-Cookie") or []:
+        name, _, value = cookie.split(";", 1)[0].partition("=")
+        if name.strip() != "session" or not value:
+            continue
+        compressed = value.startswith(".")
+        payload = value.lstrip(".").split(".", 1)[0]
+        try:
+            data = base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+            session = json.loads(zlib.decompress(data) if compressed else data)
+        except (ValueError, zlib.error):
+            return []
+        # Flashes are (category, message) tuples, tagged as {" t": [...]} by Flask's serializer
+        flashes = session.get("_flashes", []) if isinstance(session, dict) else []
+        return [(f.get(" t") if isinstance(f, dict) else f)[0] for f in flashes]
+    return []
+
+
+def is_failure(status: Optional[int], headers: Optional[http.client.HTTPMessage]) -> bool:
+    """Returns True for failed requests, including form posts that redirect back with an error"""
+    if status is None or (status >= 400 and status != 429):
+        return True
+    if 300 <= status < 400 and headers is not None:
+        categories = _flash_categories(headers)
+        if "error" in categories:
+            return True
+        target = urlsplit(headers.get("Location", "")).path.rstrip("/")
+        return target.endswith("/applicant") and "success" not in categories
+    return False
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+        self.rate_limited = 0
+
+    def record(self, seconds: float, status: Optional[int], failed: bool):
+        self.latencies.append(seconds)
+        key = str(status) if status is not None else "exception"
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        if status == 429:
+            self.rate_limited += 1
+        elif failed:
+            self.errors += 1
+
+    def summary(self, duration: float) -> Dict:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        def pct(p):
+            return round(latencies[min(count - 1, int(count * p))] * 1000, 2) if count else None
+
+        return {
+            "requests": count,
+            "throughput_rps": round(count / duration, 2) if duration else None,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(latencies[-1] * 1000, 2) if count else None,
+            "error_rate": round(self.errors / count, 4) if count else None,
+            "rate_limited": self.rate_limited,
+            "statuses": self.statuses,
+        }
+
+
+def run_load(base_url: str, scenario: Scenario, mix: Dict[str, float], duration: float, concurrency: int,
+             timeout: float = 120, seed: int = 1) -> Dict:
+    """Runs `concurrency` workers for `duration` seconds; returns per-route summaries"""
+    routes, weights = list(mix), list(mix.values())
+    stats = {route: RouteStats() for route in routes}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(index: int):
+        rng = random.Random(seed + index)
+        client = Client(base_url, timeout)
+        while time.monotonic() < deadline:
+            route = rng.choices(routes, weights)[0]
+            method, path, body, headers = scenario.request(route, rng)
+            start = time.perf_counter()
+            try:
+                status, _, response_headers = client.request(method, path, body, headers)
+            except Exception:
+                status, response_headers = None, None
+            elapsed = time.perf_counter() - start
+            failed = is_failure(status, response_headers)
+            with lock:
+                stats[route].record(elapsed, status, failed)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    routes_summary = {route: stats[route].summary(elapsed) for route in routes}
+    total = sum(s["requests"] for s in routes_summary.values())
+    errors = sum(stats[route].errors for route in routes)
+    return {
+        "duration_s": round(elapsed, 2),
+        "concurrency": concurrency,
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+        "error_rate": round(errors / total, 4) if total else None,
+        "routes": routes_summary,
+    }
+
+
+# ============ Self-Contained Mode ============
+
+def start_stack(args) -> Tuple[str, str, mock_llm.MockLLMServer]:
+    """Starts the mock LLM and the app in-process on free ports, on the (temporary) DATA_DIR
+    set by the caller; returns (app url, position id, mock)"""
+    mock = mock_llm.start(mock_llm.config_from_args(args, prefix="llm_", seed=args.seed))
+    # Read when the app and agent modules load or create clients, so set before importing them
+    os.environ.update(GEMINI_API_KEY="mock", GROQ_API_KEY="mock",
+                      GEMINI_BASE_URL=mock.url, GROQ_BASE_URL=mock.url)
+    # One client address would otherwise exhaust the per-IP status limit at once
+    os.environ.setdefault("STATUS_RATE_LIMIT_PER_MINUTE", "1000000")
+    os.environ.setdefault("STATUS_RATE_LIMIT_BURST", "1000000")
+    import logging
+    from werkzeug.serving import make_server
+    import app as app_module
+    import storage
+
+    position_id = storage.save_position("Load Test Engineer", "Python developer with Django, AWS and SQL.")
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # no access log line per request
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="app", daemon=True).start()
+    print(f"App on http://127.0.0.1:{server.port} (DATA_DIR={storage.DATA_DIR}), mock LLM on {mock.url}",
+          file=sys.stderr)
+    return f"http://127.0.0.1:{server.port}", position_id, mock
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for item in text.split(","):
+        if item.strip():
+            route, _, weight = item.partition("=")
+            mix[route.strip()] = float(weight or 1)
+    unknown = set(mix) - {"apply", "bulk", "dashboard", "status"}
+    if unknown:
+        raise ValueError(f"Unknown routes in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay mixed traffic against the app and report per-route latency.")
+    parser.add_argument("--url", help="base URL of a running app")
+    parser.add_argument("--position-id", help="position to apply to and view (required with --url)")
+    parser.add_argument("--self-contained", action="store_true",
+                        help="start the mock LLM and the app in this process")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="route weights, e.g. apply=2,bulk=1,dashboard=6,status=10")
+    parser.add_argument("--bulk-size", type=int, default=5, help="PDFs per bulk upload")
+    parser.add_argument("--no-ai", action="store_true", help="bulk uploads use rule-based scoring")
+    parser.add_argument("--seed-candidates", type=int, default=20, help="candidates created for status polls")
+    parser.add_argument("--resumes", type=int, default=20, help="distinct resume PDFs to upload")
+    parser.add_argument("--timeout", type=float, default=120, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--app-log", default=os.devnull, help="with --self-contained, where the app's prints go")
+    mock_llm.add_config_arguments(parser, prefix="llm-")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    if not args.self_contained and not (args.url and args.position_id):
+        parser.error("give --url and --position-id, or --self-contained")
+    out = sys.stdout
+    if not args.self_contained:
+        return _run(args, mix, args.url.rstrip("/"), args.position_id, None, out)
+
+    # The app and agent print per request; keep them out of the JSON report
+    sys.stdout = open(args.app_log, "a")
+    # Never the real store; the throwaway copy is removed when the run ends
+    data_dir = os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="loadtest-")
+    try:
+        base_url, position_id, mock = start_stack(args)
+        return _run(args, mix, base_url, position_id, mock, out)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def _run(args, mix: Dict[str, float], base_url: str, position_id: str,
+         mock: Optional[mock_llm.MockLLMServer], out) -> int:
+    rng = random.Random(args.seed)
+    candidate_ids = seed_candidates(Client(base_url, args.timeout), args.seed_candidates, rng) \
+        if "status" in mix else []
+    pdfs = [bench_data.make_pdf(text) for text in bench_data.make_resumes(args.resumes, seed=args.seed)]
+    scenario = Scenario(position_id, candidate_ids, pdfs, args.bulk_size, not args.no_ai)
+
+    print(f"Running {args.concurrency} clients for {args.duration:.0f}s against {base_url}...", file=sys.stderr)
+    report = run_load(base_url, scenario, mix, args.duration, args.concurrency, args.timeout, args.seed)
+    report["mix"] = mix
+    if mock is not None:
+        report["mock_llm"] = {"requests": mock.stats(), "latency_ms": mock.config.latency_ms,
+                              "error_rate": mock.config.error_rate, "malformed_rate": mock.config.malformed_rate,
+                              "invalid_rate": mock.config.invalid_rate}
+
+    for route, summary in report["routes"].items():
+        print(f"  {route:<10} {summary['requests']:>6} req  {summary['throughput_rps'] or 0:>8.2f} rps  "
+              f"p50 {summary['p50_ms']} ms  p95 {summary['p95_ms']} ms  p99 {summary['p99_ms']} ms  "
+              f"errors {summary['error_rate']}", file=sys.stderr)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload, file=out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
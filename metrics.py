@@ -0,0 +1,222 @@
+"""
+Metrics Module for Hot-Path Instrumentation
+Lightweight in-process counters and histograms rendered in the
+Prometheus text exposition format. Each worker process keeps its own
+registry; scrape every worker (or use a single worker) for totals.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Latency buckets in seconds (covers cheap storage calls up to slow LLM calls)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Size buckets in bytes (1KB .. 100MB)
+BYTES_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024, 100 * 1024 * 1024)
+
+# Per-thread accumulator of stage durations for the request being served
+_stages = threading.local()
+
+
+def reset_stages():
+    """Starts a fresh stage timing accumulator for the current thread"""
+    _stages.timings = {}
+
+
+def get_stages() -> Dict[str, float]:
+    """Returns accumulated stage durations (seconds) for the current thread"""
+    return getattr(_stages, "timings", None) or {}
+
+
+def _note_stage(stage: str, seconds: float):
+    timings = getattr(_stages, "timings", None)
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def _format_labels(label_names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in zip(label_names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, k)} {_format_number(v)}" for k, v in items]
+
+
+class Histogram:
+    """Bucketed histogram with optional labels.
+
+    If ``stage`` is set, every observation is also added to the per-request
+    stage timings used for the ``Server-Timing`` response header.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, stage: Optional[str] = None):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self.stage = stage
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+        if self.stage:
+            _note_stage(self.stage, value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Context manager observing the elapsed wall time of its block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(s[0]), s[1], s[2])) for k, s in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Holds all metrics of this process"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        """Renders all metrics in Prometheus text format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help_text, labels))
+
+
+def histogram(name: str, help_text: str, labels: Tuple[str, ...] = (),
+              buckets: Tuple[float, ...] = DEFAULT_BUCKETS, stage: Optional[str] = None) -> Histogram:
+    return REGISTRY.register(Histogram(name, help_text, labels, buckets, stage))
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# ============ Application Metrics ============
+
+HTTP_REQUEST_SECONDS = histogram(
+    "hr_http_request_seconds", "HTTP request latency by endpoint", ("endpoint", "method", "status"))
+
+TEMPLATE_RENDER_SECONDS = histogram(
+    "hr_template_render_seconds", "Jinja template render time by route", ("endpoint", "template"), stage="render")
+
+PDF_EXTRACT_SECONDS = histogram(
+    "hr_pdf_extract_seconds", "PDF text extraction time", ("outcome",), stage="pdf")
+
+PDF_PAGES = counter("hr_pdf_pages_total", "PDF pages processed")
+
+OCR_DOCUMENT_SECONDS = histogram(
+    "hr_ocr_document_seconds", "OCR fallback time per scanned PDF", ("outcome",), stage="ocr")
+
+OCR_PAGES = counter("hr_ocr_pages_total", "Pages without a text layer sent to OCR", ("outcome",))
+
+LLM_REQUEST_SECONDS = histogram(
+    "hr_llm_request_seconds", "LLM request latency by provider", ("provider", "outcome"), stage="llm")
+
+LLM_FALLBACKS = counter(
+    "hr_llm_fallbacks_total", "Analyses that fell through a provider to the next one", ("from_provider", "to_provider"))
+
+LLM_CORRECTIONS = counter(
+    "hr_llm_corrections_total", "Self-correction retries after schema validation failures", ("provider", "outcome"))
+
+STORAGE_LOAD_SECONDS = histogram(
+    "hr_storage_load_seconds", "Data store load (read + parse) time", stage="storage")
+
+STORAGE_SAVE_SECONDS = histogram(
+    "hr_storage_save_seconds", "Data store save (serialize + write) time", stage="storage")
+
+STORAGE_LOAD_BYTES = histogram(
+    "hr_storage_load_bytes", "Bytes read per data store load", buckets=BYTES_BUCKETS)
+
+STORAGE_SAVE_BYTES = histogram(
+    "hr_storage_save_bytes", "Bytes written per data store save", buckets=BYTES_BUCKETS)
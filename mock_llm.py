@@ -0,0 +1,320 @@
+"""
+Mock LLM Server for Load Testing
+A local stand-in for the Gemini and Groq APIs, so load tests exercise the
+AI analysis path (timeouts, fallbacks, self-correction) without calling
+the real providers. It answers:
+
+    POST .../models/<model>:generateContent     Gemini response shape
+    POST .../chat/completions                   Groq (OpenAI-style) response shape
+    GET  /mock/stats                            request counts by provider and outcome
+
+Analyses are produced by the rule-based scorer from the resume in the
+prompt, in the JSON schema analyze_resume_with_ai asks for. Each request
+waits a log-normally distributed latency (median and sigma configurable),
+then fails with the configured error rate, returns malformed JSON, or
+returns schema-invalid JSON (an empty name, which triggers self-correction).
+
+Point the app at it with GEMINI_BASE_URL / GROQ_BASE_URL (any API key works):
+    python mock_llm.py --port 8090 --latency-ms 800 --error-rate 0.05 --malformed-rate 0.02
+    GEMINI_API_KEY=mock GROQ_API_KEY=mock GEMINI_BASE_URL=http://127.0.0.1:8090 \\
+        GROQ_BASE_URL=http://127.0.0.1:8090 python app.py
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_ERROR_STATUSES = (429, 500, 503)
+
+_GEMINI_STATUS = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+_GROQ_ERROR_TYPE = {429: "rate_limit_exceeded", 500: "internal_server_error", 503: "service_unavailable"}
+
+
+class MockConfig:
+    """Latency and failure settings; may be changed while the server runs"""
+
+    def __init__(self, latency_ms: float = 800, latency_sigma: float = 0.5, error_rate: float = 0.0,
+                 malformed_rate: float = 0.0, invalid_rate: float = 0.0,
+                 error_statuses: Tuple[int, ...] = DEFAULT_ERROR_STATUSES, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.invalid_rate = invalid_rate
+        self.error_statuses = tuple(error_statuses)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def latency(self) -> float:
+        """Seconds to wait: log-normal around the median (sigma 0 = constant)"""
+        if self.latency_ms <= 0:
+            return 0.0
+        with self._lock:
+            if self.latency_sigma <= 0:
+                return self.latency_ms / 1000
+            return self._random.lognormvariate(math.log(self.latency_ms / 1000), self.latency_sigma)
+
+    def outcome(self) -> str:
+        """'error', 'malformed', 'invalid' or 'ok', drawn from the configured rates"""
+        with self._lock:
+            roll = self._random.random()
+        for outcome, rate in (("error", self.error_rate), ("malformed", self.malformed_rate),
+                              ("invalid", self.invalid_rate)):
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return "ok"
+
+    def error_status(self) -> int:
+        with self._lock:
+            return self._random.choice(self.error_statuses)
+
+
+# ============ Analyses ============
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def _rule_based(resume_text: str) -> Dict:
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            from agent import ResumeRankingAgent
+            _scorer = _scorer or ResumeRankingAgent(api_key="", quiet=True)
+    return _scorer.analyze_resume(resume_text)
+
+
+def _resume_from_prompt(prompt: str) -> str:
+    start = prompt.find("Resume: ")
+    if start < 0:
+        return ""
+    end = prompt.find("\nJob Description:", start)
+    return prompt[start + len("Resume: "):end if end >= 0 else None]
+
+
+def analysis_json(prompt: str, outcome: str) -> str:
+    """The model's text output for a prompt: analysis JSON, or a broken variant"""
+    if "Fix this invalid JSON" in prompt:
+        # Self-correction request: repair the JSON it quotes
+        try:
+            data = json.loads(prompt.split("schema:\n", 1)[1].split("\nError:", 1)[0])
+        except (IndexError, ValueError):
+            data = {"university": "Unknown Institution", "python_score": 0, "uni_tier_score": 0,
+                    "experience_score": 0}
+        data["name"] = data.get("name") or "Unknown Candidate"
+    else:
+        result = _rule_based(_resume_from_prompt(prompt))
+        data = {
+            "name": result["name"],
+            "university": result["university"],
+            "skills": result["skills"],
+            "python_score": int(result["python_score"]),
+            "python_evidence": result["python_evidence"],
+            "uni_tier_score": int(result["uni_tier_score"]),
+            "uni_evidence": result["uni_evidence"],
+            "experience_score": int(result["experience_score"]),
+            "experience_evidence": result["experience_evidence"],
+            "python_experience_years": result["python_experience_years"],
+        }
+    if outcome == "invalid":
+        data["name"] = ""
+    text = json.dumps(data)
+    if outcome == "malformed":
+        return text[:len(text) // 2]
+    return text
+
+
+# ============ Provider Response Shapes ============
+
+def gemini_response(model: str, text: str, prompt_tokens: int) -> Dict:
+    completion_tokens = max(1, len(text) // 4)
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": completion_tokens,
+                          "totalTokenCount": prompt_tokens + completion_tokens},
+        "modelVersion": model,
+    }
+
+
+def gemini_error(status: int) -> Dict:
+    return {"error": {"code": status, "message": "Mock LLM injected error",
+                      "status": _GEMINI_STATUS.get(status, "UNKNOWN")}}
+
+
+def groq_response(model: str, text: str, prompt_tokens: int) -> Dict:
+    completion_tokens = max(1, len(text) // 4)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "logprobs": None,
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+
+def groq_error(status: int) -> Dict:
+    return {"error": {"message": "Mock LLM injected error",
+                      "type": _GROQ_ERROR_TYPE.get(status, "api_error"), "code": None}}
+
+
+def _gemini_prompt(body: Dict) -> str:
+    return "\n".join(part.get("text", "") for content in body.get("contents", [])
+                     for part in content.get("parts", []))
+
+
+def _groq_prompt(body: Dict) -> str:
+    return "\n".join(message.get("content") or "" for message in body.get("messages", []))
+
+
+# ============ Server ============
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    server_version = "MockLLM/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/mock/stats":
+            self._send(200, self.server.stats())
+        else:
+            self._send(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(400, {"error": {"message": "Invalid JSON body"}})
+            return
+        path = self.path.split("?", 1)[0]
+        if path.endswith(":generateContent"):
+            provider = "gemini"
+            model = path.rsplit("/", 1)[-1].split(":", 1)[0]
+            prompt = _gemini_prompt(body)
+        elif path.endswith("/chat/completions"):
+            provider = "groq"
+            model = body.get("model", "mock")
+            prompt = _groq_prompt(body)
+        else:
+            self._send(404, {"error": {"message": f"Unknown endpoint {path}"}})
+            return
+
+        config: MockConfig = self.server.config
+        time.sleep(config.latency())
+        outcome = config.outcome()
+        self.server.count(provider, outcome)
+        if outcome == "error":
+            status = config.error_status()
+            self._send(status, gemini_error(status) if provider == "gemini" else groq_error(status))
+            return
+        text = analysis_json(prompt, outcome)
+        prompt_tokens = max(1, len(prompt) // 4)
+        if provider == "gemini":
+            self._send(200, gemini_response(model, text, prompt_tokens))
+        else:
+            self._send(200, groq_response(model, text, prompt_tokens))
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: MockConfig):
+        super().__init__(address, MockLLMHandler)
+        self.config = config
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._counts_lock = threading.Lock()
+
+    def count(self, provider: str, outcome: str):
+        with self._counts_lock:
+            outcomes = self._counts.setdefault(provider, {})
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    def stats(self) -> Dict:
+        with self._counts_lock:
+            return {provider: dict(outcomes) for provider, outcomes in self._counts.items()}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> MockLLMServer:
+    """Starts the server on a background thread (port 0 picks a free port)"""
+    server = MockLLMServer((host, port), config)
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    return server
+
+
+def add_config_arguments(parser: argparse.ArgumentParser, prefix: str = ""):
+    """Adds the MockConfig options (optionally prefixed, e.g. 'llm-') to a parser"""
+    parser.add_argument(f"--{prefix}latency-ms", type=float, default=800, help="median response latency")
+    parser.add_argument(f"--{prefix}latency-sigma", type=float, default=0.5,
+                        help="log-normal shape of the latency (0 = constant)")
+    parser.add_argument(f"--{prefix}error-rate", type=float, default=0.0, help="share of requests failing")
+    parser.add_argument(f"--{prefix}error-statuses", default=",".join(map(str, DEFAULT_ERROR_STATUSES)),
+                        help="HTTP statuses for injected errors")
+    parser.add_argument(f"--{prefix}malformed-rate", type=float, default=0.0,
+                        help="share of responses with truncated JSON")
+    parser.add_argument(f"--{prefix}invalid-rate", type=float, default=0.0,
+                        help="share of responses failing schema validation")
+
+
+def config_from_args(args, prefix: str = "", seed: Optional[int] = None) -> MockConfig:
+    def get(name):
+        return getattr(args, (prefix + name).replace("-", "_"))
+    statuses: List[int] = [int(s) for s in get("error-statuses").split(",") if s.strip()]
+    return MockConfig(get("latency-ms"), get("latency-sigma"), get("error-rate"), get("malformed-rate"),
+                      get("invalid-rate"), tuple(statuses), seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock Gemini/Groq server for load testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--seed", type=int, help="seed for reproducible latencies and failures")
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = MockLLMServer((args.host, args.port), config_from_args(args, seed=args.seed))
+    print(f"Mock LLM listening on {server.url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+OCR Fallback for Scanned PDFs
+Pages without a text layer (scanned resumes) are rendered with poppler's
+pdftoppm and read with the Tesseract CLI. Only those pages are OCR'd, so
+PDFs with text never pay for it.
+
+OCR runs on a bounded pool: OCR_WORKERS threads, each driving one
+pdftoppm/tesseract process at a time, so at most OCR_WORKERS OCR processes
+run on the host however many uploads arrive together. Every document gets
+OCR_TIMEOUT_SECONDS in total; its processes are killed at the deadline and
+pages not done by then are left empty. OCR runs inside the upload request
+(before the LLM call), so the default stays well under gunicorn's 30s
+worker timeout; raise gunicorn's --timeout along with OCR_TIMEOUT_SECONDS.
+Page texts are cached on disk by the PDF's SHA-256 (and OCR language), so
+re-uploads and retries are free. Cached texts are resumes, so they expire
+after OCR_CACHE_MAX_AGE_HOURS and the cache keeps at most
+OCR_CACHE_MAX_FILES entries.
+
+Requires the `tesseract` and `pdftoppm` binaries (e.g. apt install
+tesseract-ocr poppler-utils); without them the fallback is skipped.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+import metrics
+import storage
+
+ENABLED = os.getenv("OCR_ENABLED", "true").lower() == "true"
+WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+TIMEOUT_SECONDS = float(os.getenv("OCR_TIMEOUT_SECONDS", "15"))
+DPI = int(os.getenv("OCR_DPI", "300"))
+LANGUAGE = os.getenv("OCR_LANG", "eng")
+CACHE_DIR = os.getenv("OCR_CACHE_DIR")  # default: <storage.DATA_DIR>/ocr_cache
+CACHE_MAX_AGE_SECONDS = float(os.getenv("OCR_CACHE_MAX_AGE_HOURS", "24")) * 3600
+CACHE_MAX_FILES = int(os.getenv("OCR_CACHE_MAX_FILES", "500"))
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_warned = False
+
+
+def available() -> bool:
+    """Returns True if OCR is enabled and the tesseract and pdftoppm binaries are installed"""
+    global _warned
+    if not ENABLED:
+        return False
+    if shutil.which("tesseract") and shutil.which("pdftoppm"):
+        return True
+    if not _warned:
+        print("OCR fallback disabled: tesseract and/or pdftoppm not found on PATH")
+        _warned = True
+    return False
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="ocr")
+    return _pool
+
+
+# ============ Cache ============
+
+def _cache_dir() -> str:
+    return CACHE_DIR or os.path.join(storage.DATA_DIR, "ocr_cache")
+
+
+def _cache_path(digest: str) -> str:
+    return os.path.join(_cache_dir(), f"{digest}-{LANGUAGE}.json")
+
+
+def _load_cached(digest: str) -> Dict[int, str]:
+    try:
+        if time.time() - os.path.getmtime(_cache_path(digest)) > CACHE_MAX_AGE_SECONDS:
+            return {}
+        with open(_cache_path(digest)) as f:
+            return {int(page): text for page, text in json.load(f)["pages"].items()}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def _save_cached(digest: str, pages: Dict[int, str]):
+    os.makedirs(_cache_dir(), exist_ok=True)
+    tmp_path = f"{_cache_path(digest)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"pages": {str(page): text for page, text in sorted(pages.items())}}, f)
+    os.replace(tmp_path, _cache_path(digest))
+    _evict()
+
+
+def _evict():
+    """Removes expired entries, then the oldest beyond CACHE_MAX_FILES"""
+    entries = []
+    for name in os.listdir(_cache_dir()):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(_cache_dir(), name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except FileNotFoundError:
+            continue
+    entries.sort(reverse=True)
+    cutoff = time.time() - CACHE_MAX_AGE_SECONDS
+    for index, (mtime, path) in enumerate(entries):
+        if mtime < cutoff or index >= CACHE_MAX_FILES:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+# ============ Rendering & Recognition ============
+
+def _ocr_page(pdf_path: str, page: int, deadline: float) -> Optional[str]:
+    """Renders one page (0-based) to PNG and runs tesseract on it; None if the deadline passed"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    image_root = os.path.join(os.path.dirname(pdf_path), f"page-{page}")
+    subprocess.run(["pdftoppm", "-f", str(page + 1), "-l", str(page + 1), "-r", str(DPI), "-gray", "-png",
+                    "-singlefile", pdf_path, image_root],
+                   check=True, capture_output=True, timeout=remaining)
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    result = subprocess.run(["tesseract", f"{image_root}.png", "stdout", "-l", LANGUAGE],
+                            check=True, capture_output=True, timeout=remaining)
+    return result.stdout.decode("utf-8", errors="replace").strip()
+
+
+def ocr_pages(data: bytes, pages: List[int]) -> Dict[int, str]:
+    """OCRs the given 0-based pages of a PDF; returns {page: text} for pages that
+    were read (from cache or within the deadline). Never raises on OCR failures."""
+    if not pages:
+        return {}
+    start = time.perf_counter()
+    digest = hashlib.sha256(data).hexdigest()
+    cached = _load_cached(digest)
+    found = {page: cached[page] for page in pages if page in cached}
+    todo = [page for page in pages if page not in cached]
+    if found:
+        metrics.OCR_PAGES.inc(len(found), outcome="cached")
+    if not todo or not available():
+        metrics.OCR_DOCUMENT_SECONDS.observe(time.perf_counter() - start, outcome="cached" if not todo else "skipped")
+        return found
+
+    deadline = time.monotonic() + TIMEOUT_SECONDS
+    workdir = tempfile.mkdtemp(prefix="ocr-")
+    try:
+        pdf_path = os.path.join(workdir, "document.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(data)
+        futures = {_get_pool().submit(_ocr_page, pdf_path, page, deadline): page for page in todo}
+        # Page jobs kill their processes at the deadline, so this returns shortly after it
+        wait(futures)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    done = {}
+    for future, page in futures.items():
+        try:
+            text = future.result()
+        except subprocess.TimeoutExpired:
+            text = None
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"OCR failed for page {page + 1}: {e}")
+            metrics.OCR_PAGES.inc(outcome="error")
+            continue
+        if text is None:
+            metrics.OCR_PAGES.inc(outcome="timeout")
+        else:
+            metrics.OCR_PAGES.inc(outcome="success")
+            done[page] = text
+    if done:
+        try:
+            _save_cached(digest, {**cached, **done})
+        except OSError as e:
+            # A full or unwritable cache must not fail an upload whose pages were read
+            print(f"Could not cache OCR results: {e}")
+    outcome = "success" if len(done) == len(todo) else "partial"
+    metrics.OCR_DOCUMENT_SECONDS.observe(time.perf_counter() - start, outcome=outcome)
+    return {**found, **done}
@@ -1,13 +1,35 @@
 """
 PDF Utility Module for Resume Parsing
-Uses pypdf to extract text from uploaded PDF files.
+Uses pypdf to extract text from uploaded PDF files. Pages without a text
+layer (scans) fall back to OCR, see ocr.py.
 """
 
-from pypdf import PdfReader
+import time
 from io import BytesIO
 from typing import Union
 from werkzeug.datastructures import FileStorage
 
+import metrics
+import ocr
+
+
+def _pdf_reader():
+    """Returns pypdf's PdfReader, importing pypdf on first use"""
+    from pypdf import PdfReader
+    return PdfReader
+
+
+def preload():
+    """Imports pypdf up front (see app.preload)"""
+    _pdf_reader()
+
+
+def _read_bytes(file: Union[FileStorage, BytesIO, str]) -> bytes:
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            return f.read()
+    return file.read()
+
 
 def extract_text_from_pdf(file: Union[FileStorage, BytesIO, str]) -> str:
     """
@@ -19,25 +41,29 @@ def extract_text_from_pdf(file: Union[FileStorage, BytesIO, str]) -> str:
     Returns:
         Extracted text as a single string.
     """
+    start = time.perf_counter()
+    PdfReader = _pdf_reader()
     try:
-        if isinstance(file, str):
-            # File path provided
-            reader = PdfReader(file)
-        else:
-            # FileStorage or BytesIO object
-            reader = PdfReader(file)
-        
-        text_parts = []
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
+        # File path, FileStorage or BytesIO object; the bytes are kept for OCR
+        data = _read_bytes(file)
+        reader = PdfReader(BytesIO(data))
         
-        return "\n".join(text_parts).strip()
+        page_texts = [page.extract_text() or "" for page in reader.pages]
+        metrics.PDF_PAGES.inc(len(reader.pages))
+        metrics.PDF_EXTRACT_SECONDS.observe(time.perf_counter() - start, outcome="success")
     
     except Exception as e:
+        metrics.PDF_EXTRACT_SECONDS.observe(time.perf_counter() - start, outcome="error")
         raise ValueError(f"Failed to extract text from PDF: {str(e)}")
 
+    # Scanned pages have no text layer; only those are OCR'd
+    scanned = [i for i, text in enumerate(page_texts) if not text.strip()]
+    if scanned:
+        for page, text in ocr.ocr_pages(data, scanned).items():
+            page_texts[page] = text
+
+    return "\n".join(text for text in page_texts if text).strip()
+
 
 def extract_text_from_multiple_pdfs(files: list) -> list:
     """
@@ -0,0 +1,263 @@
+"""
+Request Profiler Module
+Opt-in WSGI middleware that captures a profile for slow requests (above a
+latency threshold) or for a sampled fraction of requests, and writes them
+to a bounded rotating directory for the HR profiles page.
+
+Modes:
+    sampling - a background thread samples the stacks of in-flight requests
+               (low overhead, safe to leave on in production)
+    cprofile - deterministic cProfile of requests (higher overhead, use for
+               short investigations). Only one profiler can be active per
+               process, so requests arriving while one is profiled run
+               unprofiled.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+# Default configuration (overridable via environment or app.config)
+DEFAULTS = {
+    "PROFILE_ENABLED": False,
+    "PROFILE_MODE": "sampling",
+    "PROFILE_SLOW_MS": 1000.0,
+    "PROFILE_SAMPLE_RATE": 0.0,
+    "PROFILE_DIR": "profiles",
+    "PROFILE_MAX_FILES": 100,
+    "PROFILE_INTERVAL_MS": 5.0,
+}
+
+# Number of functions / stacks kept per capture
+TOP_ENTRIES = 40
+
+
+class StackSampler:
+    """Background thread that samples the call stacks of registered threads"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ensure_running(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+            self._thread.start()
+
+    def start(self, ident: int):
+        with self._lock:
+            self._active[ident] = Counter()
+            self._ensure_running()
+
+    def stop(self, ident: int) -> Counter:
+        with self._lock:
+            return self._active.pop(ident, Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for ident, counts in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        counts[_collapse_stack(frame)] += 1
+
+
+def _collapse_stack(frame) -> str:
+    """Returns a stack in collapsed (flamegraph) form, outermost frame first"""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class ProfilingMiddleware:
+    """WSGI middleware capturing profiles of slow or sampled requests"""
+
+    def __init__(self, wsgi_app, flask_app, mode: str, slow_ms: float, sample_rate: float,
+                 directory: str, max_files: int, interval_ms: float):
+        self.wsgi_app = wsgi_app
+        self.flask_app = flask_app
+        self.mode = mode
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.max_files = max_files
+        self.sampler = StackSampler(interval_ms / 1000.0) if mode == "sampling" else None
+        self._cprofile_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def __call__(self, environ, start_response):
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        status_holder = {}
+
+        def capture_status(status, headers, exc_info=None):
+            status_holder["status"] = status
+            return start_response(status, headers, exc_info)
+
+        ident = threading.get_ident()
+        profile = None
+        if self.sampler:
+            self.sampler.start(ident)
+        elif self._cprofile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiling tool is active (Python 3.12+ allows only one)
+                profile = None
+                self._cprofile_lock.release()
+        start = time.perf_counter()
+        try:
+            return self.wsgi_app(environ, capture_status)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            stacks = self.sampler.stop(ident) if self.sampler else None
+            if profile:
+                profile.disable()
+                self._cprofile_lock.release()
+            reason = "slow" if duration_ms >= self.slow_ms else ("sampled" if sampled else None)
+            if reason and (self.sampler or profile):
+                try:
+                    self._write_capture(environ, status_holder.get("status", ""), duration_ms, reason, stacks, profile)
+                except Exception as e:
+                    print(f"Error writing request profile: {e}")
+
+    def _endpoint(self, environ) -> str:
+        try:
+            endpoint, _ = self.flask_app.url_map.bind_to_environ(environ).match()
+            return endpoint
+        except Exception:
+            return "unmatched"
+
+    def _write_capture(self, environ, status: str, duration_ms: float, reason: str,
+                       stacks: Optional[Counter], profile: Optional[cProfile.Profile]):
+        capture_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{uuid.uuid4().hex[:8]}"
+        record = {
+            "id": capture_id,
+            "timestamp": datetime.now().isoformat(),
+            "endpoint": self._endpoint(environ),
+            "method": environ.get("REQUEST_METHOD", ""),
+            "path": environ.get("PATH_INFO", ""),
+            # Query parameters only; request bodies may hold passwords or resumes
+            "params": {k: v if len(v) > 1 else v[0] for k, v in parse_qs(environ.get("QUERY_STRING", "")).items()},
+            "content_length": environ.get("CONTENT_LENGTH") or "0",
+            "status": status,
+            "duration_ms": round(duration_ms, 2),
+            "reason": reason,
+            "mode": self.mode,
+        }
+        if stacks is not None:
+            record["samples"] = sum(stacks.values())
+            record["interval_ms"] = self.sampler.interval * 1000
+            record["stacks"] = [{"stack": s, "count": n} for s, n in stacks.most_common(TOP_ENTRIES)]
+        if profile is not None:
+            profile.dump_stats(os.path.join(self.directory, f"{capture_id}.prof"))
+            record["functions"] = _top_functions(profile)
+
+        path = os.path.join(self.directory, f"{capture_id}.json")
+        with open(path, "w") as f:
+            json.dump(record, f, indent=2)
+        self._rotate()
+
+    def _rotate(self):
+        """Keeps at most max_files captures, removing the oldest first"""
+        captures = sorted(f for f in os.listdir(self.directory) if f.endswith(".json"))
+        for name in captures[:max(0, len(captures) - self.max_files)]:
+            for suffix in (".json", ".prof"):
+                try:
+                    os.remove(os.path.join(self.directory, name[:-5] + suffix))
+                except FileNotFoundError:
+                    pass
+
+
+def _top_functions(profile: cProfile.Profile) -> List[Dict]:
+    stats = pstats.Stats(profile)
+    rows = []
+    for (filename, lineno, name), (cc, nc, tt, ct, _callers) in stats.stats.items():
+        rows.append({
+            "function": f"{name} ({os.path.basename(filename)}:{lineno})",
+            "calls": nc,
+            "tottime_ms": round(tt * 1000, 3),
+            "cumtime_ms": round(ct * 1000, 3),
+        })
+    rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+    return rows[:TOP_ENTRIES]
+
+
+def _config_value(app, key: str):
+    if key in app.config:
+        return app.config[key]
+    default = DEFAULTS[key]
+    raw = os.getenv(key)
+    if raw is None:
+        return default
+    if isinstance(default, bool):
+        return raw.lower() == "true"
+    return type(default)(raw)
+
+
+def init_app(app) -> bool:
+    """Installs the profiling middleware on a Flask app if PROFILE_ENABLED is set"""
+    config = {key: _config_value(app, key) for key in DEFAULTS}
+    app.config.update(config)
+    if not config["PROFILE_ENABLED"]:
+        return False
+    app.wsgi_app = ProfilingMiddleware(
+        app.wsgi_app, app,
+        mode=config["PROFILE_MODE"],
+        slow_ms=config["PROFILE_SLOW_MS"],
+        sample_rate=config["PROFILE_SAMPLE_RATE"],
+        directory=config["PROFILE_DIR"],
+        max_files=config["PROFILE_MAX_FILES"],
+        interval_ms=config["PROFILE_INTERVAL_MS"],
+    )
+    return True
+
+
+def list_captures(directory: str, limit: int = 50) -> List[Dict]:
+    """Returns capture summaries, slowest first"""
+    if not os.path.isdir(directory):
+        return []
+    captures = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        record.pop("stacks", None)
+        record.pop("functions", None)
+        captures.append(record)
+    captures.sort(key=lambda r: r.get("duration_ms", 0), reverse=True)
+    return captures[:limit]
+
+
+def get_capture(directory: str, capture_id: str) -> Optional[Dict]:
+    """Returns a single capture with its profile data"""
+    if not capture_id or os.path.basename(capture_id) != capture_id:
+        return None
+    path = os.path.join(directory, f"{capture_id}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,307 @@
+"""
+Batch Ranking
+Scores many resumes against a position's (or an ad-hoc) job description
+concurrently and returns only the top K, optionally merged with the
+position's existing candidates. Submitted resumes are not stored unless
+the caller asks for it.
+
+The top K of a batch is kept in a bounded min-heap while results arrive,
+so ranking n resumes costs O(n log K) rather than a full sort. Existing
+candidates come from a per-position score index: a list kept sorted by
+score and updated from storage change events, so their top K is a slice.
+"""
+
+import heapq
+import os
+import threading
+from bisect import bisect_left, insort
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import storage
+from agent import ResumeRankingAgent
+
+MAX_RESUMES = int(os.getenv("RANKING_MAX_RESUMES", "200"))
+WORKERS = int(os.getenv("RANKING_WORKERS", "8"))
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 100
+
+# Same weights as the rule-based and AI scorers (agent.py, models.py)
+SCORE_WEIGHTS = (("python_score", 0.5), ("experience_score", 0.3), ("uni_tier_score", 0.2))
+
+# Heavy or private fields left out of ranking results
+_OMITTED_FIELDS = ("raw_resume_text", "possible_duplicates", "user_id")
+
+# Descriptive fields taken from submitted items. IDs, statuses and positions
+# never are: with persist they would overwrite or move stored candidates.
+PASSTHROUGH_FIELDS = ("name", "email", "phone", "external_id", "source_file")
+# Scores accepted from already scored items, all on the 0-10 scale
+SCORE_FIELDS = ("final_rank_score",) + tuple(field for field, _ in SCORE_WEIGHTS)
+
+
+def _score(candidate) -> float:
+    """final_rank_score as a float; missing or invalid scores rank last"""
+    try:
+        value = float(candidate.get("final_rank_score"))
+    except (TypeError, ValueError):
+        return -1.0
+    return value if value == value else -1.0
+
+
+def _public(candidate, **extra) -> Dict:
+    result = {k: v for k, v in dict(candidate).items() if k not in _OMITTED_FIELDS}
+    result.update(extra)
+    return result
+
+
+# ============ Scoring Submitted Resumes ============
+
+def _passthrough(item: Dict) -> Dict:
+    return {k: item[k] for k in PASSTHROUGH_FIELDS if k in item}
+
+
+def _prescored(item: Dict) -> Dict:
+    """An already scored candidate: fills in final_rank_score from its component scores"""
+    result = _passthrough(item)
+    for field in SCORE_FIELDS:
+        if field in item:
+            try:
+                value = float(item[field])
+            except (TypeError, ValueError):
+                raise ValueError(f"{field} must be a number")
+            if not 0 <= value <= 10:
+                raise ValueError(f"{field} must be between 0 and 10")
+            result[field] = value
+    if "final_rank_score" not in result:
+        try:
+            result["final_rank_score"] = round(sum(result[field] * weight for field, weight in SCORE_WEIGHTS), 2)
+        except KeyError:
+            raise ValueError("needs resume_text, final_rank_score or python/experience/uni_tier scores")
+    return result
+
+
+def _score_one(agent: ResumeRankingAgent, item, job_description: str, use_ai: bool) -> Dict:
+    if isinstance(item, str):
+        item = {"resume_text": item}
+    if not isinstance(item, dict):
+        raise ValueError("must be a resume string or an object")
+    text = item.get("resume_text")
+    if not text:
+        return _prescored(item)
+    if use_ai:
+        result = agent.analyze_resume_with_ai(text, job_description)
+    else:
+        result = agent.analyze_resume(text, job_description)
+    # Caller-supplied descriptive fields (e.g. an external reference or a known name) win
+    result.update(_passthrough(item))
+    result["raw_resume_text"] = text
+    return result
+
+
+def score_resumes(items: List, job_description: str = "", use_ai: bool = False) -> Iterator[Tuple[int, Dict]]:
+    """Scores resumes concurrently, yielding (index, result) as each finishes;
+    a failed resume yields {'error': ...} instead of stopping the batch"""
+    if not items:
+        return
+    agent = ResumeRankingAgent()
+    with ThreadPoolExecutor(max_workers=min(WORKERS, len(items))) as pool:
+        futures = {pool.submit(_score_one, agent, item, job_description, use_ai): index
+                   for index, item in enumerate(items)}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], {"error": str(e)}
+
+
+class TopK:
+    """Keeps the k highest scoring results seen so far in a min-heap"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int, Dict]] = []
+        self._seen = 0
+
+    def push(self, result: Dict):
+        # The arrival counter breaks ties without comparing dicts, earliest first
+        entry = (_score(result), -self._seen, result)
+        self._seen += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def results(self) -> List[Dict]:
+        """Best first"""
+        return [result for _, _, result in sorted(self._heap, reverse=True)]
+
+
+# ============ Existing Candidates ============
+
+class PositionScores:
+    """A position's candidates ordered by final_rank_score, best first"""
+
+    def __init__(self, position_id: str, key=None):
+        self.position_id = position_id
+        self.key = key  # storage.partition_key() the index reflects
+        self.order: List[Tuple[float, str]] = []  # (-score, candidate id), ascending
+        self.entries: Dict[str, Tuple[float, str]] = {}
+        self.records: Dict[str, Dict] = {}
+
+    def add(self, candidate):
+        self.remove(candidate["id"])
+        entry = (-_score(candidate), candidate["id"])
+        insort(self.order, entry)
+        self.entries[candidate["id"]] = entry
+        self.records[candidate["id"]] = candidate
+
+    def remove(self, candidate_id: str):
+        entry = self.entries.pop(candidate_id, None)
+        if entry is not None:
+            del self.order[bisect_left(self.order, entry)]
+            del self.records[candidate_id]
+
+    def top(self, k: int) -> List[Dict]:
+        return [self.records[candidate_id] for _, candidate_id in self.order[:k]]
+
+
+class ScoreIndex:
+    """Lazily built, event-maintained score order of every requested position"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.version = None
+        self.positions: Dict[str, PositionScores] = {}
+        self.position_of: Dict[str, str] = {}  # candidate id -> indexed position id
+
+    def _drop(self, position_id: str):
+        scores = self.positions.pop(position_id, None)
+        if scores is not None:
+            for candidate_id in scores.entries:
+                self.position_of.pop(candidate_id, None)
+
+    def _upsert(self, candidate, touched: set):
+        self._remove(candidate["id"], touched)
+        scores = self.positions.get(candidate.get("position_id") or "")
+        if scores is not None:
+            scores.add(candidate)
+            self.position_of[candidate["id"]] = scores.position_id
+            touched.add(scores.position_id)
+
+    def _remove(self, candidate_id: str, touched: set):
+        previous = self.position_of.pop(candidate_id, None)
+        if previous is not None:
+            self.positions[previous].remove(candidate_id)
+            touched.add(previous)
+
+    def on_event(self, event: str, payload: Dict):
+        """Storage listener: applies the change to indexed positions"""
+        with self._lock:
+            version = payload["version"]
+            # See AnalyticsCache.on_event: after a gap, touched positions are rebuilt instead
+            gap = self.version is None or version != (self.version[0], self.version[1] + 1)
+            self.version = version
+            touched = set()
+            if event in ("candidates_saved", "statuses_changed"):
+                for record in payload["candidates"]:
+                    self._upsert(record, touched)
+            elif event == "status_changed" and payload.get("candidate") is not None:
+                self._upsert(payload["candidate"], touched)
+            elif event == "candidate_deleted":
+                self._remove(payload["candidate_id"], touched)
+            elif event == "candidates_archived":
+                for candidate_id in payload["archived"]:
+                    self._remove(candidate_id, touched)
+            elif event == "position_deleted":
+                self._drop(payload["position_id"])
+            elif event == "store_replaced":
+                self.positions.clear()
+                self.position_of.clear()
+            for position_id in touched:
+                if gap:
+                    self._drop(position_id)
+                else:
+                    self.positions[position_id].key = storage.partition_key(position_id)
+
+    def build(self, position_id: str) -> PositionScores:
+        """Rebuilds one position from storage and indexes it"""
+        built = PositionScores(position_id, storage.partition_key(position_id))
+        for record in storage.get_candidates_by_position(position_id):
+            entry = (-_score(record), record["id"])
+            built.order.append(entry)
+            built.entries[record["id"]] = entry
+            built.records[record["id"]] = record
+        built.order.sort()  # one sort instead of an insort per candidate
+        with self._lock:
+            self._drop(position_id)
+            self.positions[position_id] = built
+            for candidate_id in built.entries:
+                self.position_of[candidate_id] = position_id
+        return built
+
+    def top(self, position_id: str, k: int) -> List[Dict]:
+        """Returns the k best scoring candidates of a position"""
+        key = storage.partition_key(position_id)
+        with self._lock:
+            scores = self.positions.get(position_id)
+            if scores is not None and scores.key == key:
+                return scores.top(k)
+        # Built outside the lock: storage writers hold their lock while notifying us
+        built = self.build(position_id)
+        with self._lock:
+            return built.top(k)
+
+
+_index = ScoreIndex()
+storage.subscribe(_index.on_event)
+
+
+def top_candidates(position_id: str, k: int = DEFAULT_TOP_K) -> List[Dict]:
+    return [_public(c, source="existing") for c in _index.top(position_id, k)]
+
+
+def merge_top(ranked: Iterable[List[Dict]], k: int) -> List[Dict]:
+    """Merges lists that are each sorted best first into one top-k list"""
+    return list(islice(heapq.merge(*ranked, key=lambda r: -_score(r)), k))
+
+
+# ============ Ranking ============
+
+def rank(items: List, job_description: str = "", use_ai: bool = False, top_k: int = DEFAULT_TOP_K,
+         position_id: Optional[str] = None, include_existing: bool = False,
+         persist: bool = False) -> Iterator[Dict]:
+    """Scores `items` and yields a 'scored' (or 'error') event per resume as it
+    finishes, then one 'ranking' event with the overall top K. With
+    include_existing, the position's stored candidates compete too; with
+    persist, scored resumes are saved to the position."""
+    best = TopK(top_k)
+    scored, errors = [], []
+    for index, result in score_resumes(items, job_description, use_ai):
+        if "error" in result:
+            errors.append({"index": index, "error": result["error"]})
+            yield {"type": "error", "index": index, "error": result["error"]}
+            continue
+        result["source"], result["index"] = "submitted", index
+        scored.append(result)
+        best.push(result)
+        yield {"type": "scored", "index": index, "name": result.get("name"),
+               "final_rank_score": result.get("final_rank_score")}
+
+    # Read before persisting, so newly saved resumes are not counted twice
+    existing = top_candidates(position_id, top_k) if include_existing and position_id else []
+    if persist and scored:
+        for result in scored:
+            result["position_id"] = position_id
+        ids = storage.save_candidates([{k: v for k, v in r.items() if k not in ("source", "index")} for r in scored])
+        for result, candidate_id in zip(scored, ids):
+            result["id"] = candidate_id
+
+    submitted = [_public(r) for r in best.results()]
+    yield {
+        "type": "ranking",
+        "data": merge_top([submitted, existing], top_k),
+        "scored": len(scored),
+        "existing": len(existing),
+        "errors": errors,
+    }
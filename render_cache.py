@@ -0,0 +1,79 @@
+"""
+Render Cache
+Rendered HTML (whole pages and fragments such as the job list) cached
+under keys that include a storage version, so an entry is reused until the
+data it shows changes and never needs explicit invalidation. Pages also
+get an ETag built from the same inputs: a client sending a matching
+If-None-Match gets a 304 without the page being rendered at all.
+
+Entries are evicted least-recently-used once RENDER_CACHE_MAX_BYTES is
+exceeded; pages larger than a quarter of the budget are not cached.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from flask import make_response, request, session
+from markupsafe import Markup
+
+MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+_entries: "OrderedDict[Hashable, str]" = OrderedDict()
+_size = 0
+_lock = threading.Lock()
+
+
+def get_or_render(key: Hashable, render: Callable[[], str]) -> str:
+    """Returns the cached HTML for key, rendering and storing it on a miss"""
+    global _size
+    with _lock:
+        html = _entries.get(key)
+        if html is not None:
+            _entries.move_to_end(key)
+            return html
+    html = render()
+    if len(html) * 4 <= MAX_BYTES:
+        with _lock:
+            if key not in _entries:
+                _entries[key] = html
+                _size += len(html)
+            while _size > MAX_BYTES:
+                _, evicted = _entries.popitem(last=False)
+                _size -= len(evicted)
+    return html
+
+
+def fragment(key: Hashable, render: Callable[[], str]) -> Markup:
+    """Cached HTML fragment, safe to output with {{ ... }} in a template"""
+    return Markup(get_or_render(("fragment",) + tuple(key), render))
+
+
+def clear():
+    global _size
+    with _lock:
+        _entries.clear()
+        _size = 0
+
+
+def etag(*parts) -> str:
+    """Returns an ETag value derived from everything a response depends on"""
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def conditional(tag: str, render: Callable[[], str], cache_key: Optional[Hashable] = None):
+    """Answers 304 when the client already has this ETag, otherwise renders
+    (from the page cache when cache_key is given) and attaches the ETag"""
+    if session.get("_flashes"):
+        # Pending flash messages are shown once; never cache or revalidate them
+        return make_response(render())
+    if request.if_none_match.contains(tag):
+        response = make_response("", 304)
+    else:
+        html = get_or_render(("page",) + tuple(cache_key), render) if cache_key is not None else render()
+        response = make_response(html)
+    response.set_etag(tag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
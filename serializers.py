@@ -0,0 +1,141 @@
+"""
+Serializers for the Data Store
+Store files carry a small versioned header identifying their format:
+
+    b"HRDB" | version (1 byte) | format id (1 byte) | payload
+
+Files without the header are legacy pretty-printed JSON and are read
+transparently; they are rewritten in the configured format on their next
+save (or all at once with ``python serializers.py migrate``).
+
+Formats:
+    msgpack - compact binary (default when the msgpack package is installed)
+    json    - compact JSON (no indentation), always available
+"""
+
+import json
+import os
+import sys
+from typing import Any, Dict, Tuple
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+MAGIC = b"HRDB"
+VERSION = 1
+HEADER_SIZE = len(MAGIC) + 2
+
+FORMAT_IDS = {"json": 1, "msgpack": 2}
+FORMAT_NAMES = {v: k for k, v in FORMAT_IDS.items()}
+
+
+def _encode_json(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _decode_json(payload: bytes) -> Any:
+    return json.loads(payload)
+
+
+def _encode_msgpack(data: Any) -> bytes:
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def _decode_msgpack(payload: bytes) -> Any:
+    return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+_CODECS = {
+    "json": (_encode_json, _decode_json),
+    "msgpack": (_encode_msgpack, _decode_msgpack),
+}
+
+
+def available_formats() -> Tuple[str, ...]:
+    return tuple(name for name in FORMAT_IDS if name != "msgpack" or msgpack is not None)
+
+
+def default_format() -> str:
+    """Format used for writes: STORAGE_FORMAT, else msgpack if installed, else json"""
+    requested = os.getenv("STORAGE_FORMAT", "").strip().lower()
+    if requested in available_formats():
+        return requested
+    if requested:
+        print(f"Warning: storage format '{requested}' unavailable, using json.")
+        return "json"
+    return "msgpack" if msgpack is not None else "json"
+
+
+def encode(data: Any, fmt: str = None) -> bytes:
+    """Serializes data with a versioned header"""
+    fmt = fmt or default_format()
+    encoder, _ = _CODECS[fmt]
+    return MAGIC + bytes((VERSION, FORMAT_IDS[fmt])) + encoder(data)
+
+
+def detect_format(raw: bytes) -> str:
+    """Returns the format name of serialized bytes ('legacy-json' for headerless files)"""
+    if raw[:len(MAGIC)] != MAGIC:
+        return "legacy-json"
+    return FORMAT_NAMES.get(raw[len(MAGIC) + 1], "unknown")
+
+
+def decode(raw: bytes) -> Any:
+    """Deserializes bytes written by encode() or a legacy JSON file"""
+    if raw[:len(MAGIC)] != MAGIC:
+        return json.loads(raw)
+    version, format_id = raw[len(MAGIC)], raw[len(MAGIC) + 1]
+    if version > VERSION:
+        raise ValueError(f"Unsupported store file version {version}")
+    fmt = FORMAT_NAMES.get(format_id)
+    if fmt is None or fmt not in available_formats():
+        raise ValueError(f"Unsupported store file format id {format_id}")
+    _, decoder = _CODECS[fmt]
+    return decoder(raw[HEADER_SIZE:])
+
+
+def migrate(directory: str, fmt: str = None) -> Dict[str, int]:
+    """Rewrites every store file under a directory in the given format. Each file
+    is rewritten under storage.write_lock(), so the app may keep writing."""
+    import storage  # storage imports this module
+    fmt = fmt or default_format()
+    if fmt not in available_formats():
+        raise ValueError(f"Storage format '{fmt}' is not available (is msgpack installed?)")
+    counts = {"converted": 0, "unchanged": 0}
+    for root, _dirs, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            with storage.write_lock():
+                try:
+                    with open(path, "rb") as f:
+                        raw = f.read()
+                except FileNotFoundError:
+                    continue
+                if detect_format(raw) == fmt:
+                    counts["unchanged"] += 1
+                    continue
+                tmp_path = f"{path}.migrate.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(encode(decode(raw), fmt))
+                os.replace(tmp_path, path)
+            counts["converted"] += 1
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert data store files between formats.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = sub.add_parser("migrate", help="rewrite all store files in one format")
+    migrate_parser.add_argument("--format", choices=list(FORMAT_IDS), help="target format (default: STORAGE_FORMAT)")
+    migrate_parser.add_argument("--data-dir", default=os.getenv("DATA_DIR", "data"))
+    args = parser.parse_args()
+    import storage
+    storage.DATA_DIR = args.data_dir  # lock the store being migrated
+    print(json.dumps(migrate(args.data_dir, args.format)))
+    sys.exit(0)
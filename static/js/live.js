@@ -0,0 +1,138 @@
+/**
+ * Live updates over Server-Sent Events (see live_updates.py).
+ * The server sends coalesced batches: {"events": [...], "overview": {...}}.
+ * Pages call LiveUpdates.connect(url, onBatch); the dashboard table is
+ * wired up automatically when #liveDashboard is present.
+ */
+const LiveUpdates = (() => {
+    const STATUS_CLASSES = { Accepted: 'status-accepted', Rejected: 'status-rejected', Pending: 'status-pending' };
+    let connected = false;
+
+    function connect(url, onBatch) {
+        if (!url || !window.EventSource) return null;
+        const source = new EventSource(url);
+        source.addEventListener('open', () => { connected = true; });
+        source.addEventListener('error', () => { connected = false; });
+        source.addEventListener('batch', e => onBatch(JSON.parse(e.data)));
+        return source;
+    }
+
+    function updateStats(overview) {
+        if (!overview) return;
+        document.querySelectorAll('[data-stat]').forEach(el => {
+            const value = overview[el.dataset.stat];
+            if (value !== undefined && el.textContent !== String(value)) el.textContent = value;
+        });
+    }
+
+    function displayStatus(status) {
+        status = (status || 'pending').trim().toLowerCase();
+        return status.charAt(0).toUpperCase() + status.slice(1);
+    }
+
+    function showNotice(container) {
+        if (container.querySelector('.live-notice')) return;
+        const notice = document.createElement('div');
+        notice.className = 'live-notice';
+        notice.style.cssText = 'padding: 0.75rem 1rem; margin-bottom: 1rem; border-radius: 8px; ' +
+            'background: rgba(99, 102, 241, 0.1); color: var(--text-primary); font-weight: 600;';
+        notice.innerHTML = 'Candidates have changed since this page was loaded. <a href="">Reload</a>';
+        container.prepend(notice);
+    }
+
+    // ============ Dashboard ============
+
+    function initDashboard(container) {
+        const tbody = document.getElementById('candidateRows');
+        const filtered = container.dataset.filtered === 'true';
+
+        function rows() {
+            return Array.from(tbody.querySelectorAll('tr[data-candidate-id]'));
+        }
+
+        function findRow(id) {
+            return tbody.querySelector(`tr[data-candidate-id="${CSS.escape(id)}"]`);
+        }
+
+        function setStatus(row, status) {
+            status = displayStatus(status);
+            row.dataset.status = status;
+            const select = row.querySelector('select.status-select');
+            if (!select) return;
+            select.value = status;
+            Object.values(STATUS_CLASSES).forEach(c => select.classList.remove(c));
+            select.classList.add(STATUS_CLASSES[status] || STATUS_CLASSES.Pending);
+        }
+
+        function placeRow(row) {
+            const score = parseFloat(row.dataset.score);
+            const before = rows().find(r => r !== row && !(parseFloat(r.dataset.score) >= score));
+            tbody.insertBefore(row, before || null);
+        }
+
+        function refresh() {
+            const all = rows();
+            all.forEach((row, i) => {
+                const badge = row.querySelector('.rank-badge');
+                if (badge) badge.textContent = '#' + (i + 1);
+            });
+            const top = all[0];
+            const set = (id, value) => { const el = document.getElementById(id); if (el) el.textContent = value; };
+            set('statTotal', all.length);
+            set('statTopScore', top ? parseFloat(top.dataset.score).toFixed(1) : '0.0');
+            set('statTopName', top ? top.querySelector('td:nth-child(3)').textContent : 'N/A');
+            set('statHighestExp', all.length ? Math.max(...all.map(r => parseFloat(r.dataset.years) || 0)) : 0);
+            set('statPending', all.filter(r => r.dataset.status === 'Pending').length);
+            document.dispatchEvent(new CustomEvent('live:rows-changed'));
+        }
+
+        function fetchRows(ids) {
+            return fetch(`${container.dataset.rowsUrl}?ids=${ids.map(encodeURIComponent).join(',')}`)
+                .then(response => response.text())
+                .then(html => {
+                    const template = document.createElement('template');
+                    template.innerHTML = `<table><tbody>${html}</tbody></table>`;
+                    template.content.querySelectorAll('tr[data-candidate-id]').forEach(row => {
+                        const existing = findRow(row.dataset.candidateId);
+                        const box = existing && existing.querySelector('.bulk-select');
+                        if (box && box.checked) row.querySelector('.bulk-select').checked = true;
+                        if (existing) existing.remove();
+                        placeRow(row);
+                    });
+                });
+        }
+
+        connect(container.dataset.eventsUrl, batch => {
+            const events = batch.events.filter(e => e.type !== 'positions');
+            if (!events.length) return;
+            if (!tbody || filtered || events.some(e => e.type === 'resync' || e.type === 'position_deleted')) {
+                // Filtered or empty tables can't be patched without re-running the query
+                showNotice(container);
+                return;
+            }
+            const fetchIds = [];
+            events.forEach(e => {
+                const row = findRow(e.id);
+                if (e.type === 'deleted') {
+                    if (row) row.remove();
+                } else if (e.type === 'status') {
+                    if (row) setStatus(row, e.status);
+                } else if (e.type === 'candidate') {
+                    fetchIds.push(e.id);
+                }
+            });
+            if (fetchIds.length) {
+                fetchRows(fetchIds).then(refresh).catch(() => showNotice(container));
+            } else {
+                refresh();
+            }
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', () => {
+        const container = document.getElementById('liveDashboard');
+        if (container) initDashboard(container);
+    });
+
+    return { connect, updateStats, isConnected: () => connected };
+})();
@@ -0,0 +1,93 @@
+"""
+Application Status Lookups
+Serves the public status page from the status projection kept in the
+candidate index (see storage.py), or the archive index for archived
+applications, plus a cached position-title map, so a status check is two
+dict lookups and never loads candidate records.
+
+Lookups are rate limited per client with a token bucket
+(STATUS_RATE_LIMIT_PER_MINUTE, STATUS_RATE_LIMIT_BURST). Buckets live in
+process memory, so with several workers each enforces its own limit.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import archive
+import storage
+
+RATE_PER_MINUTE = float(os.getenv("STATUS_RATE_LIMIT_PER_MINUTE", "30"))
+BURST = int(os.getenv("STATUS_RATE_LIMIT_BURST", "10"))
+
+_titles = {"version": None, "titles": {}}
+
+
+def _position_titles() -> Dict[str, str]:
+    """position id -> title, re-read only when positions change"""
+    version = storage.get_version("positions")
+    if _titles["version"] != version:
+        titles = {p["id"]: p.get("title") for p in storage.get_all_positions()}
+        _titles.update(version=version, titles=titles)
+    return _titles["titles"]
+
+
+def lookup(candidate_id: str) -> Optional[Dict]:
+    """Returns the applicant-facing status of an application, or None if unknown"""
+    # Archived applications keep the same projection in the archive index
+    entry = storage.get_index_entry(candidate_id) or archive.get_index_entry(candidate_id)
+    if entry is None:
+        return None
+    position_id = entry.get("p") or None
+    return {
+        "id": candidate_id,
+        "status": entry.get("s") or "pending",
+        "updated_at": entry.get("t") or entry.get("c"),
+        "name": entry.get("n"),
+        "created_at": entry.get("c"),
+        "final_rank_score": entry.get("f"),
+        "experience_score": entry.get("x"),
+        "position_id": position_id,
+        "position_title": _position_titles().get(position_id) if position_id else None,
+    }
+
+
+# ============ Rate Limiting ============
+
+class RateLimiter:
+    """Token bucket per client key: `rate_per_minute` sustained, `burst` at once"""
+
+    def __init__(self, rate_per_minute: float = RATE_PER_MINUTE, burst: int = BURST):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def allow(self, key: str) -> Tuple[bool, int]:
+        """Takes a token for key; returns (allowed, seconds until the next token)"""
+        if self.rate <= 0:
+            return True, 0
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, int((1 - tokens) / self.rate) + 1
+            if now - self._last_sweep > 60:
+                self._sweep(now)
+        return allowed, retry_after
+
+    def _sweep(self, now: float):
+        # Drop clients whose bucket has refilled completely
+        full_after = self.burst / self.rate
+        self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < full_after}
+        self._last_sweep = now
+
+
+limiter = RateLimiter()
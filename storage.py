@@ -1,182 +1,782 @@
+import fcntl
 import json
 import os
+import re
+import threading
+import time
 import uuid
-from typing import List, Dict, Optional
+from contextlib import contextmanager
+from typing import Callable, List, Dict, Optional, Iterable, Iterator, Tuple
 
+import metrics
+import dedup
+import serializers
+import blob_store
+import candidate_model
+from candidate_model import CandidateRecord
+
+# Storage layout (one partition file per position; files start with a
+# format header, see serializers.py):
+#   DATA_DIR/catalog.json              positions, users, legacy job description
+#   DATA_DIR/positions/<id>.json       candidates of one position
+#   DATA_DIR/positions/_unassigned.json candidates without a position
+#   DATA_DIR/candidate_index.jsonl     append-only log: candidate id -> position / user
+#   DATA_DIR/resumes/                  resume texts (raw_resume_text), see blob_store.py
+DATA_DIR = os.getenv("DATA_DIR", "data")
+
+# Legacy single-document store, migrated into DATA_DIR on first use
 DATA_FILE = "data.json"
 
-def _load_data() -> Dict:
-    if not os.path.exists(DATA_FILE):
-        return {"positions": [], "candidates": [], "users": []}
+UNASSIGNED = "_unassigned"
+
+# Serializes read-modify-write cycles within a process; write_lock() adds an
+# flock on DATA_DIR/.write.lock so they are serialized across processes too
+_lock = threading.RLock()
+_lock_depth = 0
+_lock_file = None
+
+@contextmanager
+def write_lock():
+    """Holds the store's write lock (re-entrant within a thread). Every mutation
+    takes it; backup.py takes it to capture a consistent snapshot."""
+    global _lock_depth, _lock_file
+    with _lock:
+        if _lock_depth == 0:
+            os.makedirs(DATA_DIR, exist_ok=True)
+            _lock_file = open(os.path.join(DATA_DIR, ".write.lock"), "a")
+            fcntl.flock(_lock_file, fcntl.LOCK_EX)
+        _lock_depth += 1
+        try:
+            yield
+        finally:
+            _lock_depth -= 1
+            if _lock_depth == 0:
+                fcntl.flock(_lock_file, fcntl.LOCK_UN)
+                _lock_file.close()
+                _lock_file = None
+
+def dedup_index_dir() -> str:
+    """Directory holding the per-position near-duplicate indexes"""
+    return os.path.join(DATA_DIR, "dedup_index")
+
+# ============ File Helpers ============
+
+def _catalog_path() -> str:
+    return os.path.join(DATA_DIR, "catalog.json")
+
+def _partition_name(position_id: Optional[str]) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]", "_", position_id or "") or UNASSIGNED
+
+def _partition_path(position_id: Optional[str]) -> str:
+    return os.path.join(DATA_DIR, "positions", f"{_partition_name(position_id)}.json")
+
+def _index_path() -> str:
+    return os.path.join(DATA_DIR, "candidate_index.jsonl")
+
+def _read_file(path: str, default):
+    """Returns a store file's contents, or default if it does not exist. A file
+    that cannot be decoded raises instead of reading as empty, so the next save
+    never overwrites real data with an empty document."""
+    start = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return default
+    try:
+        data = serializers.decode(raw)
+    except ValueError as e:
+        raise ValueError(f"Store file {path} could not be decoded ({e}); refusing to use it") from e
+    metrics.STORAGE_LOAD_SECONDS.observe(time.perf_counter() - start)
+    metrics.STORAGE_LOAD_BYTES.observe(len(raw))
+    return data
+
+def _file_stat(path: str):
+    """Cache validation key for a store file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+        return st.st_ino, st.st_mtime_ns, st.st_size
+    except FileNotFoundError:
+        return None
+
+def _stage_file(path: str, data):
+    """Writes data to a temp file next to path; returns (temp path, final cache key)"""
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    payload = serializers.encode(data)
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    # rename keeps inode and mtime, so this is the key of the final file
+    stat = _file_stat(tmp_path)
+    metrics.STORAGE_SAVE_SECONDS.observe(time.perf_counter() - start)
+    metrics.STORAGE_SAVE_BYTES.observe(len(payload))
+    return tmp_path, stat
+
+def _write_file(path: str, data):
+    """Writes atomically (temp file + rename) so readers never see a partial file.
+    Returns the written file's cache key."""
+    tmp_path, stat = _stage_file(path, data)
+    os.replace(tmp_path, path)
+    return stat
+
+# ============ Change Notifications ============
+# Every mutation appends one byte to DATA_DIR/version.log (O_APPEND, so
+# concurrent processes never collide) and the resulting file offset is the
+# new store version. Position changes also bump a separate "positions"
+# version, so pages that only list positions can stay cached while
+# candidates change. In-process listeners receive the event with its
+# version; a gap between versions means another process wrote in between.
+
+_listeners: List[Callable[[str, Dict], None]] = []
+
+_VERSION_FILES = {"store": "version.log", "positions": "positions_version.log"}
+POSITION_EVENTS = ("position_saved", "position_updated", "position_deleted", "store_replaced")
+
+def _version_path(topic: str = "store") -> str:
+    return os.path.join(DATA_DIR, _VERSION_FILES[topic])
+
+def get_version(topic: str = "store") -> Tuple[int, int]:
+    """Returns a version as (version file inode, mutation count); topic is 'store' or 'positions'"""
+    try:
+        st = os.stat(_version_path(topic))
+        return st.st_ino, st.st_size
+    except FileNotFoundError:
+        return 0, 0
+
+def _bump_version(topic: str = "store") -> Tuple[int, int]:
+    os.makedirs(DATA_DIR, exist_ok=True)
+    fd = os.open(_version_path(topic), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, b".")
+        return os.fstat(fd).st_ino, os.lseek(fd, 0, os.SEEK_CUR)
+    finally:
+        os.close(fd)
+
+def subscribe(listener: Callable[[str, Dict], None]):
+    """Registers listener(event, payload), called after every storage mutation"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+def unsubscribe(listener: Callable[[str, Dict], None]):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+def _notify(event: str, **payload):
+    """Bumps the store version and informs listeners; call while holding write_lock()"""
+    if event in POSITION_EVENTS:
+        payload["positions_version"] = _bump_version("positions")
+    payload["version"] = _bump_version()
+    for listener in list(_listeners):
+        try:
+            listener(event, payload)
+        except Exception as e:
+            print(f"Storage listener error on {event}: {e}")
+
+# ============ Catalog & Partitions ============
+
+def _ensure_store():
+    if os.path.exists(_catalog_path()):
+        return
+    with write_lock():
+        if os.path.exists(_catalog_path()):
+            return
+        legacy = _read_file(DATA_FILE, None) if os.path.exists(DATA_FILE) else None
+        if legacy is not None:
+            import_document(legacy)
+            os.replace(DATA_FILE, f"{DATA_FILE}.migrated")
+        else:
+            _write_file(_catalog_path(), {"positions": [], "users": []})
+
+def _load_catalog() -> Dict:
+    _ensure_store()
+    catalog = _read_file(_catalog_path(), {})
+    # Migration: ensure keys exist
+    catalog.setdefault("positions", [])
+    catalog.setdefault("users", [])
+    return catalog
+
+def _save_catalog(catalog: Dict):
+    _write_file(_catalog_path(), catalog)
+
+# Parsed partitions kept as compact CandidateRecords: path -> (file key, records)
+_partition_cache: Dict[str, tuple] = {}
+
+def _load_partition_records(position_id: Optional[str]) -> List[CandidateRecord]:
+    """Returns a partition's candidates as read-only records, re-parsing only when the file changed"""
+    _ensure_store()
+    path = _partition_path(position_id)
+    stat = _file_stat(path)
+    if stat is None:
+        _partition_cache.pop(path, None)
+        return []
+    cached = _partition_cache.get(path)
+    if cached is not None and cached[0] == stat:
+        return cached[1]
+    records = [CandidateRecord(c) for c in _read_file(path, {}).get("candidates", [])]
+    _partition_cache[path] = (stat, records)
+    return records
+
+def _load_partition(position_id: Optional[str]) -> List[Dict]:
+    """Returns a partition's candidates as mutable dicts (for read-modify-write)"""
+    return [r.to_dict() for r in _load_partition_records(position_id)]
+
+# ============ Resume Texts ============
+# raw_resume_text is moved into the blob store whenever a partition is
+# written, so partitions (and each worker's parsed records) stay small.
+# Partitions still holding inline text are migrated on their next write.
+
+def _archive():
+    """The archive tier, imported on use (archive.py imports this module)"""
+    import archive
+    return archive
+
+def resume_store() -> blob_store.BlobStore:
+    return blob_store.get_store(os.path.join(DATA_DIR, "resumes"))
+
+def _load_resume_text(candidate_id: str) -> Optional[str]:
+    return resume_store().get(candidate_id)
+
+candidate_model.set_resume_loader(_load_resume_text)
+
+def _detach_texts(candidates: List[Dict]) -> List[Dict]:
+    """Stores inline resume texts in the blob store; returns the candidates without them"""
+    texts = [(c["id"], c["raw_resume_text"]) for c in candidates
+             if isinstance(c.get("raw_resume_text"), str) and "id" in c]
+    if not texts:
+        return candidates
+    resume_store().put_many(texts)
+    return [{k: v for k, v in c.items() if k != "raw_resume_text"} if "raw_resume_text" in c else c
+            for c in candidates]
+
+def _with_text(record: CandidateRecord) -> Dict:
+    """Returns a record as a dict including its stored resume text"""
+    data = record.to_dict()
+    text = record.get("raw_resume_text")
+    if text is not None:
+        data["raw_resume_text"] = text
+    return data
+
+def _save_partition(position_id: Optional[str], candidates: List[Dict]) -> List[CandidateRecord]:
+    candidates = _detach_texts(candidates)
+    path = _partition_path(position_id)
+    stat = _write_file(path, {"position_id": position_id or "", "candidates": candidates})
+    records = [CandidateRecord(c) for c in candidates]
+    _partition_cache[path] = (stat, records)
+    return records
+
+def partition_key(position_id: Optional[str]):
+    """Returns a key that changes whenever a position's candidate partition is rewritten"""
+    return _file_stat(_partition_path(position_id))
+
+def _save_partitions(partitions: Dict[str, List[Dict]]) -> Dict[str, List[CandidateRecord]]:
+    """Saves several partitions together: every file is staged before any is
+    replaced, so a failed write leaves all of them unchanged"""
+    partitions = {pid: _detach_texts(candidates) for pid, candidates in partitions.items()}
+    staged = []
+    try:
+        for pid, candidates in partitions.items():
+            path = _partition_path(pid)
+            tmp_path, stat = _stage_file(path, {"position_id": pid or "", "candidates": candidates})
+            staged.append((pid, path, tmp_path, stat))
+    except Exception:
+        for _, _, tmp_path, _ in staged:
+            os.remove(tmp_path)
+        raise
+    saved = {}
+    for pid, path, tmp_path, stat in staged:
+        os.replace(tmp_path, path)
+        saved[pid] = [CandidateRecord(c) for c in partitions[pid]]
+        _partition_cache[path] = (stat, saved[pid])
+    return saved
+
+def _partition_ids() -> List[Optional[str]]:
+    """Returns the position IDs of all existing candidate partitions"""
+    _ensure_store()
+    directory = os.path.join(DATA_DIR, "positions")
+    if not os.path.isdir(directory):
+        return []
+    return [None if name[:-5] == UNASSIGNED else name[:-5]
+            for name in sorted(os.listdir(directory)) if name.endswith(".json")]
+
+# ============ Candidate Index ============
+# Append-only log mapping candidate IDs to their partition and user, cached
+# in memory. Appends (from any process) are read incrementally from the last
+# offset; a rewritten file (new inode) is re-read in full.
+#
+# Each line also carries the applicant-facing status projection, so status
+# lookups never load candidate partitions:
+#   s: status   t: status updated at   n: name   c: created at
+#   f: final_rank_score   x: experience_score
+
+# identity: (path, inode, first bytes) - a recreated file may reuse the inode
+_index_cache = {"identity": None, "offset": 0, "entries": {}}
+# Guards the incremental read: two threads consuming the same chunk would
+# both advance the offset and skip whatever was appended after it
+_index_lock = threading.Lock()
+
+PROJECTION_FIELDS = {"s": "status", "t": "status_updated_at", "n": "name", "c": "created_at",
+                     "f": "final_rank_score", "x": "experience_score"}
+
+def _apply_index_line(entries: Dict[str, Dict], entry: Dict):
+    if entry.get("d"):
+        entries.pop(entry["id"], None)
+    else:
+        entries[entry["id"]] = {k: v for k, v in entry.items() if k != "id"}
+
+def _refresh_index():
+    _ensure_store()
+    with _index_lock:
+        _read_index()
+
+def _load_index() -> Dict[str, Dict]:
+    """Returns a snapshot of the index entries (the cached dict keeps changing under concurrent reads)"""
+    _ensure_store()
+    with _index_lock:
+        return dict(_read_index())
+
+def _index_entry(candidate_id: str) -> Optional[Dict]:
+    _ensure_store()
+    with _index_lock:
+        return _read_index().get(candidate_id)
+
+def _read_index() -> Dict[str, Dict]:
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-            # Migration: ensure keys exist
-            if "positions" not in data:
-                data["positions"] = []
-            if "users" not in data:
-                data["users"] = []
-            return data
-    except json.JSONDecodeError:
-         return {"positions": [], "candidates": [], "users": []}
-
-def _save_data(data: Dict):
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+        st = os.stat(_index_path())
+    except FileNotFoundError:
+        _index_cache.update(identity=None, offset=0, entries={})
+        return _index_cache["entries"]
+    if st.st_size == _index_cache["offset"] and _index_cache["identity"] is not None \
+            and _index_cache["identity"][:2] == (_index_path(), st.st_ino):
+        return _index_cache["entries"]
+    with open(_index_path(), 'rb') as f:
+        identity = (_index_path(), st.st_ino, f.read(64))
+        if identity != _index_cache["identity"] or st.st_size < _index_cache["offset"]:
+            _index_cache.update(identity=identity, offset=0, entries={})
+        f.seek(_index_cache["offset"])
+        chunk = f.read(st.st_size - _index_cache["offset"])
+    entries = _index_cache["entries"]
+    # Only consume complete lines; a concurrent writer may be mid-append
+    chunk = chunk[:chunk.rfind(b"\n") + 1]
+    for line in chunk.splitlines():
+        if line.strip():
+            _apply_index_line(entries, json.loads(line))
+    _index_cache["offset"] += len(chunk)
+    return entries
+
+def _append_index(lines: List[Dict]):
+    if not lines:
+        return
+    _refresh_index()
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(_index_path(), 'a') as f:
+        f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+    # Picks up our lines (and any another process appended meanwhile)
+    _refresh_index()
+
+def _index_line(candidate: Dict) -> Dict:
+    line = {"id": candidate["id"], "p": candidate.get("position_id") or "", "u": candidate.get("user_id") or ""}
+    for key, field in PROJECTION_FIELDS.items():
+        value = candidate.get(field)
+        if value is not None:
+            line[key] = value
+    # Always set: an entry without "s" predates the projection and is backfilled on lookup
+    line.setdefault("s", "pending")
+    return line
+
+def get_index_entry(candidate_id: str) -> Optional[Dict]:
+    """Returns a candidate's index entry (partition, user and status projection) without loading records"""
+    entry = _index_entry(candidate_id)
+    if entry is not None and "s" not in entry:
+        # Written before the projection existed: backfill it from the record once
+        with write_lock():
+            record = next((c for c in _load_partition_records(entry["p"]) if c.id == candidate_id), None)
+            if record is not None:
+                _append_index([_index_line(record)])
+        entry = _index_entry(candidate_id)
+    return entry
+
+def candidate_ids() -> List[str]:
+    """Returns the IDs of all live candidates"""
+    return list(_load_index())
+
+def _compact_index(drop: Iterable[str] = ()):
+    """Rewrites the index log with only live entries, leaving out the IDs in drop"""
+    entries = _load_index()
+    for cid in drop:
+        entries.pop(cid, None)
+    tmp_path = f"{_index_path()}.tmp"
+    with open(tmp_path, 'w') as f:
+        for cid, entry in entries.items():
+            f.write(json.dumps({"id": cid, **entry}, separators=(",", ":")) + "\n")
+    os.replace(tmp_path, _index_path())
+    _refresh_index()
+
+# ============ Whole-Store Import / Export ============
+
+def import_document(data: Dict):
+    """Replaces the store with a single-document dict (legacy data.json layout)"""
+    with write_lock():
+        os.makedirs(os.path.join(DATA_DIR, "positions"), exist_ok=True)
+        for pid in _existing_partitions():
+            os.remove(_partition_path(pid))
+        _partition_cache.clear()
+        partitions: Dict[str, List[Dict]] = {}
+        for c in data.get("candidates", []):
+            partitions.setdefault(c.get("position_id") or "", []).append(c)
+        for pid, candidates in partitions.items():
+            _save_partition(pid, candidates)
+        catalog = {k: v for k, v in data.items() if k != "candidates"}
+        catalog.setdefault("positions", [])
+        catalog.setdefault("users", [])
+        _write_file(_catalog_path(), catalog)
+        tmp_path = f"{_index_path()}.tmp"
+        with open(tmp_path, 'w') as f:
+            for c in data.get("candidates", []):
+                f.write(json.dumps(_index_line(c), separators=(",", ":")) + "\n")
+        os.replace(tmp_path, _index_path())
+        # Drops the texts of candidates that were replaced
+        resume_store().compact(keep={c["id"] for c in data.get("candidates", []) if "id" in c})
+        _notify("store_replaced")
+
+def _existing_partitions() -> List[Optional[str]]:
+    directory = os.path.join(DATA_DIR, "positions")
+    if not os.path.isdir(directory):
+        return []
+    return [name[:-5] for name in os.listdir(directory) if name.endswith(".json")]
+
+def export_document() -> Dict:
+    """Returns the whole store as a single-document dict (legacy data.json layout)"""
+    data = dict(_load_catalog())
+    data["candidates"] = [_with_text(c) for c in get_all_candidates()]
+    return data
 
 # ============ Position Functions ============
 
 def save_position(title: str, description: str) -> str:
     """Creates a new position and returns its ID"""
-    data = _load_data()
-    position_id = str(uuid.uuid4())
-    position = {
-        "id": position_id,
-        "title": title,
-        "description": description
-    }
-    data["positions"].append(position)
-    _save_data(data)
+    with write_lock():
+        catalog = _load_catalog()
+        position_id = str(uuid.uuid4())
+        position = {
+            "id": position_id,
+            "title": title,
+            "description": description
+        }
+        catalog["positions"].append(position)
+        _save_catalog(catalog)
+        _notify("position_saved", position=position)
     return position_id
 
 def get_all_positions() -> List[Dict]:
     """Returns all positions"""
-    data = _load_data()
-    return data.get("positions", [])
+    return _load_catalog().get("positions", [])
 
 def get_position(position_id: str) -> Optional[Dict]:
     """Returns a single position by ID"""
-    data = _load_data()
-    positions = data.get("positions", [])
+    positions = _load_catalog().get("positions", [])
     return next((p for p in positions if p["id"] == position_id), None)
 
 def update_position(position_id: str, title: str, description: str):
     """Updates an existing position"""
-    data = _load_data()
-    for p in data["positions"]:
-        if p["id"] == position_id:
-            p["title"] = title
-            p["description"] = description
-            break
-    _save_data(data)
+    with write_lock():
+        catalog = _load_catalog()
+        for p in catalog["positions"]:
+            if p["id"] == position_id:
+                p["title"] = title
+                p["description"] = description
+                break
+        _save_catalog(catalog)
+        _notify("position_updated", position=get_position(position_id))
+
+def set_position_closed(position_id: str, closed: bool = True):
+    """Marks a position closed (its candidates become eligible for archiving) or reopens it"""
+    with write_lock():
+        catalog = _load_catalog()
+        for p in catalog["positions"]:
+            if p["id"] == position_id:
+                if closed:
+                    p["closed"] = True
+                else:
+                    p.pop("closed", None)
+                break
+        _save_catalog(catalog)
+        _notify("position_updated", position=get_position(position_id))
 
 def delete_position(position_id: str):
     """Deletes a position and all its associated candidates"""
-    data = _load_data()
-    # Remove position
-    data["positions"] = [p for p in data["positions"] if p["id"] != position_id]
-    # Cascade delete candidates
-    data["candidates"] = [c for c in data["candidates"] if c.get("position_id") != position_id]
-    _save_data(data)
-
-def get_candidates_by_position(position_id: str) -> List[Dict]:
+    with write_lock():
+        catalog = _load_catalog()
+        # Remove position
+        catalog["positions"] = [p for p in catalog["positions"] if p["id"] != position_id]
+        _save_catalog(catalog)
+        # Cascade delete candidates by dropping the position's partition
+        path = _partition_path(position_id)
+        if os.path.exists(path):
+            os.remove(path)
+        _partition_cache.pop(path, None)
+        entries = _load_index()
+        stale = [cid for cid, entry in entries.items() if entry["p"] == position_id]
+        _compact_index(stale)
+        _notify("position_deleted", position_id=position_id, candidate_ids=stale)
+        dedup.drop_position(position_id, dedup_index_dir())
+        # Closed positions are the ones that get archived
+        _archive().forget_position(position_id)
+    resume_store().delete_many(stale)
+
+def get_candidates_by_position(position_id: str) -> List[CandidateRecord]:
     """Returns all candidates for a specific position"""
-    data = _load_data()
-    return [c for c in data.get("candidates", []) if c.get("position_id") == position_id]
+    return list(_load_partition_records(position_id))
+
+def iter_candidates_by_position(position_id: str) -> Iterator[CandidateRecord]:
+    """Yields candidates for a specific position one at a time (for streaming exports)"""
+    for c in _load_partition_records(position_id):
+        yield c
 
 # ============ Legacy Job Description (for migration) ============
 
 def save_job_description(text: str):
-    data = _load_data()
-    data["job_description_text"] = text
-    _save_data(data)
+    with write_lock():
+        catalog = _load_catalog()
+        catalog["job_description_text"] = text
+        _save_catalog(catalog)
+        _notify("job_description_saved")
 
 def get_job_description() -> str:
-    data = _load_data()
-    return data.get("job_description_text", "")
+    return _load_catalog().get("job_description_text", "")
 
 # ============ Candidate Functions ============
 
-def save_candidate(candidate_data: Dict) -> str:
-    """Saves a candidate and returns their ID"""
+def _prepare_candidate(candidate_data: Dict) -> Dict:
+    """Fills in ID, created_at and status defaults for a new candidate"""
     from datetime import datetime
-    
-    data = _load_data()
-    
+
     # Generate ID if not present
     if "id" not in candidate_data:
         candidate_data["id"] = str(uuid.uuid4())
-    
+
     # Add created_at timestamp for new candidates
     if "created_at" not in candidate_data:
         candidate_data["created_at"] = datetime.now().isoformat()
-    
+
     # Default status to pending if not set
     if "status" not in candidate_data:
         candidate_data["status"] = "pending"
-        
-    # Check if candidate already exists (update)
-    candidates = data.get("candidates", [])
-    existing_index = next((index for (index, d) in enumerate(candidates) if d["id"] == candidate_data["id"]), None)
-    
-    if existing_index is not None:
-        candidates[existing_index] = candidate_data
-    else:
-        candidates.append(candidate_data)
-    
-    data["candidates"] = candidates
-    _save_data(data)
+    return candidate_data
+
+def _write_candidates(candidates: List[Dict]):
+    """Inserts or replaces candidates, touching only the partitions involved"""
+    entries = _load_index()
+    by_partition: Dict[str, List[Dict]] = {}
+    moved: Dict[str, set] = {}
+    for c in candidates:
+        pid = c.get("position_id") or ""
+        by_partition.setdefault(pid, []).append(c)
+        previous = entries.get(c["id"])
+        if previous is not None and previous["p"] != pid:
+            moved.setdefault(previous["p"], set()).add(c["id"])
+
+    # Candidates whose position changed leave their old partition
+    for pid, ids in moved.items():
+        _save_partition(pid, [c for c in _load_partition(pid) if c["id"] not in ids])
+
+    index_lines = []
+    saved = []
+    for pid, new_candidates in by_partition.items():
+        partition = _load_partition(pid)
+        positions = {c["id"]: i for i, c in enumerate(partition)}
+        for c in new_candidates:
+            existing_index = positions.get(c["id"])
+            if existing_index is not None:
+                partition[existing_index] = c
+            else:
+                positions[c["id"]] = len(partition)
+                partition.append(c)
+            line = _index_line(c)
+            if entries.get(c["id"]) != {k: v for k, v in line.items() if k != "id"}:
+                index_lines.append(line)
+        wanted = {c["id"] for c in new_candidates}
+        saved.extend(r for r in _save_partition(pid, partition) if r.id in wanted)
+    _append_index(index_lines)
+    _notify("candidates_saved", candidates=saved)
+
+def save_candidate(candidate_data: Dict) -> str:
+    """Saves a candidate and returns their ID"""
+    _prepare_candidate(candidate_data)
+
+    # Dedup indexes are appended to, so they are updated under the write lock too
+    with write_lock():
+        # Flag near-duplicate resumes within the same position
+        duplicates = dedup.index_candidate(candidate_data, dedup_index_dir())
+        if duplicates:
+            candidate_data["possible_duplicates"] = duplicates
+        _write_candidates([candidate_data])
     return candidate_data["id"]
 
-def get_all_candidates() -> List[Dict]:
-    data = _load_data()
-    return data.get("candidates", [])
+def save_candidates(candidates: List[Dict]) -> List[str]:
+    """Saves many candidates with one write per partition and returns their IDs"""
+    for candidate_data in candidates:
+        _prepare_candidate(candidate_data)
+    with write_lock():
+        duplicates = dedup.index_candidates(candidates, dedup_index_dir())
+        for candidate_data in candidates:
+            if candidate_data["id"] in duplicates:
+                candidate_data["possible_duplicates"] = duplicates[candidate_data["id"]]
+        _write_candidates(candidates)
+    return [c["id"] for c in candidates]
 
-def get_candidate(candidate_id: str) -> Optional[Dict]:
-    data = _load_data()
-    candidates = data.get("candidates", [])
-    return next((c for c in candidates if c["id"] == candidate_id), None)
+def get_all_candidates() -> List[CandidateRecord]:
+    candidates = []
+    for pid in _partition_ids():
+        candidates.extend(_load_partition_records(pid))
+    return candidates
+
+def get_candidate(candidate_id: str) -> Optional[CandidateRecord]:
+    entry = _index_entry(candidate_id)
+    if entry is None:
+        return None
+    return next((c for c in _load_partition_records(entry["p"]) if c.id == candidate_id), None)
 
 def delete_candidate(candidate_id: str):
     """Deletes a candidate by ID"""
-    data = _load_data()
-    candidates = data.get("candidates", [])
-    data["candidates"] = [c for c in candidates if c["id"] != candidate_id]
-    _save_data(data)
+    with write_lock():
+        entry = _index_entry(candidate_id)
+        if entry is None:
+            _archive().forget([candidate_id])
+            return
+        candidates = _load_partition(entry["p"])
+        _save_partition(entry["p"], [c for c in candidates if c["id"] != candidate_id])
+        _append_index([{"id": candidate_id, "d": 1}])
+        _notify("candidate_deleted", candidate_id=candidate_id, position_id=entry["p"] or None)
+        dedup.remove_candidate(candidate_id, entry["p"] or None, dedup_index_dir())
+    resume_store().delete_many([candidate_id])
 
 def update_candidate_status(candidate_id: str, status: str):
-    """Updates the status of a candidate"""
-    data = _load_data()
-    candidates = data.get("candidates", [])
-    for c in candidates:
-        if c["id"] == candidate_id:
-            c["status"] = status
-            break
-    _save_data(data)
+    """Updates the status of a candidate and stamps status_updated_at"""
+    from datetime import datetime
+    with write_lock():
+        entry = _index_entry(candidate_id)
+        if entry is None:
+            return
+        candidates = _load_partition(entry["p"])
+        for c in candidates:
+            if c["id"] == candidate_id:
+                c["status"] = status
+                c["status_updated_at"] = datetime.now().isoformat()
+                break
+        records = _save_partition(entry["p"], candidates)
+        record = next((r for r in records if r.id == candidate_id), None)
+        if record is not None:
+            _append_index([_index_line(record)])
+        _notify("status_changed", candidate_id=candidate_id, position_id=entry["p"] or None,
+                status=status, candidate=record)
+
+def update_candidates_status(candidate_ids: List[str], status: str,
+                             from_statuses: Optional[List[str]] = None) -> Dict:
+    """Sets the status of many candidates in one transaction (one write per
+    partition, one change event). If from_statuses is given, only candidates
+    currently in one of those statuses (case-insensitive) are changed.
+    Returns counts: requested, updated, unchanged, skipped, not_found."""
+    from datetime import datetime
+    wanted = {s.lower() for s in from_statuses} if from_statuses else None
+    counts = {"requested": len(set(candidate_ids)), "updated": 0, "unchanged": 0, "skipped": 0, "not_found": 0}
+    with write_lock():
+        entries = _load_index()
+        by_partition: Dict[str, set] = {}
+        for cid in set(candidate_ids):
+            entry = entries.get(cid)
+            if entry is None:
+                counts["not_found"] += 1
+            else:
+                by_partition.setdefault(entry["p"], set()).add(cid)
+
+        now = datetime.now().isoformat()
+        changed: Dict[str, List[Dict]] = {}
+        updated_ids = set()
+        for pid, ids in by_partition.items():
+            candidates = _load_partition(pid)
+            for c in candidates:
+                if c["id"] not in ids:
+                    continue
+                current = c.get("status") or "pending"
+                if wanted is not None and current.lower() not in wanted:
+                    counts["skipped"] += 1
+                elif current == status:
+                    counts["unchanged"] += 1
+                else:
+                    c["status"] = status
+                    c["status_updated_at"] = now
+                    updated_ids.add(c["id"])
+                    changed[pid] = candidates
+        counts["updated"] = len(updated_ids)
+
+        if changed:
+            saved = _save_partitions(changed)
+            records = [r for pid in saved for r in saved[pid] if r.id in updated_ids]
+            _append_index([_index_line(r) for r in records])
+            _notify("statuses_changed", candidates=records, status=status)
+    return counts
+
+def move_candidates_out(should_move: Callable[[CandidateRecord], bool],
+                        write_elsewhere: Callable[[List[Dict]], None]) -> Dict[str, Optional[str]]:
+    """Removes every candidate matching should_move(record) from the live store
+    (used by the archive tier). write_elsewhere(candidates) is called first and
+    must store them durably; if it raises, nothing is removed. Emits one
+    'candidates_archived' event. Returns {candidate id: position id}."""
+    with write_lock():
+        moving: Dict[str, List[Dict]] = {}
+        kept: Dict[str, List[Dict]] = {}
+        for pid in _partition_ids():
+            records = _load_partition_records(pid)
+            if any(should_move(r) for r in records):
+                key = pid or ""
+                moving[key] = [_with_text(r) for r in records if should_move(r)]
+                kept[key] = [r.to_dict() for r in records if not should_move(r)]
+        if not moving:
+            return {}
+        write_elsewhere([c for candidates in moving.values() for c in candidates])
+        _save_partitions(kept)
+        moved = {c["id"]: pid or None for pid, candidates in moving.items() for c in candidates}
+        _append_index([{"id": cid, "d": 1} for cid in moved])
+        _notify("candidates_archived", archived=moved)
+        for cid, pid in moved.items():
+            dedup.remove_candidate(cid, pid, dedup_index_dir())
+    resume_store().delete_many(moved)
+    return moved
 
 def get_overview_stats() -> Dict:
     """Returns aggregated stats for the Overview Dashboard"""
     from datetime import datetime, timedelta
-    
-    data = _load_data()
-    candidates = data.get("candidates", [])
-    positions = data.get("positions", [])
-    
+
+    candidates = get_all_candidates()
+    positions = get_all_positions()
+
     now = datetime.now()
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
+
     # Count stats
     total_candidates = len(candidates)
     total_positions = len(positions)
-    
+
     # Status counts
     pending_count = 0
     accepted_count = 0
     rejected_count = 0
     today_applicants = 0
     hires_this_month = 0
-    
+
     for c in candidates:
-        status = c.get("status", "pending")
-        
-        if status == "pending" or status == "":
+        # Case-insensitive: the dashboard stores 'Pending'/'Accepted'/'Rejected'
+        status = (c.get("status") or "pending").lower()
+
+        if status == "pending":
             pending_count += 1
         elif status == "accepted":
             accepted_count += 1
         elif status == "rejected":
             rejected_count += 1
-        
+
         # Check created_at for today's applicants
         created_at_str = c.get("created_at")
         if created_at_str:
@@ -188,7 +788,7 @@ def get_overview_stats() -> Dict:
                     hires_this_month += 1
             except (ValueError, TypeError):
                 pass
-    
+
     return {
         "total_candidates": total_candidates,
         "total_positions": total_positions,
@@ -204,35 +804,38 @@ def get_overview_stats() -> Dict:
 def create_user(username, password, name, email):
     """Creates a new user"""
     from datetime import datetime
-    data = _load_data()
-    # Check if username exists
-    if any(u['username'] == username for u in data.get('users', [])):
-        return None
-    
-    user_id = str(uuid.uuid4())
-    user = {
-        "id": user_id,
-        "username": username,
-        "password": password, # In production, hash this!
-        "name": name,
-        "email": email,
-        "created_at": datetime.now().isoformat()
-    }
-    data["users"].append(user)
-    _save_data(data)
+    with write_lock():
+        catalog = _load_catalog()
+        # Check if username exists
+        if any(u['username'] == username for u in catalog.get('users', [])):
+            return None
+
+        user_id = str(uuid.uuid4())
+        user = {
+            "id": user_id,
+            "username": username,
+            "password": password, # In production, hash this!
+            "name": name,
+            "email": email,
+            "created_at": datetime.now().isoformat()
+        }
+        catalog["users"].append(user)
+        _save_catalog(catalog)
+        _notify("user_created", user_id=user_id)
     return user_id
 
 def get_user_by_username(username):
     """Returns user by username"""
-    data = _load_data()
-    return next((u for u in data.get('users', []) if u['username'] == username), None)
+    return next((u for u in _load_catalog().get('users', []) if u['username'] == username), None)
 
 def get_user_by_id(user_id):
     """Returns user by ID"""
-    data = _load_data()
-    return next((u for u in data.get('users', []) if u['id'] == user_id), None)
+    return next((u for u in _load_catalog().get('users', []) if u['id'] == user_id), None)
 
 def get_candidates_by_user(user_id):
-    """Returns all candidates/applications for a specific user"""
-    data = _load_data()
-    return [c for c in data.get('candidates', []) if c.get('user_id') == user_id]
+    """Returns all candidates/applications for a specific user, archived ones included"""
+    entries = _load_index()
+    wanted = {cid for cid, entry in entries.items() if entry["u"] == user_id}
+    partitions = {entries[cid]["p"] for cid in wanted}
+    live = [c for pid in sorted(partitions) for c in _load_partition_records(pid) if c.id in wanted]
+    return live + _archive().candidates_by_user(user_id)
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+import archive
+import status_lookup
+import storage
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(storage, "DATA_FILE", str(tmp_path / "data.json"))
+    return tmp_path
+
+
+def _archived_ids():
+    """IDs of every record still present in a segment file, deleted or not"""
+    ids = set()
+    for root, _dirs, names in os.walk(archive.archive_dir()):
+        for name in names:
+            if name.endswith(".seg"):
+                segment = os.path.relpath(os.path.join(root, name), archive.archive_dir())
+                ids.update(c["id"] for _, _, c in archive._iter_segment(segment))
+    return ids
+
+
+@pytest.fixture
+def archived(store):
+    position_id = storage.save_position("Engineer", "Python")
+    ids = storage.save_candidates([
+        {"name": f"Candidate {n}", "position_id": position_id, "user_id": "u1", "final_rank_score": n,
+         "raw_resume_text": f"Resume {n}"} for n in range(3)])
+    storage.set_position_closed(position_id, True)
+    result = archive.archive_cold()
+    assert result["archived"] == 3
+    return position_id, ids
+
+
+def test_archived_candidates_stay_reachable(archived):
+    position_id, ids = archived
+    assert storage.candidate_ids() == []
+    assert storage.get_candidates_by_position(position_id) == []
+
+    record = archive.get_candidate(ids[1])
+    assert (record["name"], record["final_rank_score"]) == ("Candidate 1", 1)
+    assert status_lookup.lookup(ids[1])["status"] == "pending"
+    assert {c["id"] for c in storage.get_candidates_by_user("u1")} == set(ids)
+    assert [m["id"] for m in archive.search(name="candidate 2")] == [ids[2]]
+
+
+def test_delete_removes_archived_records_from_segments(archived):
+    position_id, ids = archived
+    storage.delete_candidate(ids[0])
+
+    assert archive.get_candidate(ids[0]) is None
+    assert status_lookup.lookup(ids[0]) is None
+    assert _archived_ids() == set(ids[1:])
+    assert archive.get_candidate(ids[1])["name"] == "Candidate 1"
+
+    storage.delete_position(position_id)
+    assert archive.search() == []
+    assert _archived_ids() == set()
+
+
+def test_purge_finishes_an_interrupted_delete(archived):
+    _, ids = archived
+    entry = archive.get_index_entry(ids[0])
+    # Tombstone written, segment rewrite never happened
+    archive._append_index([{"id": ids[0], "d": 1, "g": entry["g"]}])
+    assert archive.get_candidate(ids[0]) is None
+    assert ids[0] in _archived_ids()
+
+    assert archive.purge() == 1
+    assert _archived_ids() == set(ids[1:])
+    assert archive.purge() == 0
+    assert archive.get_candidate(ids[2])["name"] == "Candidate 2"
+
+
+def test_reindex_keeps_deleted_candidates_deleted(archived):
+    _, ids = archived
+    storage.delete_candidate(ids[0])
+    os.remove(archive._index_path())
+
+    assert archive.reindex() == 2
+    assert archive.get_candidate(ids[0]) is None
+    assert {m["id"] for m in archive.search()} == set(ids[1:])
@@ -0,0 +1,131 @@
+import os
+import threading
+
+import pytest
+
+import backup
+import storage
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(storage, "DATA_FILE", str(tmp_path / "data.json"))
+    monkeypatch.setattr(backup, "BACKUP_DIR", str(tmp_path / "backups"))
+    return tmp_path
+
+
+def _candidate(position_id, n):
+    name = f"Candidate {n}"
+    return {"name": name, "position_id": position_id, "final_rank_score": n % 100,
+            "raw_resume_text": f"Resume of {name}\n" + "python " * (n % 50)}
+
+
+def _writer(position_id, worker, stop, errors):
+    n = 0
+    try:
+        while not stop.is_set():
+            ids = storage.save_candidates([_candidate(position_id, worker * 100000 + n + i) for i in range(5)])
+            storage.update_candidate_status(ids[0], "shortlisted")
+            storage.delete_candidate(ids[1])
+            n += 5
+    except Exception as e:
+        errors.append(e)
+
+
+def _contents(data_dir):
+    """Candidates of a data directory with their texts, read through storage"""
+    original = storage.DATA_DIR
+    storage.DATA_DIR = data_dir
+    try:
+        document = storage.export_document()
+        ids = set(storage.candidate_ids())
+        return document, ids
+    finally:
+        storage.DATA_DIR = original
+
+
+def _check_consistent(data_dir):
+    document, ids = _contents(data_dir)
+    candidates = {c["id"]: c for c in document["candidates"]}
+    # The index, the partitions and the resume texts agree
+    assert ids == set(candidates)
+    for c in candidates.values():
+        assert c["raw_resume_text"].startswith(f"Resume of {c['name']}\n")
+    return document
+
+
+def test_snapshots_are_consistent_under_concurrent_writes(store):
+    position_id = storage.save_position("Engineer", "Python")
+    stop = threading.Event()
+    errors = []
+    writers = [threading.Thread(target=_writer, args=(position_id, w, stop, errors)) for w in range(3)]
+    for t in writers:
+        t.start()
+    snapshots = []
+    try:
+        for i in range(6):
+            dest = str(store / f"snapshot-{i}")
+            snapshots.append(backup.snapshot(dest))
+            backup.backup(incremental=i > 0)
+    finally:
+        stop.set()
+        for t in writers:
+            t.join()
+    assert not errors
+
+    counts = [len(_check_consistent(s["path"])["candidates"]) for s in snapshots]
+    assert counts == sorted(counts) and counts[-1] > 0
+    assert not os.listdir(os.path.join(storage.DATA_DIR, ".snapshots"))
+
+    # Every backup, incremental ones included, restores to a consistent store
+    for b in backup.list_backups():
+        restored = backup.restore(b["id"], str(store / f"restore-{b['id']}"))
+        _check_consistent(restored["target"])
+
+
+def test_incremental_backup_restores_latest_state(store):
+    position_id = storage.save_position("Engineer", "Python")
+    storage.save_candidates([_candidate(position_id, n) for n in range(200)])
+    full = backup.backup()
+    storage.save_candidates([_candidate(position_id, n) for n in range(200, 210)])
+    ids = storage.candidate_ids()
+    storage.update_candidate_status(ids[0], "rejected")
+    incremental = backup.backup(incremental=True)
+
+    assert incremental["kind"] == "incremental" and incremental["base"] == full["id"]
+    assert incremental["stored_bytes"] < full["stored_bytes"]
+    expected = storage.export_document()
+
+    restored = backup.restore(incremental["id"], str(store / "restored"))
+    document = _check_consistent(restored["target"])
+    assert document == expected
+
+
+def test_restore_replaces_data_dir_and_keeps_previous(store):
+    position_id = storage.save_position("Engineer", "Python")
+    storage.save_candidates([_candidate(position_id, n) for n in range(10)])
+    saved = backup.backup()
+    expected = storage.export_document()
+    storage.save_candidates([_candidate(position_id, n) for n in range(10, 20)])
+
+    result = backup.restore(saved["id"])
+    assert result["target"] == storage.DATA_DIR
+    assert storage.export_document() == expected
+    assert len(_contents(result["previous"])[1]) == 20
+
+
+def test_restore_rejects_corrupted_backup(store):
+    position_id = storage.save_position("Engineer", "Python")
+    storage.save_candidates([_candidate(position_id, n) for n in range(10)])
+    saved = backup.backup()
+    manifest = backup.load_manifest(saved["id"])
+    rel = next(rel for rel in manifest["files"] if rel.startswith("positions"))
+    with open(os.path.join(backup.BACKUP_DIR, saved["id"], "files", rel), "r+b") as f:
+        f.write(b"X")
+
+    target = str(store / "restored")
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        backup.restore(saved["id"], target)
+    assert not os.path.exists(target)
+    assert not any(name.startswith("restored.restore-") for name in os.listdir(store))
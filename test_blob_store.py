@@ -0,0 +1,52 @@
+import pytest
+
+import blob_store
+import storage
+
+
+@pytest.fixture
+def blobs(tmp_path):
+    return blob_store.BlobStore(str(tmp_path / "resumes"))
+
+
+def test_put_get_delete_compact(blobs):
+    blobs.put_many([("a", "Résumé A"), ("b", "Resume B"), ("c", "")])
+    assert (blobs.get("a"), blobs.get("b"), blobs.get("c"), blobs.get("x")) == ("Résumé A", "Resume B", "", None)
+
+    blobs.put_many([("b", "Resume B, updated")])
+    blobs.delete_many(["a"])
+    assert blobs.get("a") is None
+    assert blobs.get("b") == "Resume B, updated"
+    assert blobs.stats()["dead_bytes"] == len("Résumé A".encode()) + len("Resume B")
+
+    result = blobs.compact()
+    assert result["generation"] == blobs.generation
+    assert result["reclaimed_bytes"] == len("Résumé A".encode()) + len("Resume B")
+    assert blobs.stats()["dead_bytes"] == 0
+    assert (blobs.get("b"), blobs.get("c")) == ("Resume B, updated", "")
+    assert blobs.ids() == {"b", "c"}
+
+
+def test_other_instances_see_writes_and_compactions(blobs):
+    other = blob_store.BlobStore(blobs.directory)
+    blobs.put_many([("a", "A"), ("b", "B")])
+    assert other.get("a") == "A"
+
+    blobs.compact(keep={"b"})
+    assert other.get("a") is None
+    assert other.get("b") == "B"
+    other.put_many([("c", "C")])
+    assert blobs.get("c") == "C"
+
+
+def test_cli_compact_keeps_only_stored_candidates(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(storage, "DATA_FILE", str(tmp_path / "data.json"))
+    position_id = storage.save_position("Engineer", "Python")
+    candidate_id = storage.save_candidate({"name": "Jane", "position_id": position_id,
+                                           "raw_resume_text": "Jane's resume"})
+    storage.resume_store().put_many([("orphan", "left behind")])
+
+    assert blob_store.main(["compact"]) == 0
+    assert storage.resume_store().ids() == {candidate_id}
+    assert storage.get_candidate(candidate_id)["raw_resume_text"] == "Jane's resume"
@@ -0,0 +1,22 @@
+import csv
+import io
+
+import export
+
+
+def _rows(candidates, columns):
+    return list(csv.reader(io.StringIO("".join(export.iter_csv(candidates, columns)))))
+
+
+def test_csv_neutralizes_formulas():
+    candidates = [{"name": "=HYPERLINK(\"http://x\")", "university": "+1", "skills": ["-cmd", "Python"],
+                   "status": "@SUM(A1)", "source_file": "\tx.pdf", "id": "\rid"}]
+    columns = ["name", "university", "skills", "status", "source_file", "id"]
+    assert _rows(candidates, columns)[1] == ["'=HYPERLINK(\"http://x\")", "'+1", "'-cmd; Python",
+                                             "'@SUM(A1)", "'\tx.pdf", "'\rid"]
+
+
+def test_csv_keeps_plain_values():
+    candidates = [{"name": "Jane Doe", "python_score": -1, "final_rank_score": 8.5, "skills": None}]
+    columns = ["name", "python_score", "final_rank_score", "skills"]
+    assert _rows(candidates, columns)[1] == ["Jane Doe", "-1", "8.5", ""]
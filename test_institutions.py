@@ -0,0 +1,45 @@
+import pytest
+
+import institutions
+from agent import ResumeRankingAgent
+
+
+@pytest.mark.parametrize("line", [
+    "Cambridge, MA | jane@x.com",
+    "Columbia Sportswear, Software Engineer",
+    "Brown Brothers Harriman",
+    "12 Yale Street",
+    "Penn Foster College, Diploma 2015",
+    "Oxford Brookes University",
+])
+def test_ambiguous_words_do_not_resolve(line):
+    assert institutions.resolve(line) is None
+
+
+@pytest.mark.parametrize("line, name", [
+    ("MIT", "Massachusetts Institute of Technology"),
+    ("Harvard, B.A. Economics 2016", "Harvard University"),
+    ("Oxford University", "University of Oxford"),
+    ("B.Tech, IIT-B (2019)", "Indian Institute of Technology Bombay"),
+    ("IITB 2015-2019", "Indian Institute of Technology Bombay"),
+    ("Univ. of Michigan, Ann Arbor", "University of Michigan"),
+    ("Penn State University, B.S.", "Pennsylvania State University"),
+])
+def test_names_and_aliases_resolve(line, name):
+    assert institutions.resolve(line).name == name
+
+
+def test_find_university_skips_address_line():
+    agent = ResumeRankingAgent(api_key="", quiet=True)
+    lines = ["Jane Doe", "Cambridge, MA | jane@x.com", "Software Engineer at Acme, 2019-2023",
+             "State University of New York, B.S. 2019"]
+    university = agent._find_university(lines)
+    assert university == "State University of New York, B.S. 2019"
+    assert agent._get_university_tier(university)[0] == institutions.DEFAULT_TIER[0]
+
+
+def test_find_university_prefers_education_lines():
+    agent = ResumeRankingAgent(api_key="", quiet=True)
+    lines = ["John Roe", "Visiting researcher, ETH Zurich, 2021",
+             "Georgia Tech, M.S. Computer Science, GPA 3.9"]
+    assert agent._find_university(lines) == lines[2]
@@ -0,0 +1,22 @@
+import pytest
+
+import app as app_module
+import live_updates
+import storage
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(storage, "DATA_FILE", str(tmp_path / "data.json"))
+    return app_module.app.test_client()
+
+
+def test_head_and_closed_streams_release_their_slots(client):
+    for _ in range(live_updates.MAX_SUBSCRIBERS + 2):
+        assert client.head("/events").status_code == 200
+    for _ in range(live_updates.MAX_SUBSCRIBERS + 2):
+        response = client.get("/events", buffered=False)
+        assert response.status_code == 200
+        response.close()
+    assert not live_updates._broker._subscribers
@@ -0,0 +1,63 @@
+import pytest
+
+import app as app_module
+import storage
+
+RESUME = "Jane Doe\nPython developer, 5 years of experience with Django and AWS.\nB.S. Computer Science, MIT"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(storage, "DATA_FILE", str(tmp_path / "data.json"))
+    client = app_module.app.test_client()
+    with client.session_transaction() as session:
+        session["is_hr"] = True
+    return client
+
+
+def test_persist_saves_new_candidates_ranked_with_existing_ones(client):
+    position_id = storage.save_position("Engineer", "Python developer")
+    existing = storage.save_candidate({"name": "Existing", "position_id": position_id, "final_rank_score": 9.5})
+
+    response = client.post("/api/ranking", json={
+        "position_id": position_id, "persist": True, "top_k": 5,
+        "candidates": [{"resume_text": RESUME, "name": "Jane", "external_id": "ext-1"},
+                       {"name": "Prescored", "final_rank_score": 4}],
+    })
+
+    body = response.get_json()
+    assert response.status_code == 200 and body["errors"] == []
+    assert (body["scored"], body["existing"]) == (2, 1)
+    ranked = body["data"]
+    assert ranked[0]["id"] == existing
+    assert [r["final_rank_score"] for r in ranked] == sorted((r["final_rank_score"] for r in ranked), reverse=True)
+    jane = next(r for r in ranked if r.get("name") == "Jane")
+    saved = storage.get_candidate(jane["id"])
+    assert (saved["position_id"], saved["external_id"], saved["status"]) == (position_id, "ext-1", "pending")
+    assert saved["raw_resume_text"] == RESUME
+    assert len(storage.get_candidates_by_position(position_id)) == 3
+
+
+def test_submitted_items_cannot_override_stored_candidates(client):
+    target = storage.save_position("Target", "Python")
+    other = storage.save_position("Other", "Python")
+    victim = storage.save_candidate({"name": "Victim", "email": "victim@example.com", "position_id": other,
+                                     "final_rank_score": 5})
+
+    response = client.post("/api/ranking", json={
+        "position_id": target, "persist": True,
+        "candidates": [{"id": victim, "resume_text": RESUME, "final_rank_score": 99, "status": "accepted",
+                        "position_id": other},
+                       {"id": victim, "final_rank_score": 99}],
+    })
+
+    body = response.get_json()
+    assert body["scored"] == 1
+    assert body["errors"] == [{"index": 1, "error": "final_rank_score must be between 0 and 10"}]
+    submitted = body["data"][0]
+    assert submitted["id"] != victim
+    assert submitted["final_rank_score"] <= 10
+    assert storage.get_candidate(submitted["id"])["status"] == "pending"
+    record = storage.get_candidate(victim)
+    assert (record["position_id"], record["email"], record["final_rank_score"]) == (other, "victim@example.com", 5)
@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+
+import serializers
+import storage
+
+DOCUMENT = {"position_id": "p1", "candidates": [
+    {"id": "c1", "name": "Zoë", "final_rank_score": 8.25, "skills": ["Python", "SQL"], "user_id": None},
+]}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(storage, "DATA_FILE", str(tmp_path / "data.json"))
+    return tmp_path
+
+
+@pytest.mark.parametrize("fmt", serializers.available_formats())
+def test_round_trip(fmt):
+    raw = serializers.encode(DOCUMENT, fmt)
+    assert serializers.detect_format(raw) == fmt
+    assert serializers.decode(raw) == DOCUMENT
+
+
+def test_legacy_json_is_read():
+    raw = json.dumps(DOCUMENT, indent=4).encode()
+    assert serializers.detect_format(raw) == "legacy-json"
+    assert serializers.decode(raw) == DOCUMENT
+
+
+def test_newer_versions_are_refused():
+    raw = serializers.encode(DOCUMENT, "json")
+    newer = raw[:len(serializers.MAGIC)] + bytes((serializers.VERSION + 1,)) + raw[len(serializers.MAGIC) + 1:]
+    with pytest.raises(ValueError):
+        serializers.decode(newer)
+
+
+@pytest.mark.parametrize("fmt", serializers.available_formats())
+def test_migrate_rewrites_legacy_files(store, fmt):
+    position_id = storage.save_position("Engineer", "Python")
+    candidate_id = storage.save_candidate({"name": "Jane", "position_id": position_id})
+    path = storage._partition_path(position_id)
+    document = storage._read_file(path, {})
+    with open(path, "w") as f:
+        json.dump(document, f, indent=4)
+
+    counts = serializers.migrate(storage.DATA_DIR, fmt)
+
+    assert counts["converted"] >= 1
+    with open(path, "rb") as f:
+        assert serializers.detect_format(f.read()) == fmt
+    assert storage.get_candidate(candidate_id)["name"] == "Jane"
+    assert serializers.migrate(storage.DATA_DIR, fmt)["converted"] == 0
+
+
+def test_undecodable_store_files_are_refused(store):
+    storage.save_position("Engineer", "Python")
+    with open(storage._catalog_path(), "wb") as f:
+        f.write(serializers.MAGIC + b"\x01\x01{truncated")
+    with pytest.raises(ValueError):
+        storage.get_all_positions()
+    assert os.path.getsize(storage._catalog_path()) > 0
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+
+import pytest
+
+import storage
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(storage, "DATA_FILE", str(tmp_path / "data.json"))
+    return tmp_path
+
+
+def test_legacy_store_is_migrated_on_first_lookup(store):
+    legacy = {
+        "positions": [{"id": "p1", "title": "Engineer", "description": "Python"}],
+        "users": [{"id": "u1", "username": "jane"}],
+        "candidates": [
+            {"id": "c1", "name": "Jane", "position_id": "p1", "user_id": "u1", "status": "accepted",
+             "final_rank_score": 8.5, "raw_resume_text": "Jane's resume"},
+            {"id": "c2", "name": "Joe", "position_id": "", "status": "pending"},
+        ],
+    }
+    with open(storage.DATA_FILE, "w") as f:
+        json.dump(legacy, f)
+
+    # A read-only lookup is the first call: it must see the migrated store
+    assert storage.get_candidate("c1")["name"] == "Jane"
+    assert storage.get_index_entry("c2")["s"] == "pending"
+    assert not os.path.exists(storage.DATA_FILE)
+    assert os.path.exists(f"{storage.DATA_FILE}.migrated")
+    assert storage.get_candidate("c1")["raw_resume_text"] == "Jane's resume"
+    assert [c["id"] for c in storage.get_candidates_by_position("p1")] == ["c1"]
+    assert [c["id"] for c in storage.get_candidates_by_user("u1")] == ["c1"]
+    assert storage.get_position("p1")["title"] == "Engineer"
+
+
+def test_index_reads_during_concurrent_writes(store):
+    position_id = storage.save_position("Engineer", "Python")
+    stop = threading.Event()
+    errors = []
+
+    def write(worker):
+        n = 0
+        try:
+            while not stop.is_set():
+                storage.save_candidates([{"name": f"c{worker}-{n + i}", "position_id": position_id,
+                                          "user_id": "u1"} for i in range(5)])
+                n += 5
+        except Exception as e:
+            errors.append(e)
+
+    def read():
+        try:
+            for _ in range(200):
+                storage.candidate_ids()
+                storage.get_candidates_by_user("u1")
+        except Exception as e:
+            errors.append(e)
+
+    writers = [threading.Thread(target=write, args=(i,)) for i in range(3)]
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for thread in writers + readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    stop.set()
+    for thread in writers:
+        thread.join()
+
+    assert errors == []
+    saved = {c["id"] for c in storage.get_candidates_by_position(position_id)}
+    assert set(storage.candidate_ids()) == saved
+    assert {c["id"] for c in storage.get_candidates_by_user("u1")} == saved
+
+
+def test_delete_position_drops_its_index_entries(store):
+    keep = storage.save_position("Keep", "Python")
+    drop = storage.save_position("Drop", "Python")
+    kept = storage.save_candidate({"name": "A", "position_id": keep})
+    dropped = storage.save_candidate({"name": "B", "position_id": drop})
+
+    storage.delete_position(drop)
+
+    assert storage.candidate_ids() == [kept]
+    assert storage.get_candidate(dropped) is None
+
+
+def _index_lines():
+    with open(storage._index_path()) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_index_carries_the_status_projection(store):
+    position_id = storage.save_position("Engineer", "Python")
+    candidate_id = storage.save_candidate({"name": "Jane", "position_id": position_id,
+                                           "final_rank_score": 7.5, "experience_score": 6})
+    entry = storage.get_index_entry(candidate_id)
+    assert (entry["s"], entry["n"], entry["f"], entry["x"]) == ("pending", "Jane", 7.5, 6)
+
+    storage.update_candidate_status(candidate_id, "accepted")
+    entry = storage.get_index_entry(candidate_id)
+    assert entry["s"] == "accepted"
+    assert entry["t"] == storage.get_candidate(candidate_id)["status_updated_at"]
+
+
+def test_projection_backfill_is_written_once(store):
+    position_id = storage.save_position("Engineer", "Python")
+    candidate_id = storage.save_candidate({"name": "Jane", "position_id": position_id})
+    # A record without a status, indexed before the projection existed
+    candidates = storage._load_partition(position_id)
+    candidates[0]["status"] = None
+    storage._save_partition(position_id, candidates)
+    storage._append_index([{"id": candidate_id, "p": position_id, "u": ""}])
+    lines = len(_index_lines())
+
+    for _ in range(5):
+        assert storage.get_index_entry(candidate_id)["s"] == "pending"
+    assert len(_index_lines()) == lines + 1